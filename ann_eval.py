@@ -0,0 +1,114 @@
+"""Compare ANN index types against exact search: recall@k, latency and memory.
+
+Usage:
+    python ann_eval.py --index-path data/faiss_index --k 10
+    python ann_eval.py --synthetic 1000000 --types hnsw,ivf_pq --nprobe 8,32,128
+"""
+import time
+import argparse
+import faiss
+import numpy as np
+from index_factory import INDEX_TYPES, IndexConfig, apply_search_params, build_index, built_index_type, index_memory_bytes
+
+def load_vectors(index_path: str) -> np.ndarray:
+    index = faiss.read_index(f"{index_path}/index.faiss")
+    try:
+        return index.reconstruct_n(0, index.ntotal)
+    except RuntimeError:
+        raise SystemExit("❌ Saved index cannot return its vectors; rebuild it with ATS_INDEX_TYPE=flat first")
+
+def synthetic_vectors(n: int, dim: int, clusters: int = 256, seed: int = 0) -> np.ndarray:
+    """Clustered unit vectors, closer to real embedding distributions than uniform noise."""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    vectors = centers[rng.integers(0, clusters, n)] + 0.5 * rng.standard_normal((n, dim)).astype(np.float32)
+    faiss.normalize_L2(vectors)
+    return vectors
+
+def make_queries(vectors: np.ndarray, n_queries: int, seed: int = 1) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    picks = vectors[rng.choice(len(vectors), n_queries, replace=False)]
+    queries = picks + 0.1 * rng.standard_normal(picks.shape).astype(np.float32)
+    faiss.normalize_L2(queries)
+    return queries
+
+def measure(index, queries: np.ndarray, truth: np.ndarray, k: int) -> dict:
+    latencies = []
+    found = []
+    for query in queries:
+        start = time.perf_counter()
+        _, ids = index.search(query[None, :], k)
+        latencies.append(time.perf_counter() - start)
+        found.append(ids[0])
+    recall = np.mean([len(set(f) & set(t)) / k for f, t in zip(found, truth)])
+    latencies = np.array(latencies) * 1000
+    return {
+        "recall": recall,
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p99_ms": float(np.percentile(latencies, 99)),
+        "qps": len(queries) / (latencies.sum() / 1000),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Recall/latency/memory report for ANN index types")
+    parser.add_argument("--index-path", default="data/faiss_index", help="Saved flat index to take vectors from")
+    parser.add_argument("--synthetic", type=int, default=0, help="Use N synthetic vectors instead of a saved index")
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--types", default="hnsw,ivf_flat,ivf_pq")
+    parser.add_argument("--nlist", type=int, default=1024)
+    parser.add_argument("--nprobe", default="1,4,16,64")
+    parser.add_argument("--ef-search", default="16,32,64,128")
+    parser.add_argument("--train-size", type=int, default=50_000)
+    args = parser.parse_args()
+
+    vectors = synthetic_vectors(args.synthetic, args.dim) if args.synthetic else load_vectors(args.index_path)
+    queries = make_queries(vectors, min(args.queries, len(vectors)))
+    k = min(args.k, len(vectors))
+    print(f"📊 {len(vectors):,} vectors × {vectors.shape[1]} dims, {len(queries)} queries, recall@{k}")
+
+    exact = build_index(IndexConfig("flat"), vectors.shape[1])
+    exact.add(vectors)
+    _, truth = exact.search(queries, k)
+    baseline = measure(exact, queries, truth, k)
+    rows = [("flat", "-", baseline, 0.0, index_memory_bytes(exact))]
+
+    rng = np.random.default_rng(2)
+    for index_type in args.types.split(","):
+        if index_type not in INDEX_TYPES:
+            raise SystemExit(f"❌ Unknown index type {index_type}")
+        config = IndexConfig(index_type, nlist=args.nlist, train_size=args.train_size)
+        sample = vectors
+        if config.needs_training and len(vectors) > config.train_size:
+            sample = vectors[rng.choice(len(vectors), config.train_size, replace=False)]
+
+        build_start = time.time()
+        index = build_index(config, vectors.shape[1], sample if config.needs_training else None)
+        index.add(vectors)
+        build_time = time.time() - build_start
+        memory = index_memory_bytes(index)
+
+        if config.needs_training:
+            sweep = [("nprobe", int(v)) for v in args.nprobe.split(",")]
+        elif index_type == "hnsw":
+            sweep = [("efSearch", int(v)) for v in args.ef_search.split(",")]
+        else:
+            sweep = [("-", None)]
+
+        for name, value in sweep:
+            if name == "nprobe":
+                apply_search_params(index, config, nprobe=value)
+            elif name == "efSearch":
+                apply_search_params(index, config, ef_search=value)
+            # Label by what was built: ivf_pq on too small a sample is ivf_flat
+            rows.append((built_index_type(index), f"{name}={value}" if value else "-", measure(index, queries, truth, k),
+                         build_time, memory))
+
+    print(f"\n{'index':<10} {'params':<14} {'recall':>7} {'p50 ms':>8} {'p99 ms':>8} {'QPS':>9} {'build s':>8} {'MB':>9}")
+    for index_type, params, result, build_time, memory in rows:
+        print(f"{index_type:<10} {params:<14} {result['recall']:>7.3f} {result['p50_ms']:>8.3f} "
+              f"{result['p99_ms']:>8.3f} {result['qps']:>9.0f} {build_time:>8.2f} {memory/1e6:>9.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+import os
+import json
+import time
+import hashlib
+import threading
+import numpy as np
+from collections import OrderedDict
+from typing import Iterable, List, Optional
+from metrics import metrics
+
+def document_key(doc) -> str:
+    """Identify a retrieved document by source and content, so edits change its key."""
+    digest = hashlib.sha256(doc.page_content.encode("utf-8")).hexdigest()[:16]
+    return f"{doc.metadata.get('source', '')}:{digest}"
+
+def key_source(key: str) -> str:
+    """The resume source a document_key was made from."""
+    return key.rsplit(":", 1)[0]
+
+class AnswerCache:
+    """Semantic cache of Q&A answers.
+
+    An entry is reused when a new question retrieves exactly the same documents and its
+    embedding has cosine similarity >= threshold with the cached question. Entries are evicted
+    least recently used beyond capacity, expire after ttl_seconds, and are dropped as soon as
+    any document they were answered from is changed or removed from the index.
+    """
+
+    def __init__(self, path: str = "data/answer_cache.json", threshold: float = 0.95,
+                 capacity: int = 500, ttl_seconds: float = 7 * 24 * 3600):
+        self.path = path
+        self.threshold = threshold
+        self.capacity = capacity
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.invalidated = 0
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, dict]" = OrderedDict()
+        self._load()
+
+    @classmethod
+    def from_env(cls) -> Optional["AnswerCache"]:
+        if os.getenv("ATS_ANSWER_CACHE", "1") == "0":
+            return None
+        return cls(
+            threshold=float(os.getenv("ATS_ANSWER_CACHE_THRESHOLD", "0.95")),
+            capacity=int(os.getenv("ATS_ANSWER_CACHE_SIZE", "500")),
+            ttl_seconds=float(os.getenv("ATS_ANSWER_CACHE_TTL", str(7 * 24 * 3600))),
+        )
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r") as f:
+                entries = json.load(f)["entries"]
+            now = time.time()
+            self._entries = OrderedDict((key, entry) for key, entry in entries
+                                        if now - entry["created"] < self.ttl_seconds)
+            print(f"📦 Answer cache: {len(self._entries)} answers loaded")
+        except Exception as e:
+            print(f"⚠️  Could not load answer cache: {e}")
+            self._entries = OrderedDict()
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with self._lock:
+            entries = list(self._entries.items())
+        with open(tmp_path, "w") as f:
+            json.dump({"updated": time.time(), "entries": entries}, f)
+        os.replace(tmp_path, self.path)
+
+    @staticmethod
+    def _signature(doc_keys: Iterable[str]) -> str:
+        return hashlib.sha256("\n".join(sorted(doc_keys)).encode("utf-8")).hexdigest()
+
+    def get(self, question_vector: List[float], doc_keys: List[str]) -> Optional[str]:
+        """Return a cached answer for a similar question over the same documents, if any."""
+        signature = self._signature(doc_keys)
+        query = np.asarray(question_vector, dtype=np.float32)
+        now = time.time()
+        with self._lock:
+            best_key, best_similarity = None, self.threshold
+            for key, entry in list(self._entries.items()):
+                if now - entry["created"] >= self.ttl_seconds:
+                    del self._entries[key]
+                    continue
+                if entry["signature"] != signature:
+                    continue
+                similarity = float(np.dot(query, np.asarray(entry["vector"], dtype=np.float32)))
+                if similarity >= best_similarity:
+                    best_key, best_similarity = key, similarity
+            if best_key is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(best_key)
+            self.hits += 1
+            entry = self._entries[best_key]
+        if metrics.verbose:
+            print(f"⚡ Answer cache hit (similarity {best_similarity:.3f} to \"{entry['question'][:60]}\")")
+        return entry["answer"]
+
+    def put(self, question: str, question_vector: List[float], doc_keys: List[str], answer: str):
+        key = hashlib.sha256(f"{question}\n{self._signature(doc_keys)}".encode("utf-8")).hexdigest()
+        with self._lock:
+            self._entries[key] = {
+                "question": question,
+                "vector": [float(v) for v in question_vector],
+                "doc_keys": sorted(doc_keys),
+                "signature": self._signature(doc_keys),
+                "answer": answer,
+                "created": time.time(),
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+        self.save()
+
+    def sources(self) -> set:
+        """Resume sources that cached answers were answered from."""
+        with self._lock:
+            return {key_source(key) for entry in self._entries.values() for key in entry["doc_keys"]}
+
+    def invalidate(self, current_doc_keys: Iterable[str]) -> int:
+        """Drop entries answered from any document no longer present in this form.
+
+        current_doc_keys only needs to cover the resumes listed by sources().
+        """
+        current = set(current_doc_keys)
+        with self._lock:
+            stale = [key for key, entry in self._entries.items()
+                     if not current.issuperset(entry["doc_keys"])]
+            for key in stale:
+                del self._entries[key]
+            self.invalidated += len(stale)
+        if stale:
+            print(f"🗑️  Answer cache: dropped {len(stale)} answers for changed or removed resumes")
+            self.save()
+        return len(stale)
+
+    def print_stats(self):
+        total = self.hits + self.misses
+        hit_rate = self.hits / total * 100 if total else 0.0
+        print(f"🗂️  Answer cache: {len(self._entries)} answers, {self.hits} hits / {total} questions "
+              f"({hit_rate:.0f}%), {self.invalidated} invalidated")
@@ -1,9 +1,21 @@
-import os
 import time
+PROCESS_START = time.time()  # captured before the heavy imports below
+
+import os
 from datetime import datetime
 from resume_processor import ResumeProcessor
-from vector_store import VectorStore  
-from query_engine import QueryEngine
+from sharded_store import vector_store_from_env
+from query_engine import QueryEngine, ensure_ollama_model
+from ingest_manifest import IngestManifest
+from warm_start import WarmStart
+from near_duplicates import DedupConfig
+from resume_watcher import ResumeWatcher, WatchConfig
+from startup import StartupScheduler
+from answer_cache import AnswerCache
+from context_packer import ContextPacker
+from match_explainer import MatchExplainer, format_explanation
+from shortlist_summaries import ShortlistSummarizer
+from metrics import metrics
 
 def print_banner():
     print("\n" + "="*60)
@@ -43,76 +55,77 @@ def main():
         'average_query_time': 0
     }
     
+    if os.getenv("ATS_METRICS_PORT"):
+        metrics.serve(int(os.getenv("ATS_METRICS_PORT")))
+    
     try:
-        # STEP 1: Resume Processing
-        print_section("STEP 1: RESUME PROCESSING")
-        step1_start = time.time()
-        
-        processor = ResumeProcessor()
-        
-        print("📁 Loading resumes...")
-        resumes = processor.load_resumes()
-        
-        if not resumes:
-            print("❌ No resumes found in data/resumes/")
-            return
-        
-        print(f"✅ Loaded {len(resumes)} resumes")
-        for filename, _ in resumes:
-            print(f"   📄 {filename}")
-        
-        print("🧹 Processing resume text...")
-        
-        cleaned_resumes = []
-        for filename, text in resumes:
-            text_start = time.time()
-            cleaned_text = processor.clean_text(text)
-            text_time = time.time() - text_start
-            
-            if cleaned_text and len(cleaned_text.strip()) > 50:
-                cleaned_resumes.append((filename, cleaned_text))
-                print(f"✅ Processed: {filename} ({len(cleaned_text)} chars) - {format_time(text_time)}")
-        
-        if not cleaned_resumes:
-            print("❌ No valid resumes after processing")
-            return
-        
-        step1_time = time.time() - step1_start
-        performance_stats['resume_processing'] = step1_time
-        print(f"⏱️  Step 1 completed in: {format_time(step1_time)}")
-        
-        # STEP 2: Vector Store Creation
-        print_section("STEP 2: BUILDING SEARCH DATABASE")
+        # STEP 1: Concurrent startup. Extraction, the embeddings model and Ollama readiness
+        # are independent; only the stages that need a result block on it.
+        print_section("STEP 1: STARTING UP (CONCURRENT)")
+        
+        processor = ResumeProcessor.from_env()
+        manifest = IngestManifest()
+        ollama_base_url = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+        
+        def build_index(vector_store, _prefetched):
+            warm_start = WarmStart(
+                processor, vector_store, manifest,
+                batch_size=int(os.getenv("ATS_INGEST_BATCH_SIZE", "32")),
+                dedup=DedupConfig.from_env()
+            )
+            warm_start.start()
+            return warm_start
+        
+        scheduler = StartupScheduler(origin=PROCESS_START)
+        scheduler.add("extraction", lambda: processor.prefetch(manifest))
+        scheduler.add("embeddings", vector_store_from_env)
+        scheduler.add("ollama", lambda: ensure_ollama_model(ollama_base_url))
+        scheduler.add("index", build_index, deps=("embeddings", "extraction"))
+        scheduler.start()
+        print("🚦 Launched: resume extraction, embeddings model, Ollama readiness")
+        
+        # STEP 2: Search database (blocks only on extraction + embeddings)
+        print_section("STEP 2: PREPARING SEARCH DATABASE")
         step2_start = time.time()
         
-        vector_store = VectorStore()
-        vector_store.create_vector_store(cleaned_resumes)
-        
-        step2_time = time.time() - step2_start
-        performance_stats['vector_store_creation'] = step2_time
-        print(f"⏱️  Step 2 completed in: {format_time(step2_time)}")
-        
-        # STEP 3: AI System Setup
-        print_section("STEP 3: STARTING AI SYSTEM")
-        step3_start = time.time()
+        warm_start = scheduler.result("index")
+        vector_store = warm_start.vector_store
         
-        query_engine = QueryEngine(vector_store)
-        
-        step3_time = time.time() - step3_start
-        performance_stats['ai_model_setup'] = step3_time
-        print(f"⏱️  Step 3 completed in: {format_time(step3_time)}")
+        if not warm_start.ready:
+            print("❌ No valid resumes found in data/resumes/")
+            return
         
-        # STEP 4: Job Matching
-        print_section("STEP 4: JOB MATCHING")
+        # Creating the engine does not touch Ollama; only Q&A waits for the "ollama" stage
+        query_engine = QueryEngine(vector_store, setup_model=False, answer_cache=AnswerCache.from_env(),
+                                   context_packer=ContextPacker.from_env(vector_store.embeddings),
+                                   profile_fast_path=os.getenv("ATS_PROFILE_FAST_PATH", "1") == "1",
+                                   match_explainer=MatchExplainer.from_env(vector_store.embeddings))
+        
+        performance_stats['resume_processing'] = scheduler.duration("extraction") + scheduler.duration("index")
+        performance_stats['vector_store_creation'] = scheduler.duration("embeddings")
+        print(f"⏱️  Search database ready after waiting {format_time(time.time() - step2_start)}")
+        
+        # New, changed and deleted resumes are applied to the live index while the session runs
+        watcher = None
+        watch_config = WatchConfig.from_env()
+        if watch_config is not None:
+            watcher = ResumeWatcher(processor, vector_store, manifest, watch_config,
+                                    batch_size=int(os.getenv("ATS_INGEST_BATCH_SIZE", "32")),
+                                    dedup=DedupConfig.from_env()).start(after=warm_start.refresh_thread)
+        
+        # STEP 3: Job Matching
+        print_section("STEP 3: JOB MATCHING")
         print("📝 Enter job description (Ctrl+D when done):")
         print("-" * 50)
         
+        input_start = time.time()
         job_lines = []
         try:
             while True:
                 job_lines.append(input())
         except EOFError:
             job_description = '\n'.join(job_lines).strip()
+        input_time = time.time() - input_start
         
         if not job_description:
             print("❌ No job description provided")
@@ -124,10 +137,17 @@ def main():
         print("\n🔍 Finding matching candidates...")
         matching_start = time.time()
         
-        matches = query_engine.find_matching_resumes(job_description, top_k=5)
+        matches = query_engine.find_matching_resumes(
+            job_description, top_k=5,
+            mode=os.getenv("ATS_SEARCH_MODE", "vector"),
+            prefilter=os.getenv("ATS_LEXICAL_PREFILTER", "0") == "1",
+            filter=os.getenv("ATS_SEARCH_FILTER") or None
+        )
         
         matching_time = time.time() - matching_start
         performance_stats['job_matching'] = matching_time
+        # Excludes the time spent typing the job description at the prompt
+        warm_start.record_time_to_first_result(time.time() - PROCESS_START - input_time)
         
         if not matches:
             print("❌ No matches found")
@@ -135,19 +155,45 @@ def main():
         
         print(f"⏱️  Job matching completed in: {format_time(matching_time)}")
         
-        # STEP 5: Results
-        print_section("STEP 5: RESULTS")
+        # STEP 4: Results
+        print_section("STEP 4: RESULTS")
         print("🏆 TOP MATCHING CANDIDATES:")
         print("-" * 50)
         
         for i, doc in enumerate(matches, 1):
             filename = doc.metadata['source']
-            print(f"{i}. 📄 {filename}")
-            print(f"   Preview: {doc.page_content[:150]}...")
+            print(f"{i}. 📄 {filename} (score {doc.metadata['score']:.3f})")
+            if doc.metadata.get('aliases'):
+                print(f"   Also submitted as: {', '.join(doc.metadata['aliases'])}")
+            if doc.metadata.get('explanation'):
+                print(format_explanation(doc.metadata['explanation']))
+            else:
+                print(f"   Preview: {doc.page_content[:150]}...")
             print()
         
-        # STEP 6: Interactive Q&A with Individual Timing
-        print_section("STEP 6: INTERACTIVE Q&A")
+        # Llama2 fit summaries for the whole shortlist, printed as each one finishes
+        summarizer = ShortlistSummarizer.from_env(ollama_base_url, manifest=manifest)
+        if summarizer is not None:
+            scheduler.result("ollama")
+            print("📝 FIT SUMMARIES:")
+            print("-" * 50)
+            for result in summarizer.summarize(job_description, matches):
+                origin = "cached" if result["cached"] else format_time(result["seconds"])
+                print(f"{result['rank']}. 📄 {result['source']} ({origin})")
+                if result.get("error"):
+                    print(f"   ⚠️  Could not summarize: {result['error']}")
+                else:
+                    print(f"   {result['summary']}")
+                print()
+        
+        # STEP 5: Interactive Q&A with Individual Timing (blocks only now on Ollama)
+        print_section("STEP 5: INTERACTIVE Q&A")
+        qa_wait_start = time.time()
+        scheduler.result("ollama")
+        print(f"⏱️  AI system ready after waiting {format_time(time.time() - qa_wait_start)}")
+        performance_stats['ai_model_setup'] = scheduler.duration("ollama")
+        scheduler.print_timeline()
+        
         print("🤖 Ask questions about candidates!")
         print("🚪 Type 'exit' to quit")
         print("💡 Each query will show individual timing")
@@ -155,6 +201,7 @@ def main():
         
         query_count = 0
         total_query_time = 0
+        time_to_first_tokens = []
         
         while True:
             question = input(f"\n❓ Question: ").strip()
@@ -165,20 +212,30 @@ def main():
             if not question:
                 continue
             
-            # Time individual query
+            # Time individual query; the answer is printed as Llama2 streams it
             query_start = time.time()
-            answer = query_engine.query(question)
+            answered = False
+            for chunk in query_engine.stream_query(question):
+                if not answered:
+                    print("\n🤖 Answer: ", end="", flush=True)
+                    answered = True
+                print(chunk, end="", flush=True)
+            print()
             query_time = time.time() - query_start
             
             query_count += 1
             total_query_time += query_time
+            if query_engine.last_query_stats:
+                time_to_first_tokens.append(query_engine.last_query_stats["time_to_first_token"])
             
-            print(f"\n🤖 Answer: {answer}")
+            query_engine.print_query_stats()
             print(f"⏱️  Query processed in: {format_time(query_time)}")
         
         performance_stats['total_queries'] = query_count
         performance_stats['total_query_time'] = total_query_time
         performance_stats['average_query_time'] = total_query_time / query_count if query_count > 0 else 0
+        if watcher is not None:
+            watcher.stop()
         
         # Final Performance Summary
         total_time = time.time() - total_start_time
@@ -187,27 +244,41 @@ def main():
         print("📊 PERFORMANCE SUMMARY")
         print("="*60)
         print(f"🕐 Total Session Time: {format_time(total_time)}")
-        print(f"📄 Resume Processing: {format_time(performance_stats['resume_processing'])}")
-        print(f"🗃️  Vector Store Creation: {format_time(performance_stats['vector_store_creation'])}")
+        print(f"🗃️  Embeddings Model Load: {format_time(performance_stats['vector_store_creation'])}")
+        print(f"📄 Resume Ingestion (extract + embed): {format_time(performance_stats['resume_processing'])}")
         print(f"🤖 AI Model Setup: {format_time(performance_stats['ai_model_setup'])}")
         print(f"🔍 Job Matching: {format_time(performance_stats['job_matching'])}")
+        if vector_store.embedding_cache is not None:
+            vector_store.embedding_cache.print_stats()
+        if query_engine.answer_cache is not None:
+            query_engine.answer_cache.print_stats()
+        if summarizer is not None and summarizer.cache is not None:
+            summarizer.cache.print_stats()
         
         if query_count > 0:
             print(f"💬 Total Queries: {query_count}")
             print(f"⏱️  Total Query Time: {format_time(total_query_time)}")
             print(f"📈 Average Query Time: {format_time(performance_stats['average_query_time'])}")
             print(f"🚀 Queries per Second: {query_count/total_query_time:.2f}")
+        if time_to_first_tokens:
+            print(f"⚡ Time to First Token: {format_time(sum(time_to_first_tokens)/len(time_to_first_tokens))} average, "
+                  f"{format_time(max(time_to_first_tokens))} worst")
         
         # Efficiency Analysis
         print("\n📈 EFFICIENCY ANALYSIS:")
         print("-" * 30)
-        setup_time = performance_stats['resume_processing'] + performance_stats['vector_store_creation'] + performance_stats['ai_model_setup']
-        print(f"⚡ Setup Time: {format_time(setup_time)} ({setup_time/total_time*100:.1f}% of total)")
+        setup_time = scheduler.span()
+        stage_sum = performance_stats['resume_processing'] + performance_stats['vector_store_creation'] + performance_stats['ai_model_setup']
+        print(f"⚡ Setup Time: {format_time(setup_time)} ({setup_time/total_time*100:.1f}% of total, "
+              f"{format_time(stage_sum)} if run sequentially)")
         print(f"🔍 Search Efficiency: {format_time(performance_stats['job_matching'])} for {len(matches)} results")
         
         if query_count > 0:
             print(f"💭 Q&A Efficiency: {format_time(performance_stats['average_query_time'])} per query")
         
+        # Per-stage latency distributions from the metrics registry
+        metrics.print_summary()
+        
         print("\n👋 Thanks for using the ATS!")
         
     except Exception as e:
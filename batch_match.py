@@ -0,0 +1,99 @@
+"""Headless batch job matching: rank the resume pool against many job descriptions at once.
+
+Usage:
+    python batch_match.py data/requisitions/ --output data/matches.csv --top-k 20
+    python batch_match.py requisitions.jsonl --output data/matches.jsonl
+    python batch_match.py requisitions.jsonl --filter "years >= 5 and degree >= bachelor"
+
+A directory is read as one job description per .txt/.md file (the file stem is the req id).
+A JSONL file needs "req_id" (or "id") and "description" (or "text") on each line.
+No interactive prompts, and Ollama is never contacted.
+"""
+import os
+import csv
+import json
+import time
+import argparse
+from typing import List, Tuple
+from resume_processor import ResumeProcessor
+from sharded_store import vector_store_from_env
+from ingest_manifest import IngestManifest
+from warm_start import WarmStart
+from near_duplicates import DedupConfig
+
+def load_job_descriptions(path: str) -> List[Tuple[str, str]]:
+    jobs = []
+    if os.path.isdir(path):
+        for filename in sorted(os.listdir(path)):
+            if filename.lower().endswith(('.txt', '.md')):
+                with open(os.path.join(path, filename), "r", encoding="utf-8") as f:
+                    jobs.append((os.path.splitext(filename)[0], f.read().strip()))
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            for line_num, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                req_id = record.get("req_id", record.get("id", f"line-{line_num}"))
+                jobs.append((str(req_id), (record.get("description") or record.get("text") or "").strip()))
+    return [(req_id, text) for req_id, text in jobs if text]
+
+def write_results(path: str, rows: List[dict]):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    if path.endswith(".jsonl"):
+        with open(path, "w", encoding="utf-8") as f:
+            for row in rows:
+                f.write(json.dumps(row) + "\n")
+    else:
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=["req_id", "resume", "score", "rank", "aliases"])
+            writer.writeheader()
+            writer.writerows(rows)
+
+def main():
+    parser = argparse.ArgumentParser(description="Rank resumes against many job descriptions")
+    parser.add_argument("input", help="Directory of .txt/.md job descriptions or a JSONL file")
+    parser.add_argument("--output", default="data/matches.csv", help="Results file (.csv or .jsonl)")
+    parser.add_argument("--top-k", type=int, default=20)
+    parser.add_argument("--batch-size", type=int, default=64, help="Job descriptions embedded per batch")
+    parser.add_argument("--allow-stale", action="store_true",
+                        help="Rank against a stale saved index instead of waiting for the refresh")
+    parser.add_argument("--filter", default=None,
+                        help='Metadata constraints, e.g. "years >= 5 and location in (london, berlin)"')
+    args = parser.parse_args()
+
+    run_start = time.time()
+    jobs = load_job_descriptions(args.input)
+    if not jobs:
+        print(f"❌ No job descriptions found in {args.input}")
+        return
+    print(f"📋 Loaded {len(jobs)} job descriptions")
+
+    vector_store = vector_store_from_env()
+    warm_start = WarmStart(ResumeProcessor.from_env(), vector_store, IngestManifest(),
+                           batch_size=int(os.getenv("ATS_INGEST_BATCH_SIZE", "32")), dedup=DedupConfig.from_env())
+    warm_start.start()
+    if warm_start.refresh_thread is not None and not args.allow_stale:
+        print("⏳ Waiting for the index refresh to finish...")
+        warm_start.refresh_thread.join()
+    if not warm_start.ready:
+        print("❌ No valid resumes found in data/resumes/")
+        return
+
+    results = vector_store.search_batch([text for _, text in jobs], k=args.top_k, batch_size=args.batch_size,
+                                        filter=args.filter)
+
+    rows = []
+    for (req_id, _), hits in zip(jobs, results):
+        for rank, (doc, score) in enumerate(hits, 1):
+            rows.append({"req_id": req_id, "resume": doc.metadata["source"],
+                         "score": round(score, 4), "rank": rank,
+                         "aliases": ";".join(doc.metadata.get("aliases", []))})
+    write_results(args.output, rows)
+
+    total_time = time.time() - run_start
+    print(f"✅ Wrote {len(rows)} ranked matches for {len(jobs)} requisitions to {args.output}")
+    print(f"⏱️  Total time: {total_time:.2f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,328 @@
+"""Reproducible stage-by-stage benchmark on a synthetic resume corpus, with baseline comparison.
+
+Usage:
+    python benchmark.py --resumes 1000 --output data/bench/results.json
+    python benchmark.py --resumes 1000 --baseline data/bench/baseline.json --fail-on-regression
+    python benchmark.py --resumes 100000 --stages extract,index,search --workers 8
+
+Stages:
+    extract   ResumeProcessor extraction + cleaning of the generated PDF/DOCX files
+    index     embeddings model load, embedding and FAISS index build (VectorStore.add_documents)
+    search    VectorStore.search / hybrid_search latency percentiles and search_batch QPS
+    qa        QueryEngine.query end to end against a local fake Ollama (see fake_ollama.py),
+              or a real server with --ollama-url
+
+Index type, chunking, context packing etc. come from the usual ATS_* environment variables,
+and are recorded in the results so runs are only compared like for like. With --baseline,
+every latency (*_ms, *_seconds) and throughput (*_per_sec, qps) figure is compared and
+anything worse by more than --tolerance is reported as a regression.
+"""
+import os
+import sys
+import json
+import time
+import random
+import platform
+import argparse
+import subprocess
+import contextlib
+import numpy as np
+import faiss
+from typing import List, Optional
+from metrics import metrics
+from synthetic_corpus import generate_corpus, job_descriptions, TITLES
+from resume_processor import ResumeProcessor
+from vector_store import VectorStore
+from index_factory import IndexConfig, index_memory_bytes
+from chunk_index import ChunkConfig
+from embedding_backends import EmbeddingConfig
+from candidate_profiles import SKILLS
+from query_engine import QueryEngine
+from context_packer import ContextPacker
+from fake_ollama import FakeOllama
+
+STAGES = ("extract", "index", "search", "qa")
+
+@contextlib.contextmanager
+def quiet(enabled: bool = True):
+    """Silence per-call progress output so it neither floods the terminal nor skews timings."""
+    if not enabled:
+        yield
+        return
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+def latency_summary(seconds: List[float], prefix: str = "") -> dict:
+    ms = np.array(seconds) * 1000
+    return {
+        f"{prefix}p50_ms": float(np.percentile(ms, 50)),
+        f"{prefix}p95_ms": float(np.percentile(ms, 95)),
+        f"{prefix}p99_ms": float(np.percentile(ms, 99)),
+    }
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def bench_extract(folder: str, workers: int, verbose: bool) -> tuple:
+    metrics.reset()
+    processor = ResumeProcessor(folder, workers=workers)
+    processor.verbose = verbose
+    start = time.time()
+    with quiet(not verbose):
+        documents = []
+        for filename, text in processor.iter_resumes():
+            cleaned = processor.clean_text(text)
+            if cleaned and len(cleaned.strip()) > 50:
+                documents.append((filename, cleaned))
+    elapsed = time.time() - start
+    chars = sum(len(text) for _, text in documents)
+    result = {
+        "files": len(documents),
+        "workers": workers,
+        "total_seconds": elapsed,
+        "files_per_sec": len(documents) / elapsed if elapsed else 0.0,
+        "chars_per_sec": chars / elapsed if elapsed else 0.0,
+    }
+    pages = metrics.histogram("extract.pdf_page")
+    if pages.count:
+        result.update(latency_summary(list(pages.samples), "pdf_page_"))
+    return documents, result
+
+def bench_index(documents, batch_size: int, verbose: bool) -> tuple:
+    metrics.reset()
+    load_start = time.time()
+    with quiet(not verbose):
+        vector_store = VectorStore(cache_dir=None, index_config=IndexConfig.from_env(),
+                                   chunking=ChunkConfig.from_env(), embedding_config=EmbeddingConfig.from_env())
+    model_load = time.time() - load_start
+
+    start = time.time()
+    with quiet(not verbose):
+        for offset in range(0, len(documents), batch_size):
+            vector_store.add_documents(documents[offset:offset + batch_size])
+        vector_store.finalize_index()
+    elapsed = time.time() - start
+
+    embed = metrics.histogram("embed.documents").sum
+    build = metrics.histogram("index.add").sum + metrics.histogram("index.train").sum
+    index = vector_store.vector_store.index
+    result = {
+        "documents": index.ntotal,
+        "model_load_seconds": model_load,
+        "total_seconds": elapsed,
+        "embed_seconds": embed,
+        "build_seconds": build,
+        "embed_docs_per_sec": index.ntotal / embed if embed else 0.0,
+        "index_docs_per_sec": index.ntotal / elapsed if elapsed else 0.0,
+        "index_mb": index_memory_bytes(index) / 1e6,
+    }
+    if vector_store.chunking is not None:
+        result["chunks"] = vector_store.chunk_store.chunk_count
+        result["chunk_store_mb"] = vector_store.chunk_store.memory_bytes() / 1e6
+    return vector_store, result
+
+def bench_search(vector_store: VectorStore, queries: List[str], k: int, verbose: bool) -> dict:
+    result = {"queries": len(queries), "k": k}
+    with quiet(not verbose):
+        for query in queries[:5]:  # warm up the model and FAISS before timing
+            vector_store.search(query, k=k)
+
+        for name, search in (("vector", lambda q: vector_store.search(q, k=k)),
+                             ("hybrid", lambda q: vector_store.hybrid_search(q, k=k))):
+            latencies = []
+            for query in queries:
+                start = time.perf_counter()
+                search(query)
+                latencies.append(time.perf_counter() - start)
+            result.update(latency_summary(latencies, f"{name}_"))
+            result[f"{name}_qps"] = len(queries) / sum(latencies)
+
+        start = time.perf_counter()
+        vector_store.search_batch(queries, k=k)
+        result["batch_qps"] = len(queries) / (time.perf_counter() - start)
+    return result
+
+def qa_questions(count: int, seed: int = 2) -> List[str]:
+    # Open-ended on purpose: lookup questions would be answered by the profile fast path
+    rng = random.Random(seed)
+    return [f"Which candidate is the best fit for a {rng.choice(TITLES)} role using {rng.choice(list(SKILLS))}, and why?"
+            for _ in range(count)]
+
+def bench_qa(vector_store: VectorStore, questions: List[str], args) -> dict:
+    fake = None
+    if args.ollama_url:
+        os.environ["OLLAMA_BASE_URL"] = args.ollama_url
+    else:
+        fake = FakeOllama(token_latency=args.token_ms / 1000, first_token_latency=args.first_token_ms / 1000,
+                          tokens=args.answer_tokens).start()
+        os.environ["OLLAMA_BASE_URL"] = fake.url
+
+    try:
+        with quiet(not args.verbose):
+            engine = QueryEngine(vector_store, setup_model=False, answer_cache=None,
+                                 context_packer=ContextPacker.from_env(vector_store.embeddings),
+                                 profile_fast_path=False)
+            stats = []
+            for question in questions:
+                engine.query(question)
+                stats.append(dict(engine.last_query_stats))
+    finally:
+        if fake is not None:
+            fake.stop()
+
+    answered = [s for s in stats if "time_to_first_token" in s]
+    if not answered:
+        return {"questions": len(questions), "answered": 0}
+    result = {"questions": len(questions), "answered": len(answered),
+              "llm": args.ollama_url or f"fake ({args.first_token_ms:.0f}ms first token, {args.token_ms:.0f}ms/token)"}
+    result.update(latency_summary([s["time_to_first_token"] for s in answered], "ttft_"))
+    result.update(latency_summary([s["total_time"] for s in answered], "total_"))
+    result.update(latency_summary([s.get("retrieval_time", 0.0) for s in answered], "retrieval_"))
+    overhead = [s["time_to_first_token"] - s["prompt_eval_count"] / s["prompt_tokens_per_sec"]
+                for s in answered if "prompt_tokens_per_sec" in s]
+    if overhead:
+        # Everything before the first token that is not the LLM reading the prompt
+        result.update(latency_summary(overhead, "pre_llm_"))
+    rates = [s["eval_tokens_per_sec"] for s in answered if "eval_tokens_per_sec" in s]
+    if rates:
+        result["eval_tokens_per_sec"] = float(np.mean(rates))
+    return result
+
+def compare(results: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Print per-metric changes against the baseline and return the regressed metric names."""
+    if baseline.get("config") != results.get("config"):
+        print("⚠️  Baseline was recorded with a different configuration; comparing anyway")
+        for key in sorted(set(baseline.get("config", {})) | set(results.get("config", {}))):
+            if baseline.get("config", {}).get(key) != results.get("config", {}).get(key):
+                print(f"   {key}: {baseline.get('config', {}).get(key)} → {results.get('config', {}).get(key)}")
+
+    regressions = []
+    print(f"\n{'metric':<34} {'baseline':>12} {'current':>12} {'change':>9}")
+    for stage, values in results["stages"].items():
+        for name, current in values.items():
+            before = baseline.get("stages", {}).get(stage, {}).get(name)
+            if not isinstance(current, (int, float)) or not isinstance(before, (int, float)) or not before:
+                continue
+            if name.endswith(("_ms", "_seconds")):
+                worse = (current - before) / before
+            elif name.endswith(("_per_sec", "qps")):
+                worse = (before - current) / before
+            else:
+                continue
+            flag = ""
+            if worse > tolerance:
+                flag = " ❌"
+                regressions.append(f"{stage}.{name}")
+            elif worse < -tolerance:
+                flag = " ✅"
+            change = (current - before) / before * 100
+            print(f"{stage + '.' + name:<34} {before:>12.3f} {current:>12.3f} {change:>+8.1f}%{flag}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark extraction, indexing, search and Q&A on a synthetic corpus")
+    parser.add_argument("--resumes", type=int, default=1000, help="Synthetic corpus size")
+    parser.add_argument("--corpus-dir", default=None, help="Default data/bench/resumes_<N>")
+    parser.add_argument("--docx-fraction", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--stages", default=",".join(STAGES))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("ATS_EXTRACT_WORKERS", "1")))
+    parser.add_argument("--batch-size", type=int, default=int(os.getenv("ATS_INGEST_BATCH_SIZE", "32")))
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--questions", type=int, default=10)
+    parser.add_argument("--ollama-url", default=None, help="Benchmark a real Ollama instead of the fake one")
+    parser.add_argument("--first-token-ms", type=float, default=300)
+    parser.add_argument("--token-ms", type=float, default=20)
+    parser.add_argument("--answer-tokens", type=int, default=60)
+    parser.add_argument("--output", default="data/bench/results.json")
+    parser.add_argument("--baseline", default=None, help="Results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed relative slowdown")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    parser.add_argument("--verbose", action="store_true", help="Keep the usual per-file / per-call output")
+    args = parser.parse_args()
+
+    stages = [stage.strip() for stage in args.stages.split(",") if stage.strip()]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        raise SystemExit(f"❌ Unknown stages: {', '.join(sorted(unknown))}")
+    if not args.verbose:
+        metrics.log_format = "quiet"
+
+    folder = args.corpus_dir or f"data/bench/resumes_{args.resumes}"
+    generate_corpus(folder, args.resumes, args.docx_fraction, args.seed)
+
+    chunking = ChunkConfig.from_env()
+    results = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "numpy": np.__version__,
+            "faiss": faiss.__version__,
+        },
+        "config": {
+            "resumes": args.resumes,
+            "docx_fraction": args.docx_fraction,
+            "seed": args.seed,
+            "workers": args.workers,
+            "batch_size": args.batch_size,
+            "index": IndexConfig.from_env().describe(),
+            "embedding": EmbeddingConfig.from_env().describe(),
+            "chunking": chunking.describe() if chunking is not None else None,
+            "context_packing": os.getenv("ATS_CONTEXT_PACKING", "1") == "1",
+        },
+        "stages": {},
+    }
+
+    print(f"📏 Benchmarking {', '.join(stages)} on {args.resumes:,} synthetic resumes")
+    # Every stage needs the extracted text; only the requested stages are reported
+    documents, extract = bench_extract(folder, args.workers, args.verbose)
+    if "extract" in stages:
+        results["stages"]["extract"] = extract
+        print(f"📄 extract: {extract['files']:,} files at {extract['files_per_sec']:.1f} files/s")
+    vector_store = None
+    if any(stage in stages for stage in ("index", "search", "qa")):
+        vector_store, index = bench_index(documents, args.batch_size, args.verbose)
+        if "index" in stages:
+            results["stages"]["index"] = index
+            print(f"🗃️  index: {index['documents']:,} docs, embed {index['embed_docs_per_sec']:.1f} docs/s, "
+                  f"build {index['build_seconds']:.2f}s, {index['index_mb']:.1f}MB")
+    if "search" in stages:
+        search = bench_search(vector_store, job_descriptions(args.queries, seed=args.seed + 1), args.k, args.verbose)
+        results["stages"]["search"] = search
+        print(f"🔍 search: vector p50 {search['vector_p50_ms']:.2f}ms p99 {search['vector_p99_ms']:.2f}ms, "
+              f"hybrid p50 {search['hybrid_p50_ms']:.2f}ms, batch {search['batch_qps']:.0f} QPS")
+    if "qa" in stages:
+        qa = bench_qa(vector_store, qa_questions(args.questions, seed=args.seed + 2), args)
+        results["stages"]["qa"] = qa
+        if qa.get("answered"):
+            print(f"💬 qa: time to first token p50 {qa['ttft_p50_ms']:.0f}ms, total p50 {qa['total_p50_ms']:.0f}ms "
+                  f"({qa['answered']}/{qa['questions']} answered)")
+        else:
+            print("💬 qa: no answers (is the LLM reachable?)")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"💾 Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+            if args.fail_on_regression:
+                sys.exit(1)
+        else:
+            print(f"\n✅ No regressions beyond {args.tolerance:.0%}")
+
+if __name__ == "__main__":
+    main()
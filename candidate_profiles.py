@@ -0,0 +1,250 @@
+import os
+import re
+import json
+from collections import defaultdict
+from typing import Dict, List, Optional, Set
+from metadata_index import DEGREE_LEVELS, extract_fields
+
+# Canonical skill -> aliases as they appear in resumes and questions
+SKILLS = {
+    "python": ["python"], "java": ["java"], "javascript": ["javascript", "js", "ecmascript"],
+    "typescript": ["typescript"], "go": ["golang", "go lang"], "rust": ["rust"], "c++": ["c++", "cpp"],
+    "c#": ["c#", "csharp", ".net", "dotnet"], "ruby": ["ruby", "rails", "ruby on rails"],
+    "php": ["php", "laravel"], "scala": ["scala"], "kotlin": ["kotlin"], "swift": ["swift"],
+    "r": ["r programming", "rstudio"], "sql": ["sql", "mysql", "postgresql", "postgres", "sqlite", "t-sql"],
+    "nosql": ["nosql", "mongodb", "cassandra", "dynamodb", "couchdb"], "redis": ["redis"],
+    "react": ["react", "react.js", "reactjs"], "angular": ["angular", "angularjs"], "vue": ["vue", "vue.js"],
+    "node.js": ["node.js", "nodejs", "node"], "django": ["django"], "flask": ["flask"],
+    "fastapi": ["fastapi"], "spring": ["spring boot", "spring framework"], "html/css": ["html", "css"],
+    "aws": ["aws", "amazon web services", "ec2", "s3", "lambda"], "azure": ["azure"],
+    "gcp": ["gcp", "google cloud"], "docker": ["docker"], "kubernetes": ["kubernetes", "k8s"],
+    "terraform": ["terraform"], "ansible": ["ansible"], "ci/cd": ["ci/cd", "jenkins", "github actions", "gitlab ci"],
+    "linux": ["linux", "unix", "bash"], "git": ["git"], "kafka": ["kafka"], "spark": ["spark", "pyspark"],
+    "hadoop": ["hadoop"], "airflow": ["airflow"], "machine learning": ["machine learning", "ml"],
+    "deep learning": ["deep learning", "neural networks"], "nlp": ["nlp", "natural language processing"],
+    "computer vision": ["computer vision", "opencv"], "tensorflow": ["tensorflow"], "pytorch": ["pytorch"],
+    "scikit-learn": ["scikit-learn", "sklearn"], "pandas": ["pandas"], "data analysis": ["data analysis", "data analytics"],
+    "tableau": ["tableau"], "power bi": ["power bi", "powerbi"], "excel": ["excel"],
+    "agile": ["agile", "scrum", "kanban"], "project management": ["project management", "pmp"],
+    "figma": ["figma"], "graphql": ["graphql"], "rest": ["rest api", "rest apis", "restful"],
+    "microservices": ["microservices"], "security": ["cybersecurity", "security", "penetration testing"],
+}
+
+_SKILL_PATTERNS = {
+    skill: re.compile(r"(?<![\w+#.])(?:" + "|".join(re.escape(alias) for alias in aliases) + r")(?![\w+#])", re.I)
+    for skill, aliases in SKILLS.items()
+}
+_TITLE_PATTERN = re.compile(
+    r"\b((?:senior|junior|lead|principal|staff|chief|head of)?[ \t]*(?:[a-z]+[ \t]){0,2}?"
+    r"(?:engineer|developer|architect|manager|analyst|scientist|designer|consultant|administrator|director))\b",
+    re.I)
+_EMAIL_PATTERN = re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+")
+_PHONE_PATTERN = re.compile(r"(?:\+?\d[\d\s().-]{7,}\d)")
+_NAME_WORD = re.compile(r"^[A-Z][\w'.-]*$")
+_NAME_PARTICLES = {"van", "von", "der", "den", "de", "del", "della", "di", "da", "du", "la", "le", "bin", "al"}
+_TITLE_NOUNS = {"engineer", "developer", "architect", "manager", "analyst", "scientist", "designer",
+                "consultant", "administrator", "director"}
+_NOT_NAME = _TITLE_NOUNS | {"senior", "junior", "lead", "principal", "staff", "chief", "head", "resume", "cv",
+                            "curriculum", "summary", "profile", "objective", "contact", "location", "experience",
+                            "experienced", "education", "skills", "address"}
+_SKILL_YEARS_PATTERN = re.compile(r"(\d{1,2})\+?\s*(?:years?|yrs?)\s+(?:of\s+)?(?:experience\s+(?:with|in)\s+)?([\w+#/-]+(?:[ .][\w+#/-]+){0,3})", re.I)
+
+def find_skills(text: str) -> List[str]:
+    return [skill for skill, pattern in _SKILL_PATTERNS.items() if pattern.search(text)]
+
+def mentions_skill(skill: str, text: str) -> bool:
+    return bool(_SKILL_PATTERNS[skill].search(text))
+
+def leading_name(text: str) -> Optional[str]:
+    """The candidate name a resume opens with, from raw or whitespace-collapsed text."""
+    first_line = next((line.strip() for line in text.splitlines() if line.strip()), "")
+    if first_line and len(first_line.split()) <= 4 and not _EMAIL_PATTERN.search(first_line):
+        return first_line
+    # Cleaned text is a single line, so take the capitalized words it starts with instead
+    words = first_line.split()
+    name = []
+    for word in words[:4]:
+        stripped = word.strip(",|")
+        if stripped.lower() in _NOT_NAME or stripped.endswith(":"):
+            break
+        if not (_NAME_WORD.match(stripped) or (name and stripped in _NAME_PARTICLES)):
+            break
+        name.append(stripped)
+        if stripped != word:
+            break
+    if len(name) > 2 and len(words) > len(name) and words[len(name)].lower() in _TITLE_NOUNS:
+        name.pop()  # "Jane Doe Software Engineer": the last word belongs to the title
+    while name and name[-1] in _NAME_PARTICLES:
+        name.pop()
+    return " ".join(name) or None
+
+def extract_profile(source: str, text: str) -> dict:
+    """Structured profile of one resume: contact, titles, skills, years and education."""
+    fields = extract_fields(text)
+    name = leading_name(text)
+    email = _EMAIL_PATTERN.search(text)
+    phone = _PHONE_PATTERN.search(text)
+
+    titles = []
+    for match in _TITLE_PATTERN.finditer(text[:3000]):
+        title = " ".join(match.group(1).split()).title()
+        if title not in titles:
+            titles.append(title)
+
+    skill_years = {}
+    for years, phrase in _SKILL_YEARS_PATTERN.findall(text):
+        for skill in find_skills(phrase):
+            skill_years[skill] = max(skill_years.get(skill, 0), int(years))
+
+    return {
+        "source": source,
+        "name": name,
+        "email": email.group(0) if email else None,
+        "phone": " ".join(phone.group(0).split()) if phone else None,
+        "titles": titles[:5],
+        "skills": find_skills(text),
+        "skill_years": skill_years,
+        "years": fields["years"],
+        "degree": fields["degree"],
+        "location": fields["location"],
+    }
+
+_OPEN_ENDED = re.compile(r"\b(why|how (?:well|good|would|does|do|did)|compare|best|better|strongest|weakest|"
+                         r"recommend|summari[sz]e|describe|explain|tell me about|rank|fit|suitable)\b", re.I)
+_WHO_PATTERN = re.compile(r"^\s*(?:who|which (?:candidates?|people|applicants?|resumes?)|list (?:the )?(?:candidates?|people))\b", re.I)
+_YEARS_QUESTION = re.compile(r"\b(?:how many years|years of)\b", re.I)
+_CONTACT_QUESTION = re.compile(r"\b(email|e-mail|phone|contact)\b", re.I)
+_DEGREE_WORDS = {
+    "phd": re.compile(r"\b(ph\.?d|doctorate)", re.I),
+    "master": re.compile(r"\b(master'?s?|msc|mba)\b", re.I),
+    "bachelor": re.compile(r"\b(bachelor'?s?|bsc|undergraduate degree)\b", re.I),
+    "associate": re.compile(r"\bassociate'?s? degree\b", re.I),
+}
+
+class ProfileIndex:
+    """Candidate profiles with a skill -> sources inverted index, answering common question shapes."""
+
+    def __init__(self):
+        self.profiles: Dict[str, dict] = {}
+        self.by_skill: Dict[str, Set[str]] = defaultdict(set)
+
+    def __len__(self) -> int:
+        return len(self.profiles)
+
+    def add(self, source: str, text: str):
+        self.remove(source)
+        profile = extract_profile(source, text)
+        self.profiles[source] = profile
+        for skill in profile["skills"]:
+            self.by_skill[skill].add(source)
+
+    def remove(self, source: str):
+        profile = self.profiles.pop(source, None)
+        if profile is None:
+            return
+        for skill in profile["skills"]:
+            self.by_skill[skill].discard(source)
+
+    def extend(self, other: "ProfileIndex"):
+        """Merge another index's profiles into this one, e.g. one per shard."""
+        for source, profile in other.profiles.items():
+            self.remove(source)
+            self.profiles[source] = profile
+            for skill in profile["skills"]:
+                self.by_skill[skill].add(source)
+
+    def save(self, folder_path: str):
+        os.makedirs(folder_path, exist_ok=True)
+        with open(os.path.join(folder_path, "profiles.json"), "w") as f:
+            json.dump(list(self.profiles.values()), f)
+
+    @classmethod
+    def load(cls, folder_path: str) -> Optional["ProfileIndex"]:
+        path = os.path.join(folder_path, "profiles.json")
+        if not os.path.exists(path):
+            return None
+        index = cls()
+        with open(path, "r") as f:
+            for profile in json.load(f):
+                index.profiles[profile["source"]] = profile
+                for skill in profile["skills"]:
+                    index.by_skill[skill].add(profile["source"])
+        return index
+
+    def _label(self, source: str) -> str:
+        name = self.profiles[source].get("name")
+        return f"{name} ({source})" if name else source
+
+    def answer(self, question: str) -> Optional[str]:
+        """Answer skill, years, degree and contact lookups directly; None for anything open-ended."""
+        if not self.profiles or _OPEN_ENDED.search(question):
+            return None
+        skills = find_skills(question)
+
+        if _CONTACT_QUESTION.search(question):
+            return self._answer_contact(question)
+        if _YEARS_QUESTION.search(question):
+            return self._answer_years(skills)
+        if not _WHO_PATTERN.search(question):
+            return None
+        for level, pattern in _DEGREE_WORDS.items():
+            if pattern.search(question) and not skills:
+                return self._answer_degree(level)
+        if skills:
+            return self._answer_skills(skills, any_of=bool(re.search(r"\bor\b", question, re.I)))
+        return None
+
+    def _answer_skills(self, skills: List[str], any_of: bool) -> str:
+        sets = [self.by_skill.get(skill, set()) for skill in skills]
+        sources = set().union(*sets) if any_of else set.intersection(*sets)
+        wanted = f" {'or' if any_of else 'and'} ".join(skills)
+        if not sources:
+            return f"No candidates mention {wanted}."
+        lines = []
+        for source in sorted(sources):
+            years = [f"{skill}: {self.profiles[source]['skill_years'][skill]} yrs" for skill in skills
+                     if skill in self.profiles[source]["skill_years"]]
+            lines.append(f"- {self._label(source)}" + (f" ({', '.join(years)})" if years else ""))
+        return f"{len(sources)} candidate(s) mention {wanted}:\n" + "\n".join(lines)
+
+    def _answer_years(self, skills: List[str]) -> Optional[str]:
+        rows = []
+        for source, profile in sorted(self.profiles.items()):
+            if skills:
+                known = [(skill, profile["skill_years"].get(skill)) for skill in skills if source in self.by_skill.get(skill, ())]
+                if len(known) < len(skills):
+                    continue
+                detail = ", ".join(f"{skill}: {years} yrs" if years is not None else f"{skill}: years not stated"
+                                   for skill, years in known)
+                sort_key = max((years or 0) for _, years in known)
+            else:
+                if profile["years"] is None:
+                    continue
+                detail = f"{profile['years']} yrs total"
+                sort_key = profile["years"]
+            rows.append((sort_key, f"- {self._label(source)}: {detail}"))
+        if not rows:
+            return None
+        rows.sort(key=lambda row: -row[0])
+        return "Experience from the resumes:\n" + "\n".join(line for _, line in rows)
+
+    def _answer_degree(self, level: str) -> str:
+        minimum = DEGREE_LEVELS[level]
+        matches = [f"- {self._label(source)}: {profile['degree']}" for source, profile in sorted(self.profiles.items())
+                   if DEGREE_LEVELS.get(profile["degree"], 0) >= minimum]
+        if not matches:
+            return f"No candidates list a {level}'s degree or higher."
+        return f"{len(matches)} candidate(s) with a {level} degree or higher:\n" + "\n".join(matches)
+
+    def _answer_contact(self, question: str) -> Optional[str]:
+        lowered = question.lower()
+        for source, profile in self.profiles.items():
+            names = [source.lower(), os.path.splitext(source)[0].lower()]
+            if profile.get("name"):
+                names += [profile["name"].lower()] + [part for part in profile["name"].lower().split() if len(part) > 2]
+            if any(name and name in lowered for name in names):
+                contact = [value for value in (profile.get("email"), profile.get("phone")) if value]
+                if not contact:
+                    return f"No contact details found in {self._label(source)}."
+                return f"{self._label(source)}: {', '.join(contact)}"
+        return None
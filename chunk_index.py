@@ -0,0 +1,165 @@
+import os
+import math
+import threading
+import numpy as np
+from typing import List, Optional
+
+class ChunkConfig:
+    """How resumes are split into overlapping sections for chunk-level matching.
+
+    The embeddings model only reads ~256 word pieces (~1000 chars), so a resume embedded as one
+    vector is effectively ranked on its first section. Each resume is instead split into
+    chunks of chunk_chars with overlap, at most max_chunks per resume (overlap and then chunk
+    size grow for very long resumes), and resumes are ranked by aggregating their chunk scores:
+    aggregate="max" takes the best chunk, "top_n" the mean of the best top_n chunks.
+    """
+
+    def __init__(self, chunk_chars: int = 1000, overlap: int = 200, max_chunks: int = 8,
+                 aggregate: str = "max", top_n: int = 2, candidates: int = 100):
+        if aggregate not in ("max", "top_n"):
+            raise ValueError(f"Unknown chunk aggregate '{aggregate}', expected 'max' or 'top_n'")
+        self.chunk_chars = chunk_chars
+        self.overlap = overlap
+        self.max_chunks = max_chunks
+        self.aggregate = aggregate
+        self.top_n = top_n
+        self.candidates = candidates
+
+    @classmethod
+    def from_env(cls) -> Optional["ChunkConfig"]:
+        if os.getenv("ATS_CHUNKING", "1") == "0":
+            return None
+        return cls(
+            chunk_chars=int(os.getenv("ATS_CHUNK_CHARS", "1000")),
+            overlap=int(os.getenv("ATS_CHUNK_OVERLAP", "200")),
+            max_chunks=int(os.getenv("ATS_MAX_CHUNKS", "8")),
+            aggregate=os.getenv("ATS_CHUNK_AGGREGATE", "max"),
+            top_n=int(os.getenv("ATS_CHUNK_TOP_N", "2")),
+            candidates=int(os.getenv("ATS_CHUNK_CANDIDATES", "100")),
+        )
+
+    def describe(self) -> str:
+        """Identifies the stored chunk layout; changing it makes a saved index stale."""
+        return f"{self.chunk_chars}/{self.overlap}/{self.max_chunks}"
+
+def split_into_chunks(text: str, chunk_chars: int = 1000, overlap: int = 200, max_chunks: int = 8) -> List[str]:
+    """Overlapping sections covering the whole text, cut at whitespace where possible."""
+    text = text.strip()
+    if len(text) <= chunk_chars:
+        return [text]
+    step = chunk_chars - overlap
+    if math.ceil((len(text) - overlap) / step) > max_chunks:
+        overlap = 0
+        chunk_chars = max(chunk_chars, math.ceil(len(text) / max_chunks))
+        step = chunk_chars
+
+    chunks = []
+    start = 0
+    while start < len(text) and len(chunks) < max_chunks:
+        end = min(len(text), start + chunk_chars)
+        if end < len(text):
+            cut = text.rfind(" ", start + step // 2, end)
+            end = cut if cut > 0 else end
+        chunks.append(text[start:end].strip())
+        if end >= len(text):
+            break
+        start = max(end - overlap, start + 1)
+    return [chunk for chunk in chunks if chunk]
+
+class ChunkStore:
+    """Chunk vectors of every indexed resume, aligned with the FAISS row id of their parent.
+
+    Vectors are int8 with one float32 scale per chunk (~388 bytes vs 1536 for a float32
+    384-d vector). Parent rows own a contiguous slice of chunks: starts[row]..starts[row + 1].
+    """
+
+    def __init__(self):
+        self.codes = np.zeros((0, 0), dtype=np.int8)
+        self.scales = np.zeros(0, dtype=np.float32)
+        self.starts = np.zeros(1, dtype=np.int64)
+        # Appended parents are buffered and folded into the arrays on first read, so streaming
+        # ingest does not copy the whole store on every batch
+        self._pending = []
+        self._pending_chunks = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Number of parent rows."""
+        return len(self.starts) - 1 + len(self._pending)
+
+    @property
+    def chunk_count(self) -> int:
+        return int(self.starts[-1]) + self._pending_chunks
+
+    def append(self, chunk_vectors: List[np.ndarray]):
+        """Append one (n_chunks, dim) matrix per parent, in FAISS row order."""
+        quantized = []
+        for matrix in chunk_vectors:
+            matrix = np.asarray(matrix, dtype=np.float32)
+            scales = np.abs(matrix).max(axis=1) / 127.0
+            scales[scales == 0] = 1.0
+            quantized.append((np.round(matrix / scales[:, None]).astype(np.int8), scales.astype(np.float32)))
+        with self._lock:
+            self._pending.extend(quantized)
+            self._pending_chunks += sum(len(scales) for _, scales in quantized)
+
+    def _consolidate(self):
+        with self._lock:
+            if not self._pending:
+                return
+            codes = [self.codes] if len(self.codes) else []
+            counts = np.array([len(s) for _, s in self._pending], dtype=np.int64)
+            self.codes = np.concatenate(codes + [c for c, _ in self._pending])
+            self.scales = np.concatenate([self.scales] + [s for _, s in self._pending])
+            self.starts = np.concatenate([self.starts, self.starts[-1] + np.cumsum(counts)])
+            self._pending = []
+            self._pending_chunks = 0
+
+    def memory_bytes(self) -> int:
+        self._consolidate()
+        return int(self.codes.nbytes + self.scales.nbytes + self.starts.nbytes)
+
+    def scores(self, query_vector: np.ndarray, parent_ids: np.ndarray, aggregate: str = "max",
+               top_n: int = 2) -> np.ndarray:
+        """Aggregated cosine similarity of each parent's chunks to one query, vectorized."""
+        self._consolidate()
+        parent_ids = np.asarray(parent_ids, dtype=np.int64)
+        starts = self.starts[parent_ids]
+        counts = self.starts[parent_ids + 1] - starts
+        width = int(counts.max()) if len(counts) else 0
+        if width == 0:
+            return np.full(len(parent_ids), -np.inf, dtype=np.float32)
+
+        # Pad every parent's chunks into a (parents, width) grid of chunk rows
+        offsets = np.arange(width)[None, :]
+        valid = offsets < counts[:, None]
+        rows = (starts[:, None] + offsets)[valid]
+        chunk_scores = (self.codes[rows].astype(np.float32) @ query_vector) * self.scales[rows]
+        grid = np.full((len(parent_ids), width), -np.inf, dtype=np.float32)
+        grid[valid] = chunk_scores
+
+        if aggregate == "max" or width == 1:
+            return grid.max(axis=1)
+        n = np.minimum(counts, top_n)
+        best = -np.sort(-grid, axis=1)[:, :top_n]
+        best[np.arange(top_n)[None, :] >= n[:, None]] = 0.0
+        return best.sum(axis=1) / n
+
+    def save(self, folder_path: str):
+        self._consolidate()
+        np.save(os.path.join(folder_path, "chunk_codes.npy"), self.codes)
+        np.save(os.path.join(folder_path, "chunk_scales.npy"), self.scales)
+        np.save(os.path.join(folder_path, "chunk_starts.npy"), self.starts)
+
+    @classmethod
+    def load(cls, folder_path: str, expected_rows: int) -> Optional["ChunkStore"]:
+        paths = [os.path.join(folder_path, f"chunk_{name}.npy") for name in ("codes", "scales", "starts")]
+        if not all(os.path.exists(path) for path in paths):
+            return None
+        store = cls()
+        store.codes = np.load(paths[0], mmap_mode="r")
+        store.scales = np.load(paths[1])
+        store.starts = np.load(paths[2])
+        if len(store) != expected_rows:
+            return None
+        return store
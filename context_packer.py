@@ -0,0 +1,127 @@
+import os
+import re
+import time
+import numpy as np
+from collections import defaultdict
+from typing import List, Optional
+from langchain.schema import Document
+from metrics import metrics
+
+# Llama2's tokenizer averages roughly 4 characters per token on English resume text
+CHARS_PER_TOKEN = 4
+
+_HEADINGS = (r"(?:(?:Work|Professional|Technical|Core)\s)?(?:Experience|Employment|Education|Skills|Projects"
+             r"|Certifications|Summary|Profile|Objective|Languages|Awards|Publications)")
+
+# Stored resume text has been through ResumeProcessor.clean_text, which folds newlines into
+# single spaces, so breaks are also found from what survives that: bullet glyphs, inlined dash
+# bullets, sentence ends and section headings.
+_SPAN_BREAK = re.compile(rf"""
+    \n\s*\n | \n(?=\s*[-•*▪●]\s) | \n                     # line structure, where the text still has it
+    | \s*[•▪●◦‣]\s*                                     # bullet glyphs
+    | (?<=[^\d\s])\s+(?=[-–*]\s+[A-Z])                    # "... by 8%. - Automated", not "2019 - Present"
+    | (?<=[.!?;])\s+(?=[-–*]?\s*[A-Z0-9(])                 # sentence ends
+    | (?<=[^\s])\s+(?=(?i:{_HEADINGS})(?::|\s+[A-Z]))      # "... Experience Security Analyst, Hooli"
+""", re.X)
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+def split_spans(text: str, min_chars: int = 40, max_chars: int = 400) -> List[str]:
+    """Split resume text into sentence/bullet sized spans, merging fragments shorter than min_chars."""
+    spans = []
+    current = ""
+    for piece in _SPAN_BREAK.split(text):
+        piece = " ".join(piece.split())
+        if not piece:
+            continue
+        current = f"{current} {piece}" if current else piece
+        if len(current) >= min_chars:
+            while len(current) > max_chars:
+                cut = current.rfind(" ", 0, max_chars)
+                cut = cut if cut > min_chars else max_chars
+                spans.append(current[:cut])
+                current = current[cut:].lstrip()
+            spans.append(current)
+            current = ""
+    if current:
+        if spans and len(current) < min_chars:
+            spans[-1] = f"{spans[-1]} {current}"
+        else:
+            spans.append(current)
+    return spans
+
+class ContextPacker:
+    """Fill a prompt token budget with the retrieved resume spans most relevant to the question.
+
+    Spans are scored by cosine similarity to the question using the already loaded embeddings
+    model (span embeddings go through the embedding cache, so repeat questions over the same
+    resumes only embed the question). Every retrieved resume keeps its best span, the remaining
+    budget goes to the highest scoring spans, and each resume's spans are emitted in their
+    original order under a source label.
+    """
+
+    def __init__(self, embeddings, token_budget: int = 800, max_span_chars: int = 400):
+        self.embeddings = embeddings
+        self.token_budget = token_budget
+        self.max_span_chars = max_span_chars
+
+    @classmethod
+    def from_env(cls, embeddings) -> Optional["ContextPacker"]:
+        if os.getenv("ATS_CONTEXT_PACKING", "1") == "0":
+            return None
+        return cls(embeddings, token_budget=int(os.getenv("ATS_CONTEXT_TOKENS", "800")))
+
+    def pack(self, question: str, docs: List[Document]) -> List[Document]:
+        if not docs:
+            return docs
+        pack_start = time.time()
+        tokens_before = sum(estimate_tokens(doc.page_content) for doc in docs)
+
+        spans = []  # (doc index, position in doc, text)
+        for doc_index, doc in enumerate(docs):
+            for position, span in enumerate(split_spans(doc.page_content, max_chars=self.max_span_chars)):
+                spans.append((doc_index, position, span))
+        if not spans:
+            return docs
+
+        question_vector = np.asarray(self.embeddings.embed_query(question), dtype=np.float32)
+        span_vectors = np.asarray(self.embeddings.embed_documents([span for _, _, span in spans]),
+                                  dtype=np.float32)
+        scores = span_vectors @ question_vector
+
+        order = np.argsort(-scores, kind="stable")
+        best_per_doc = {}
+        for i in order:
+            best_per_doc.setdefault(spans[i][0], i)
+        chosen = set(best_per_doc.values())
+        budget = self.token_budget - sum(estimate_tokens(spans[i][2]) + 1 for i in chosen)
+        for i in order:
+            cost = estimate_tokens(spans[i][2]) + 1
+            if i not in chosen and cost <= budget:
+                chosen.add(i)
+                budget -= cost
+
+        selected = defaultdict(list)
+        for i in sorted(chosen, key=lambda i: (spans[i][0], spans[i][1])):
+            selected[spans[i][0]].append(spans[i][2])
+
+        packed = []
+        for doc_index, doc in enumerate(docs):
+            if doc_index in selected:
+                source = doc.metadata.get("source", f"resume {doc_index + 1}")
+                content = f"[Resume: {source}]\n" + "\n".join(selected[doc_index])
+                packed.append(Document(page_content=content,
+                                       metadata=dict(doc.metadata, packed_spans=len(selected[doc_index]))))
+
+        tokens_after = sum(estimate_tokens(doc.page_content) for doc in packed)
+        # Recorded in every log format: the before/after totals are what justify the token budget
+        metrics.inc("context.packs")
+        metrics.inc("context.tokens_before", tokens_before)
+        metrics.inc("context.tokens_after", tokens_after)
+        metrics.event("context.pack", tokens_before=tokens_before, tokens_after=tokens_after,
+                      spans=len(spans), chosen=len(chosen), token_budget=self.token_budget)
+        if metrics.verbose:
+            print(f"🧩 Context packing: ~{tokens_before:,} → ~{tokens_after:,} prompt tokens "
+                  f"({len(chosen)}/{len(spans)} spans, {(time.time() - pack_start)*1000:.0f}ms)")
+        return packed
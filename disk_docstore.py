@@ -0,0 +1,135 @@
+import os
+import json
+import sqlite3
+import tempfile
+import threading
+from typing import Dict, List, Optional, Union
+from langchain.schema import Document
+from langchain_community.docstore.base import AddableMixin, Docstore
+
+DOCSTORE_FILE = "docstore.sqlite"
+
+class DiskDocstore(Docstore, AddableMixin):
+    """LangChain docstore keeping resume text and metadata in SQLite, read only for the hits returned.
+
+    A store built in this process writes straight to a temporary database it owns. A store opened
+    from a saved index never modifies that file until it is saved over it: documents added in the
+    meantime (watch mode, shard updates) are kept in memory, so saved index versions stay intact
+    for other processes reading them.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.owned = path is None
+        if path is None:
+            handle, path = tempfile.mkstemp(prefix="ats-docstore-", suffix=".sqlite")
+            os.close(handle)
+        self.path = path
+        self.pending: Dict[str, Document] = {}
+        self._lock = threading.Lock()
+        if self.owned:
+            self._create(path)
+        self._db = self._connect()
+
+    @staticmethod
+    def _create(path: str):
+        with sqlite3.connect(path) as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS docs "
+                         "(id TEXT PRIMARY KEY, source TEXT, page_content TEXT, metadata TEXT)")
+
+    @classmethod
+    def open(cls, folder_path: str) -> Optional["DiskDocstore"]:
+        path = os.path.join(folder_path, DOCSTORE_FILE)
+        return cls(path) if os.path.exists(path) else None
+
+    def _connect(self) -> sqlite3.Connection:
+        """Opened once and shared by all threads: the open file stays readable even after a later
+        save renames a new index over it or retires its folder."""
+        uri = f"file:{self.path}" + ("" if self.owned else "?mode=ro")
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        self._inode = os.stat(self.path).st_ino
+        return conn
+
+    def _query(self, sql: str, params: tuple = ()) -> list:
+        with self._lock:
+            return self._db.execute(sql, params).fetchall()
+
+    def search(self, search: str) -> Union[str, Document]:
+        doc = self.pending.get(search)
+        if doc is not None:
+            return doc
+        rows = self._query("SELECT page_content, metadata FROM docs WHERE id = ?", (search,))
+        row = rows[0] if rows else None
+        if row is None:
+            return f"ID {search} not found."
+        return Document(page_content=row[0], metadata=json.loads(row[1]))
+
+    def add(self, texts: Dict[str, Document]) -> None:
+        """Insert or replace documents by id."""
+        if not self.owned:
+            self.pending.update(texts)
+            return
+        with self._lock:
+            self._write(self._db, texts)
+
+    @staticmethod
+    def _write(conn: sqlite3.Connection, texts: Dict[str, Document]):
+        conn.executemany("INSERT OR REPLACE INTO docs VALUES (?, ?, ?, ?)",
+                         [(doc_id, doc.metadata.get("source"), doc.page_content, json.dumps(doc.metadata))
+                          for doc_id, doc in texts.items()])
+        conn.commit()
+
+    def delete(self, ids: List) -> None:
+        for doc_id in ids:
+            self.pending.pop(doc_id, None)
+        if self.owned:
+            with self._lock:
+                self._db.executemany("DELETE FROM docs WHERE id = ?", [(doc_id,) for doc_id in ids])
+                self._db.commit()
+
+    def sources(self) -> Dict[str, str]:
+        """docstore id -> resume source, without reading any resume text."""
+        mapping = dict(self._query("SELECT id, source FROM docs"))
+        mapping.update((doc_id, doc.metadata.get("source")) for doc_id, doc in self.pending.items())
+        return mapping
+
+    def __len__(self) -> int:
+        return self._query("SELECT COUNT(*) FROM docs")[0][0] + len(self.pending)
+
+    def _is_open(self, path: str) -> bool:
+        """Whether path is still the very file this store has open, not one renamed over it."""
+        return (not self.owned and os.path.abspath(path) == os.path.abspath(self.path)
+                and os.path.exists(path) and os.stat(path).st_ino == self._inode)
+
+    def save(self, folder_path: str):
+        """Write every document to folder_path/docstore.sqlite and continue from that file."""
+        target = os.path.join(folder_path, DOCSTORE_FILE)
+        with self._lock:
+            if self._is_open(target):
+                # Only documents added since loading are new; append them in place
+                conn = sqlite3.connect(target)
+                self._write(conn, self.pending)
+                conn.close()
+            else:
+                tmp_path = target + ".tmp"
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                conn = sqlite3.connect(tmp_path)
+                self._db.backup(conn)
+                self._write(conn, self.pending)
+                conn.close()
+                os.replace(tmp_path, target)
+                self._db.close()
+                if self.owned:
+                    os.remove(self.path)
+                self.owned = False
+                self.path = target
+                self._db = self._connect()
+            self.pending = {}
+
+    def __del__(self):
+        if getattr(self, "owned", False) and os.path.exists(self.path):
+            try:
+                self._db.close()
+                os.remove(self.path)
+            except OSError:
+                pass
@@ -0,0 +1,162 @@
+import os
+import json
+import time
+import numpy as np
+from typing import List, Optional
+from langchain.schema.embeddings import Embeddings
+from langchain_community.embeddings import HuggingFaceEmbeddings
+
+BACKENDS = ("torch", "torch_int8", "onnx", "onnx_int8")
+
+class EmbeddingConfig:
+    """How the sentence-transformers model runs on CPU.
+
+    torch       float32 PyTorch (the default)
+    torch_int8  PyTorch with Linear layers dynamically quantized to int8
+    onnx        ONNX Runtime on a one-time export of the model to onnx_dir
+    onnx_int8   ONNX Runtime on an int8 weight-quantized copy of that export
+
+    threads=0 keeps the runtime's default; max_seq_length=None keeps the model's own limit.
+    """
+
+    def __init__(self, backend: str = "torch", batch_size: int = 32, threads: int = 0,
+                 max_seq_length: Optional[int] = None, onnx_dir: str = "data/onnx"):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown embedding backend '{backend}', expected one of {BACKENDS}")
+        self.backend = backend
+        self.batch_size = batch_size
+        self.threads = threads
+        self.max_seq_length = max_seq_length
+        self.onnx_dir = onnx_dir
+
+    @classmethod
+    def from_env(cls) -> "EmbeddingConfig":
+        max_seq_length = os.getenv("ATS_EMBED_MAX_SEQ_LENGTH")
+        return cls(backend=os.getenv("ATS_EMBED_BACKEND", "torch"),
+                   batch_size=int(os.getenv("ATS_EMBED_BATCH_SIZE", "32")),
+                   threads=int(os.getenv("ATS_EMBED_THREADS", "0")),
+                   max_seq_length=int(max_seq_length) if max_seq_length else None,
+                   onnx_dir=os.getenv("ATS_ONNX_DIR", "data/onnx"))
+
+    def describe(self) -> str:
+        parts = [self.backend, f"batch {self.batch_size}"]
+        if self.threads:
+            parts.append(f"{self.threads} threads")
+        if self.max_seq_length:
+            parts.append(f"max {self.max_seq_length} tokens")
+        return ", ".join(parts)
+
+    def model_key(self, model_name: str) -> str:
+        """Name vectors are cached and indexed under; quantization and truncation change them."""
+        if self.backend == "torch" and self.max_seq_length is None:
+            return model_name
+        suffix = self.backend + (f"-seq{self.max_seq_length}" if self.max_seq_length else "")
+        return f"{model_name}+{suffix}"
+
+
+def load_embeddings(model_name: str, config: Optional[EmbeddingConfig] = None) -> Embeddings:
+    """Normalized sentence embeddings from the configured backend."""
+    config = config or EmbeddingConfig()
+    if config.backend.startswith("onnx"):
+        return OnnxEmbeddings(model_name, config)
+
+    embeddings = HuggingFaceEmbeddings(
+        model_name=model_name,
+        model_kwargs={'device': 'cpu'},
+        encode_kwargs={'normalize_embeddings': True, 'batch_size': config.batch_size}
+    )
+    if config.max_seq_length:
+        embeddings.client.max_seq_length = config.max_seq_length
+    if config.threads or config.backend == "torch_int8":
+        import torch
+        if config.threads:
+            torch.set_num_threads(config.threads)
+        if config.backend == "torch_int8":
+            embeddings.client = torch.quantization.quantize_dynamic(embeddings.client, {torch.nn.Linear},
+                                                                    dtype=torch.qint8)
+    return embeddings
+
+
+def export_onnx(model_name: str, config: EmbeddingConfig) -> str:
+    """Path of the ONNX model for this backend, exporting (and quantizing) it on first use.
+
+    The export needs torch and sentence-transformers once; later runs only load the
+    .onnx file and the tokenizer saved beside it.
+    """
+    folder = os.path.join(config.onnx_dir, model_name.replace("/", "_"))
+    fp32_path = os.path.join(folder, "model.onnx")
+    int8_path = os.path.join(folder, "model.int8.onnx")
+
+    if not os.path.exists(fp32_path):
+        import torch
+        from sentence_transformers import SentenceTransformer
+        export_start = time.time()
+        print(f"📦 Exporting {model_name} to ONNX...")
+        model = SentenceTransformer(model_name, device="cpu")
+        transformer = model[0]
+        os.makedirs(folder, exist_ok=True)
+        transformer.tokenizer.save_pretrained(folder)
+        sample = dict(transformer.tokenizer(["resume export sample"], return_tensors="pt"))
+        axes = {name: {0: "batch", 1: "sequence"} for name in list(sample) + ["last_hidden_state"]}
+        torch.onnx.export(transformer.auto_model, (sample,), fp32_path + ".tmp", input_names=list(sample),
+                          output_names=["last_hidden_state"], dynamic_axes=axes, opset_version=14)
+        os.replace(fp32_path + ".tmp", fp32_path)
+        with open(os.path.join(folder, "export.json"), "w") as f:
+            json.dump({"model_name": model_name, "max_seq_length": model.max_seq_length}, f)
+        print(f"📦 Exported to {fp32_path} in {time.time() - export_start:.2f}s")
+
+    if config.backend == "onnx_int8" and not os.path.exists(int8_path):
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        quantize_start = time.time()
+        quantize_dynamic(fp32_path, int8_path + ".tmp", weight_type=QuantType.QInt8)
+        os.replace(int8_path + ".tmp", int8_path)
+        print(f"📦 Quantized weights to int8 in {time.time() - quantize_start:.2f}s")
+    return int8_path if config.backend == "onnx_int8" else fp32_path
+
+
+class OnnxEmbeddings(Embeddings):
+    """Mean-pooled, L2-normalized embeddings from ONNX Runtime, matching sentence-transformers."""
+
+    def __init__(self, model_name: str, config: EmbeddingConfig):
+        try:
+            import onnxruntime
+            from transformers import AutoTokenizer
+        except ImportError:
+            raise ImportError(f"ATS_EMBED_BACKEND={config.backend} needs onnxruntime: pip install onnxruntime")
+        model_path = export_onnx(model_name, config)
+        folder = os.path.dirname(model_path)
+        with open(os.path.join(folder, "export.json"), "r") as f:
+            exported = json.load(f)
+
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if config.threads:
+            options.intra_op_num_threads = config.threads
+        self.session = onnxruntime.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self.input_names = [model_input.name for model_input in self.session.get_inputs()]
+        self.tokenizer = AutoTokenizer.from_pretrained(folder)
+        self.batch_size = config.batch_size
+        self.max_seq_length = config.max_seq_length or exported["max_seq_length"]
+
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), 0), dtype=np.float32)
+        # Batch texts of similar length together so little time is spent on padding
+        order = np.argsort([-len(text) for text in texts], kind="stable")
+        for start in range(0, len(texts), self.batch_size):
+            rows = order[start:start + self.batch_size]
+            batch = self.tokenizer([texts[i] for i in rows], padding=True, truncation=True,
+                                   max_length=self.max_seq_length, return_tensors="np")
+            hidden = self.session.run(None, {name: batch[name].astype(np.int64) for name in self.input_names})[0]
+            mask = batch["attention_mask"][..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+            if not vectors.shape[1]:
+                vectors = np.zeros((len(texts), pooled.shape[1]), dtype=np.float32)
+            vectors[rows] = pooled
+        return vectors
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._embed(texts).tolist() if texts else []
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed([text])[0].tolist()
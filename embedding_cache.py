@@ -0,0 +1,150 @@
+import os
+import json
+import atexit
+import hashlib
+import threading
+import numpy as np
+from collections import OrderedDict
+from typing import List, Optional
+from langchain.schema.embeddings import Embeddings
+
+class EmbeddingCache:
+    """Memory-mapped on-disk embedding cache keyed by (model, normalization, text hash).
+
+    Vectors live in a fixed-capacity float32 memmap; the key -> slot map is kept in LRU
+    order and persisted as JSON on flush. When the cache is full the least recently used
+    slot is overwritten.
+    """
+
+    def __init__(self, cache_dir: str = "data/embedding_cache", model_name: str = "all-MiniLM-L6-v2",
+                 normalize: bool = True, capacity: int = 100_000):
+        self.cache_dir = cache_dir
+        self.model_name = model_name
+        self.normalize = normalize
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._lock = threading.Lock()
+        self._slots: "OrderedDict[str, int]" = OrderedDict()
+        self._free: List[int] = []
+        self._vectors: Optional[np.memmap] = None
+        self.dim: Optional[int] = None
+
+        slug = f"{model_name.replace('/', '_')}-{'norm' if normalize else 'raw'}"
+        self._vectors_path = os.path.join(cache_dir, f"{slug}.f32")
+        self._index_path = os.path.join(cache_dir, f"{slug}.json")
+        os.makedirs(cache_dir, exist_ok=True)
+        self._load()
+        atexit.register(self.flush)
+
+    def _load(self):
+        if not (os.path.exists(self._index_path) and os.path.exists(self._vectors_path)):
+            return
+        try:
+            with open(self._index_path, "r") as f:
+                meta = json.load(f)
+            if meta.get("capacity") != self.capacity:
+                print(f"♻️  Embedding cache capacity changed, starting fresh")
+                return
+            self.dim = meta["dim"]
+            self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="r+",
+                                      shape=(self.capacity, self.dim))
+            self._slots = OrderedDict(meta["slots"])
+            used = set(self._slots.values())
+            self._free = [slot for slot in range(self.capacity - 1, -1, -1) if slot not in used]
+            print(f"📦 Embedding cache: {len(self._slots):,} vectors loaded")
+        except Exception as e:
+            print(f"⚠️  Could not load embedding cache: {e}")
+            self._slots = OrderedDict()
+            self._vectors = None
+            self.dim = None
+
+    def _allocate(self, dim: int):
+        self.dim = dim
+        self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="w+",
+                                  shape=(self.capacity, dim))
+        self._free = list(range(self.capacity - 1, -1, -1))
+
+    def key(self, text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get(self, text: str) -> Optional[List[float]]:
+        key = self.key(text)
+        with self._lock:
+            slot = self._slots.get(key)
+            if slot is None:
+                self.misses += 1
+                return None
+            self._slots.move_to_end(key)
+            self.hits += 1
+            return self._vectors[slot].tolist()
+
+    def put(self, text: str, vector: List[float]):
+        key = self.key(text)
+        with self._lock:
+            if self._vectors is None:
+                self._allocate(len(vector))
+            slot = self._slots.get(key)
+            if slot is None:
+                if self._free:
+                    slot = self._free.pop()
+                else:
+                    _, slot = self._slots.popitem(last=False)
+                    self.evictions += 1
+            self._slots[key] = slot
+            self._slots.move_to_end(key)
+            self._vectors[slot] = np.asarray(vector, dtype=np.float32)
+
+    def flush(self):
+        with self._lock:
+            if self._vectors is None:
+                return
+            self._vectors.flush()
+            tmp_path = self._index_path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"dim": self.dim, "capacity": self.capacity,
+                           "slots": list(self._slots.items())}, f)
+            os.replace(tmp_path, self._index_path)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._slots),
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def print_stats(self):
+        stats = self.stats()
+        print(f"📦 Embedding cache: {stats['hits']} hits, {stats['misses']} misses "
+              f"({stats['hit_rate']*100:.1f}% hit rate), {stats['entries']:,} entries, "
+              f"{stats['evictions']} evictions")
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper that serves documents and queries from an EmbeddingCache."""
+
+    def __init__(self, base: Embeddings, cache: EmbeddingCache):
+        self.base = base
+        self.cache = cache
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors = [self.cache.get(text) for text in texts]
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            embedded = self.base.embed_documents([texts[i] for i in missing])
+            for i, vector in zip(missing, embedded):
+                self.cache.put(texts[i], vector)
+                vectors[i] = vector
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        vector = self.cache.get(text)
+        if vector is None:
+            vector = self.base.embed_query(text)
+            self.cache.put(text, vector)
+        return vector
@@ -0,0 +1,108 @@
+"""Check embedding backends against the float32 PyTorch baseline: ranking agreement and speed.
+
+Every backend embeds the same resumes and job descriptions. For each job description the
+top-k resumes by cosine similarity are compared with the baseline's top-k; a backend fails
+when its mean recall@k or mean vector cosine to the baseline falls below the tolerance.
+
+Usage:
+    python embedding_eval.py --synthetic 500 --backends torch_int8,onnx,onnx_int8
+    python embedding_eval.py --resume-dir data/resumes --batch-size 64 --threads 4
+"""
+import time
+import random
+import argparse
+import numpy as np
+from typing import List
+from embedding_backends import BACKENDS, EmbeddingConfig, load_embeddings
+from synthetic_corpus import job_descriptions, resume_text
+
+def load_texts(args) -> List[str]:
+    if args.resume_dir:
+        from resume_processor import ResumeProcessor
+        return [text for _, text in ResumeProcessor(args.resume_dir).load_resumes()]
+    rng = random.Random(args.seed)
+    return [resume_text(rng, i) for i in range(args.synthetic)]
+
+def embed_all(config: EmbeddingConfig, model_name: str, texts: List[str], queries: List[str]) -> dict:
+    load_start = time.time()
+    embeddings = load_embeddings(model_name, config)
+    load_time = time.time() - load_start
+    embeddings.embed_documents(texts[:config.batch_size])  # warm up kernels and allocators
+
+    start = time.time()
+    documents = np.array(embeddings.embed_documents(texts), dtype=np.float32)
+    doc_time = time.time() - start
+    latencies = []
+    query_vectors = []
+    for query in queries:
+        query_start = time.perf_counter()
+        query_vectors.append(embeddings.embed_query(query))
+        latencies.append(time.perf_counter() - query_start)
+    return {
+        "documents": documents,
+        "queries": np.array(query_vectors, dtype=np.float32),
+        "load_s": load_time,
+        "docs_per_sec": len(texts) / doc_time,
+        "query_p50_ms": float(np.percentile(latencies, 50) * 1000),
+    }
+
+def compare(result: dict, baseline: dict, k: int) -> dict:
+    truth = np.argsort(-baseline["queries"] @ baseline["documents"].T, axis=1)[:, :k]
+    found = np.argsort(-result["queries"] @ result["documents"].T, axis=1)[:, :k]
+    recall = np.mean([len(set(f) & set(t)) / k for f, t in zip(found, truth)])
+    cosine = np.mean(np.sum(result["documents"] * baseline["documents"], axis=1))
+    return {"recall": float(recall), "cosine": float(cosine)}
+
+def main():
+    parser = argparse.ArgumentParser(description="Ranking agreement and throughput of embedding backends")
+    parser.add_argument("--model", default="all-MiniLM-L6-v2")
+    parser.add_argument("--resume-dir", default=None, help="Embed these resumes instead of synthetic ones")
+    parser.add_argument("--synthetic", type=int, default=500)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--backends", default="torch_int8,onnx,onnx_int8")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--threads", type=int, default=0)
+    parser.add_argument("--max-seq-length", type=int, default=None)
+    parser.add_argument("--min-recall", type=float, default=0.9, help="Mean recall@k against torch float32")
+    parser.add_argument("--min-cosine", type=float, default=0.98, help="Mean cosine to torch float32 vectors")
+    args = parser.parse_args()
+
+    texts = load_texts(args)
+    queries = job_descriptions(args.queries, seed=args.seed + 1)
+    k = min(args.k, len(texts))
+    print(f"📊 {len(texts):,} resumes, {len(queries)} job descriptions, recall@{k} against torch float32")
+
+    def config(backend: str) -> EmbeddingConfig:
+        return EmbeddingConfig(backend, batch_size=args.batch_size, threads=args.threads,
+                               max_seq_length=args.max_seq_length)
+
+    baseline = embed_all(EmbeddingConfig("torch", batch_size=args.batch_size, threads=args.threads),
+                         args.model, texts, queries)
+    rows = [("torch", baseline, {"recall": 1.0, "cosine": 1.0})]
+    for backend in args.backends.split(","):
+        if backend not in BACKENDS:
+            raise SystemExit(f"❌ Unknown backend {backend}")
+        try:
+            result = embed_all(config(backend), args.model, texts, queries)
+        except ImportError as e:
+            print(f"⚠️  Skipping {backend}: {e}")
+            continue
+        rows.append((backend, result, compare(result, baseline, k)))
+
+    failed = []
+    print(f"\n{'backend':<11} {'recall':>7} {'cosine':>7} {'docs/s':>9} {'query p50 ms':>13} {'load s':>7}")
+    for backend, result, agreement in rows:
+        ok = agreement["recall"] >= args.min_recall and agreement["cosine"] >= args.min_cosine
+        if not ok:
+            failed.append(backend)
+        print(f"{backend:<11} {agreement['recall']:>7.3f} {agreement['cosine']:>7.4f} {result['docs_per_sec']:>9.1f} "
+              f"{result['query_p50_ms']:>13.2f} {result['load_s']:>7.2f}" + ("" if ok else "  ❌"))
+    if failed:
+        raise SystemExit(f"❌ Outside tolerance (recall@{k} >= {args.min_recall}, cosine >= {args.min_cosine}): "
+                         f"{', '.join(failed)}")
+    print(f"✅ All backends within tolerance")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""Local stand-in for the Ollama HTTP API, so the Q&A path can be run and benchmarked offline.
+
+Usage:
+    python fake_ollama.py --port 11434 --token-ms 60 --first-token-ms 400 --tokens 120
+    OLLAMA_BASE_URL=http://localhost:11434 python app.py
+
+Implements /api/tags, /api/pull and streaming /api/generate. Answers are built from words of
+the prompt, one token per word, with a fixed delay before the first token (prompt evaluation)
+and between tokens (generation). The final message carries Ollama's eval counters.
+"""
+import json
+import time
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class FakeOllama:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, model: str = "llama2:7b",
+                 token_latency: float = 0.05, first_token_latency: float = 0.3, tokens: int = 80):
+        self.model = model
+        self.token_latency = token_latency
+        self.first_token_latency = first_token_latency
+        self.tokens = tokens
+        self.requests = 0
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeOllama":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True, name="fake-ollama")
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def answer_words(self, prompt: str):
+        words = [word for word in prompt.split() if word.isalpha()] or ["answer"]
+        return [words[(i * 7) % len(words)] for i in range(self.tokens)]
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _json(self, payload: dict, status: int = 200):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _body(self) -> dict:
+                length = int(self.headers.get("Content-Length", 0))
+                return json.loads(self.rfile.read(length) or b"{}")
+
+            def do_GET(self):
+                if self.path.rstrip("/") == "/api/tags":
+                    self._json({"models": [{"name": fake.model}]})
+                else:
+                    self._json({"error": "not found"}, 404)
+
+            def do_POST(self):
+                path = self.path.rstrip("/")  # langchain posts to /api/generate/
+                if path == "/api/pull":
+                    self._body()
+                    self._json({"status": "success"})
+                elif path == "/api/generate":
+                    self._generate(self._body())
+                else:
+                    self._json({"error": "not found"}, 404)
+
+            def _generate(self, request: dict):
+                fake.requests += 1
+                prompt = request.get("prompt", "")
+                words = fake.answer_words(prompt)
+                prompt_tokens = max(1, len(prompt) // 4)
+                start = time.time()
+                # Chunked like the real server, so clients see each token as soon as it is written
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                time.sleep(fake.first_token_latency)
+                prompt_done = time.time()
+                if not request.get("stream", True):
+                    time.sleep(fake.token_latency * len(words))
+                    message = {"model": fake.model, "response": " ".join(words), "done": True}
+                else:
+                    for i, word in enumerate(words):
+                        if i:
+                            time.sleep(fake.token_latency)
+                        self._chunk({"model": fake.model, "response": (" " if i else "") + word, "done": False})
+                    message = {"model": fake.model, "response": "", "done": True}
+                message.update({
+                    "prompt_eval_count": prompt_tokens,
+                    "prompt_eval_duration": int((prompt_done - start) * 1e9),
+                    "eval_count": len(words),
+                    "eval_duration": int((time.time() - prompt_done) * 1e9),
+                    "load_duration": 0,
+                })
+                self._chunk(message)
+                self.wfile.write(b"0\r\n\r\n")
+                self.wfile.flush()
+
+            def _chunk(self, message: dict):
+                data = (json.dumps(message) + "\n").encode("utf-8")
+                self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+                self.wfile.flush()
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline stand-in for the Ollama API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--token-ms", type=float, default=50, help="Delay between streamed tokens")
+    parser.add_argument("--first-token-ms", type=float, default=300, help="Delay before the first token")
+    parser.add_argument("--tokens", type=int, default=80, help="Tokens per answer")
+    args = parser.parse_args()
+
+    fake = FakeOllama(args.host, args.port, token_latency=args.token_ms / 1000,
+                      first_token_latency=args.first_token_ms / 1000, tokens=args.tokens)
+    print(f"🦙 Fake Ollama on {fake.url} ({args.first_token_ms:.0f}ms to first token, "
+          f"{args.token_ms:.0f}ms/token, {args.tokens} tokens)")
+    try:
+        fake._server.serve_forever()
+    except KeyboardInterrupt:
+        fake._server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+import os
+import faiss
+import numpy as np
+from typing import Optional
+
+INDEX_TYPES = ("flat", "hnsw", "ivf_flat", "ivf_pq")
+
+class IndexConfig:
+    """Which FAISS index VectorStore builds, and how it is trained and searched.
+
+    flat      exact brute-force search (LangChain's default)
+    hnsw      graph index, no training, tuned with ef_search
+    ivf_flat  inverted lists over full vectors, trained, tuned with nprobe
+    ivf_pq    inverted lists over product-quantized codes (~pq_m bytes/vector), trained, tuned with nprobe
+    """
+
+    def __init__(self, index_type: str = "flat", hnsw_m: int = 32, ef_construction: int = 40,
+                 ef_search: int = 64, nlist: int = 1024, nprobe: int = 16, pq_m: int = 16,
+                 pq_bits: int = 8, train_size: int = 50_000):
+        if index_type not in INDEX_TYPES:
+            raise ValueError(f"Unknown index type '{index_type}', expected one of {INDEX_TYPES}")
+        self.index_type = index_type
+        self.hnsw_m = hnsw_m
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.pq_m = pq_m
+        self.pq_bits = pq_bits
+        self.train_size = train_size
+
+    @classmethod
+    def from_env(cls) -> "IndexConfig":
+        return cls(
+            index_type=os.getenv("ATS_INDEX_TYPE", "flat"),
+            hnsw_m=int(os.getenv("ATS_HNSW_M", "32")),
+            ef_search=int(os.getenv("ATS_EF_SEARCH", "64")),
+            nlist=int(os.getenv("ATS_IVF_NLIST", "1024")),
+            nprobe=int(os.getenv("ATS_IVF_NPROBE", "16")),
+            pq_m=int(os.getenv("ATS_PQ_M", "16")),
+            train_size=int(os.getenv("ATS_INDEX_TRAIN_SIZE", "50000")),
+        )
+
+    @property
+    def needs_training(self) -> bool:
+        return self.index_type in ("ivf_flat", "ivf_pq")
+
+    @property
+    def pq_min_train(self) -> int:
+        """Training vectors the PQ codebooks need (~39 per codebook entry); ivf_pq builds ivf_flat below it."""
+        return 39 * 2 ** self.pq_bits
+
+    def describe(self) -> str:
+        if self.index_type == "hnsw":
+            return f"hnsw (M={self.hnsw_m}, efSearch={self.ef_search})"
+        if self.index_type == "ivf_flat":
+            return f"ivf_flat (nlist={self.nlist}, nprobe={self.nprobe})"
+        if self.index_type == "ivf_pq":
+            return f"ivf_pq (nlist={self.nlist}, nprobe={self.nprobe}, m={self.pq_m}x{self.pq_bits}bit)"
+        return "flat (exact)"
+
+
+def _pq_subquantizers(dim: int, wanted: int) -> int:
+    """Largest divisor of dim not above the requested number of sub-quantizers."""
+    for m in range(min(wanted, dim), 0, -1):
+        if dim % m == 0:
+            return m
+    return 1
+
+
+def factory_string(config: IndexConfig, dim: int, n_train: int = 0) -> str:
+    if config.index_type == "hnsw":
+        return f"HNSW{config.hnsw_m},Flat"
+    if config.needs_training:
+        # FAISS wants ~39 training points per centroid; shrink nlist for small samples
+        nlist = max(1, min(config.nlist, n_train // 39 if n_train else config.nlist))
+        if config.index_type == "ivf_flat":
+            return f"IVF{nlist},Flat"
+        return f"IVF{nlist},PQ{_pq_subquantizers(dim, config.pq_m)}x{config.pq_bits}"
+    return "Flat"
+
+
+def build_index(config: IndexConfig, dim: int, train_vectors: Optional[np.ndarray] = None):
+    """Create (and train, if needed) an empty L2 index for normalized vectors."""
+    n_train = len(train_vectors) if train_vectors is not None else 0
+    description = factory_string(config, dim, n_train)
+    if config.index_type == "ivf_pq" and n_train < config.pq_min_train:
+        # Too few vectors to train the PQ codebooks; fall back to full vectors. The saved index
+        # records ivf_flat, so a later start retrains as ivf_pq once the corpus is large enough.
+        description = factory_string(IndexConfig("ivf_flat", nlist=config.nlist), dim, n_train)
+        print(f"⚠️  ivf_pq needs {config.pq_min_train:,} training vectors for its codebooks, "
+              f"building ivf_flat on {n_train:,} until the corpus grows")
+    index = faiss.index_factory(dim, description, faiss.METRIC_L2)
+
+    if config.index_type == "hnsw":
+        index.hnsw.efConstruction = config.ef_construction
+    if not index.is_trained:
+        if train_vectors is None or n_train == 0:
+            raise ValueError(f"{config.index_type} index needs training vectors")
+        index.train(np.ascontiguousarray(train_vectors, dtype=np.float32))
+
+    apply_search_params(index, config)
+    return index
+
+
+def built_index_type(index) -> str:
+    """Which of INDEX_TYPES a FAISS index actually is; ivf_pq trained on a small sample is ivf_flat."""
+    index = faiss.downcast_index(index)
+    if isinstance(index, faiss.IndexIVFPQ):
+        return "ivf_pq"
+    if isinstance(index, faiss.IndexIVF):
+        return "ivf_flat"
+    if hasattr(index, "hnsw"):
+        return "hnsw"
+    return "flat"
+
+
+def apply_search_params(index, config: IndexConfig, nprobe: Optional[int] = None,
+                        ef_search: Optional[int] = None):
+    """Set nprobe / efSearch on whichever index type this is; other types ignore them."""
+    params = faiss.ParameterSpace()
+    if faiss.try_extract_index_ivf(index) is not None:
+        params.set_index_parameter(index, "nprobe", nprobe or config.nprobe)
+    if hasattr(index, "hnsw"):
+        params.set_index_parameter(index, "efSearch", ef_search or config.ef_search)
+
+
+def make_writable(index) -> bool:
+    """Copy memory-mapped IVF lists into RAM so vectors can be added; True if anything was copied.
+
+    FAISS maps IVF lists of an index loaded with IO_FLAG_MMAP read-only and aborts on add.
+    """
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is None:
+        return False
+    mapped = faiss.downcast_InvertedLists(ivf.invlists)
+    if not isinstance(mapped, faiss.OnDiskInvertedLists) or not mapped.read_only:
+        return False
+    lists = faiss.ArrayInvertedLists(ivf.nlist, ivf.code_size)
+    for list_no in range(ivf.nlist):
+        size = mapped.list_size(list_no)
+        if size:
+            lists.add_entries(list_no, size, mapped.get_ids(list_no), mapped.get_codes(list_no))
+    lists.this.disown()
+    ivf.replace_invlists(lists, True)
+    return True
+
+
+def index_memory_bytes(index) -> int:
+    return int(faiss.serialize_index(index).nbytes)
+
+
+def selector_params(index, config: IndexConfig, selector, exhaustive: bool = False):
+    """SearchParameters restricting a search to the ids accepted by a FAISS IDSelector.
+
+    exhaustive=True probes every IVF list so the restricted top-k is exact.
+    """
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        return faiss.SearchParametersIVF(sel=selector, nprobe=ivf.nlist if exhaustive else config.nprobe)
+    if hasattr(index, "hnsw"):
+        return faiss.SearchParametersHNSW(sel=selector, efSearch=config.ef_search)
+    return faiss.SearchParameters(sel=selector)
@@ -0,0 +1,170 @@
+import os
+import json
+import time
+import hashlib
+import numpy as np
+from typing import Dict, List, Optional
+
+# Bump when extraction or cleaning changes so cached text is re-extracted.
+EXTRACTOR_VERSION = "1"
+
+class IngestManifest:
+    """Content-hash manifest that caches extracted text and embeddings per resume file."""
+
+    def __init__(self, manifest_path: str = "data/ingest_manifest.json",
+                 cache_dir: str = "data/ingest_cache",
+                 extractor_version: str = EXTRACTOR_VERSION,
+                 embedding_model: str = "all-MiniLM-L6-v2"):
+        self.manifest_path = manifest_path
+        self.cache_dir = cache_dir
+        self.extractor_version = extractor_version
+        self.embedding_model = embedding_model
+        self.text_dir = os.path.join(cache_dir, "text")
+        self.vector_root = os.path.join(cache_dir, "vectors")
+        self.vector_dir = self._vector_dir(embedding_model)
+        os.makedirs(self.text_dir, exist_ok=True)
+        os.makedirs(self.vector_dir, exist_ok=True)
+
+        self.files: Dict[str, dict] = {}
+        self.stats = {"skipped": 0, "added": 0, "changed": 0, "removed": 0}
+        self._seen = set()
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.manifest_path):
+            return
+        try:
+            with open(self.manifest_path, "r") as f:
+                data = json.load(f)
+            if data.get("extractor_version") == self.extractor_version:
+                self.files = data.get("files", {})
+            else:
+                print(f"♻️  Extractor version changed, re-extracting all resumes")
+        except Exception as e:
+            print(f"⚠️  Could not read manifest {self.manifest_path}: {e}")
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.manifest_path) or ".", exist_ok=True)
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({
+                "extractor_version": self.extractor_version,
+                "embedding_model": self.embedding_model,
+                "updated": time.time(),
+                "files": self.files,
+            }, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    @staticmethod
+    def hash_file(file_path: str) -> str:
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def file_hash(self, filename: str, file_path: str) -> str:
+        """Return the content hash, reusing the stored one when size and mtime match."""
+        stat = os.stat(file_path)
+        entry = self.files.get(filename)
+        if entry and entry.get("size") == stat.st_size and entry.get("mtime") == stat.st_mtime:
+            return entry["hash"]
+        return self.hash_file(file_path)
+
+    def scan_fingerprint(self, resume_dir: str) -> str:
+        """Digest of every supported file name and content hash in the resume directory."""
+        digest = hashlib.sha256()
+        for filename in sorted(os.listdir(resume_dir)):
+            if not filename.lower().endswith(('.pdf', '.docx')):
+                continue
+            file_path = os.path.join(resume_dir, filename)
+            digest.update(f"{filename}:{self.file_hash(filename, file_path)}\n".encode("utf-8"))
+        digest.update(f"extractor:{self.extractor_version}".encode("utf-8"))
+        return digest.hexdigest()
+
+    def _key(self, content_hash: str) -> str:
+        return f"{content_hash}-{self.extractor_version}"
+
+    def _text_path(self, content_hash: str) -> str:
+        return os.path.join(self.text_dir, self._key(content_hash) + ".txt")
+
+    def _vector_dir(self, model: Optional[str]) -> str:
+        return os.path.join(self.vector_root, (model or self.embedding_model).replace("/", "_"))
+
+    def _vector_path(self, content_hash: str, model: Optional[str] = None) -> str:
+        return os.path.join(self._vector_dir(model), self._key(content_hash) + ".npy")
+
+    def has_text(self, content_hash: str) -> bool:
+        return os.path.exists(self._text_path(content_hash))
+
+    def get_text(self, content_hash: str) -> Optional[str]:
+        path = self._text_path(content_hash)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+
+    def put_text(self, content_hash: str, text: str):
+        with open(self._text_path(content_hash), "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def get_vector(self, content_hash: str, model: Optional[str] = None) -> Optional[np.ndarray]:
+        """Cached vector of this content from the given embedding model key (default: embedding_model)."""
+        path = self._vector_path(content_hash, model)
+        if not os.path.exists(path):
+            return None
+        return np.load(path)
+
+    def put_vector(self, content_hash: str, vector, model: Optional[str] = None):
+        os.makedirs(self._vector_dir(model), exist_ok=True)
+        np.save(self._vector_path(content_hash, model), np.asarray(vector, dtype=np.float32))
+
+    def hash_for(self, filename: str) -> Optional[str]:
+        entry = self.files.get(filename)
+        return entry["hash"] if entry else None
+
+    def record(self, filename: str, file_path: str, content_hash: str, chars: int):
+        """Record a file seen in this run and classify it as skipped, added or changed."""
+        previous = self.files.get(filename)
+        if previous is not None and previous["hash"] == content_hash:
+            self.stats["skipped"] += 1
+        elif previous is None:
+            self.stats["added"] += 1
+        else:
+            self.stats["changed"] += 1
+
+        stat = os.stat(file_path)
+        self.files[filename] = {
+            "hash": content_hash,
+            "size": stat.st_size,
+            "mtime": stat.st_mtime,
+            "chars": chars,
+        }
+        self._seen.add(filename)
+
+    def forget(self, filename: str):
+        """Drop a deleted file; its cached text and vector are pruned at the next finalize."""
+        self.files.pop(filename, None)
+        self._seen.discard(filename)
+
+    def finalize(self) -> List[str]:
+        """Drop files not seen in this run, prune unreferenced cache entries and save."""
+        removed = [name for name in self.files if name not in self._seen]
+        for name in removed:
+            del self.files[name]
+        self.stats["removed"] = len(removed)
+
+        live_keys = {self._key(entry["hash"]) for entry in self.files.values()}
+        vector_dirs = [os.path.join(self.vector_root, name) for name in os.listdir(self.vector_root)]
+        for directory in [self.text_dir] + [path for path in vector_dirs if os.path.isdir(path)]:
+            for cached in os.listdir(directory):
+                if os.path.splitext(cached)[0] not in live_keys:
+                    os.remove(os.path.join(directory, cached))
+
+        self.save()
+        self._seen = set()
+        return removed
+
+    def print_summary(self):
+        print(f"📒 Manifest: {self.stats['skipped']} skipped, {self.stats['added']} added, "
+              f"{self.stats['changed']} changed, {self.stats['removed']} removed")
@@ -0,0 +1,134 @@
+import time
+import queue
+import threading
+from typing import Iterator, List, Optional, Tuple
+from resume_processor import ResumeProcessor
+from vector_store import VectorStore
+from ingest_manifest import IngestManifest
+from near_duplicates import DedupConfig, NearDuplicateIndex
+from chunk_index import split_into_chunks
+from metrics import metrics
+
+_DONE = object()
+
+class IngestPipeline:
+    """Stream resumes through extract -> clean -> embed -> index in fixed-size batches.
+
+    Extraction and cleaning run on a producer thread that feeds a bounded queue, so
+    embedding of one batch overlaps with extraction of the next and at most
+    (queue_size + 2) batches of text are alive at any moment. With dedup, near-duplicate
+    resumes are collapsed into the first copy seen (listed in its "aliases" metadata) before
+    they reach the embedder.
+    """
+
+    def __init__(self, processor: ResumeProcessor, vector_store: VectorStore,
+                 manifest: Optional[IngestManifest] = None,
+                 batch_size: int = 32, queue_size: int = 2, min_chars: int = 50,
+                 dedup: Optional[DedupConfig] = None):
+        self.processor = processor
+        self.vector_store = vector_store
+        self.manifest = manifest
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.min_chars = min_chars
+        self.duplicates = NearDuplicateIndex(dedup) if dedup is not None else None
+        self.embeddings_saved = 0
+
+    def iter_cleaned(self) -> Iterator[Tuple[str, str]]:
+        for filename, text in self.processor.iter_resumes(self.manifest):
+            cleaned_text = self.processor.clean_text(text)
+            if cleaned_text and len(cleaned_text.strip()) > self.min_chars:
+                if self.duplicates is not None and self.duplicates.check(filename, cleaned_text) is not None:
+                    self.embeddings_saved += self._embeddings_per_resume(cleaned_text)
+                    continue
+                yield filename, cleaned_text
+            else:
+                print(f"⚠️  Skipping {filename}: too little text after cleaning")
+
+    def _embeddings_per_resume(self, text: str) -> int:
+        chunking = getattr(self.vector_store, "chunking", None)
+        if chunking is None:
+            return 1
+        return len(split_into_chunks(text, chunking.chunk_chars, chunking.overlap, chunking.max_chunks))
+
+    def iter_batches(self) -> Iterator[List[Tuple[str, str]]]:
+        batch = []
+        for item in self.iter_cleaned():
+            batch.append(item)
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def _produce(self, batches: "queue.Queue", stats: dict):
+        extract_start = time.time()
+        try:
+            for batch in self.iter_batches():
+                batches.put(batch)
+        except BaseException as e:
+            batches.put(e)
+        finally:
+            stats["extract_time"] = time.time() - extract_start
+            metrics.observe("ingest.extract", stats["extract_time"])
+            batches.put(_DONE)
+
+    def run(self, save: bool = True) -> dict:
+        """Run the pipeline to completion, save the index and return timing stats."""
+        with metrics.span("ingest.run", batch_size=self.batch_size) as span:
+            stats = self._run(save)
+            span.set(documents=stats["documents"], batches=stats["batches"])
+        return stats
+
+    def _run(self, save: bool) -> dict:
+        run_start = time.time()
+        # Fingerprint before extraction: files arriving mid-run make the next start refresh
+        fingerprint = None
+        if self.manifest is not None:
+            fingerprint = self.manifest.scan_fingerprint(self.processor.resume_dir)
+        print(f"🚰 Streaming ingestion (batch size {self.batch_size})...")
+        stats = {"documents": 0, "batches": 0, "extract_time": 0.0, "index_time": 0.0}
+
+        batches = queue.Queue(maxsize=self.queue_size)
+        producer = threading.Thread(target=self._produce, args=(batches, stats), daemon=True)
+        producer.start()
+
+        while True:
+            batch = batches.get()
+            if batch is _DONE:
+                break
+            if isinstance(batch, BaseException):
+                producer.join()
+                raise batch
+
+            index_start = time.time()
+            with metrics.span("ingest.batch", resumes=len(batch)):
+                added = self.vector_store.add_documents(batch, manifest=self.manifest)
+            stats["index_time"] += time.time() - index_start
+            stats["documents"] += added
+            stats["batches"] += 1
+            print(f"📦 Batch {stats['batches']}: indexed {added} resumes "
+                  f"({stats['documents']} total) in {time.time() - index_start:.2f}s")
+
+        producer.join()
+
+        if self.duplicates is not None:
+            if self.duplicates.aliases:
+                self.vector_store.set_aliases(self.duplicates.aliases)
+            stats.update(duplicates=self.duplicates.stats["duplicates"], embeddings_saved=self.embeddings_saved,
+                         text_bytes_saved=self.duplicates.stats["text_bytes_saved"])
+            metrics.inc("dedup.embeddings_saved", self.embeddings_saved)
+            metrics.inc("dedup.text_bytes_saved", self.duplicates.stats["text_bytes_saved"])
+
+        if save and stats["documents"] > 0:
+            self.vector_store.save(fingerprint=fingerprint)
+
+        stats["total_time"] = time.time() - run_start
+        print(f"✅ Streaming ingestion finished in {stats['total_time']:.2f}s")
+        print(f"   📄 Extraction (overlapped): {stats['extract_time']:.2f}s")
+        print(f"   🔄 Embedding + indexing: {stats['index_time']:.2f}s")
+        if self.duplicates is not None:
+            self.duplicates.print_summary(self.embeddings_saved)
+        if stats["total_time"] > 0:
+            print(f"   🚀 Rate: {stats['documents']/stats['total_time']:.1f} resumes/second")
+        return stats
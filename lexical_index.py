@@ -0,0 +1,109 @@
+import os
+import re
+import math
+import pickle
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Tuple
+
+# Keeps tokens like "c++", "c#", "node.js" and "ci/cd" intact
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#./\-]*[a-z0-9+#]|[a-z0-9]")
+
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have in is it of on or that the to was were will with
+we you your our this i my me he she they their them his her its not but if then so than
+""".split())
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+class LexicalIndex:
+    """BM25 inverted index over the full cleaned resume text, keyed by resume source."""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[int, int]] = defaultdict(dict)
+        self.doc_sources: List[Optional[str]] = []
+        self.doc_lengths: List[int] = []
+        self.source_to_doc: Dict[str, int] = {}
+        self.total_length = 0
+        # doc id -> its terms, so remove() touches only that document's postings; None until
+        # first needed after load (derived from the postings rather than stored twice)
+        self.doc_terms: Optional[Dict[int, Tuple[str, ...]]] = {}
+
+    @property
+    def doc_count(self) -> int:
+        return len(self.source_to_doc)
+
+    def add(self, source: str, text: str):
+        if source in self.source_to_doc:
+            self.remove(source)
+        terms = Counter(tokenize(text))
+        doc_id = len(self.doc_sources)
+        self.doc_sources.append(source)
+        length = sum(terms.values())
+        self.doc_lengths.append(length)
+        self.total_length += length
+        self.source_to_doc[source] = doc_id
+        for term, tf in terms.items():
+            self.postings[term][doc_id] = tf
+        if self.doc_terms is not None:
+            self.doc_terms[doc_id] = tuple(terms)
+
+    def remove(self, source: str):
+        doc_id = self.source_to_doc.pop(source, None)
+        if doc_id is None:
+            return
+        self.total_length -= self.doc_lengths[doc_id]
+        self.doc_sources[doc_id] = None
+        self.doc_lengths[doc_id] = 0
+        if self.doc_terms is None:
+            terms_by_doc = defaultdict(list)
+            for term, docs in self.postings.items():
+                for other in docs:
+                    terms_by_doc[other].append(term)
+            self.doc_terms = {other: tuple(terms) for other, terms in terms_by_doc.items()}
+        for term in self.doc_terms.pop(doc_id, ()):
+            docs = self.postings[term]
+            docs.pop(doc_id, None)
+            if not docs:
+                del self.postings[term]
+
+    def search(self, query: str, k: int = 100) -> List[Tuple[str, float]]:
+        """Return up to k (source, BM25 score) pairs, best first; only documents matching a query term."""
+        if not self.doc_count:
+            return []
+        avg_length = self.total_length / self.doc_count or 1.0
+        scores = defaultdict(float)
+        for term in set(tokenize(query)):
+            docs = self.postings.get(term)
+            if not docs:
+                continue
+            idf = math.log(1 + (self.doc_count - len(docs) + 0.5) / (len(docs) + 0.5))
+            for doc_id, tf in docs.items():
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / avg_length)
+                scores[doc_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+        best = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:k]
+        return [(self.doc_sources[doc_id], score) for doc_id, score in best]
+
+    def save(self, folder_path: str):
+        os.makedirs(folder_path, exist_ok=True)
+        with open(os.path.join(folder_path, "lexical.pkl"), "wb") as f:
+            pickle.dump((self.k1, self.b, dict(self.postings), self.doc_sources,
+                         self.doc_lengths, self.source_to_doc, self.total_length), f)
+
+    @classmethod
+    def load(cls, folder_path: str) -> Optional["LexicalIndex"]:
+        path = os.path.join(folder_path, "lexical.pkl")
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            k1, b, postings, doc_sources, doc_lengths, source_to_doc, total_length = pickle.load(f)
+        index = cls(k1, b)
+        index.postings = defaultdict(dict, postings)
+        index.doc_sources = doc_sources
+        index.doc_lengths = doc_lengths
+        index.source_to_doc = source_to_doc
+        index.total_length = total_length
+        index.doc_terms = None
+        return index
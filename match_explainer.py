@@ -0,0 +1,134 @@
+import os
+import re
+import time
+import numpy as np
+from typing import List, Optional
+from langchain.schema import Document
+from candidate_profiles import find_skills, mentions_skill
+from context_packer import split_spans
+from metrics import metrics
+
+_BULLET = re.compile(r"^\s*(?:[-•*▪●]|\d+[.)])\s*")
+_CLAUSE_BREAK = re.compile(r"(?<=[.!?;])\s+")
+
+def split_requirements(job_description: str) -> List[dict]:
+    """Job description -> requirements, one per bullet or sentence.
+
+    A sentence listing several known skills ("5+ years of python, aws and docker") also yields
+    one requirement per skill, so each candidate is credited skill by skill.
+    """
+    requirements, seen = [], set()
+
+    def add(text: str, skill: Optional[str] = None):
+        if text.lower() not in seen:
+            seen.add(text.lower())
+            requirements.append({"text": text, "skill": skill})
+
+    for line in job_description.splitlines():
+        line = _BULLET.sub("", line).strip()
+        if not line or line.endswith(":"):
+            continue
+        for sentence in _CLAUSE_BREAK.split(line):
+            sentence = " ".join(sentence.split()).strip(" .;")
+            skills = find_skills(sentence)
+            if len(sentence.split()) < 2 and not skills:
+                continue
+            add(sentence, skills[0] if len(skills) == 1 else None)
+            if len(skills) > 1:
+                for skill in skills:
+                    add(skill, skill)
+    return requirements
+
+class MatchExplainer:
+    """Which job requirements each matched resume covers, with the resume sentence showing it.
+
+    Requirements and the matched resumes' sentences are embedded in one batch (through the
+    embedding cache, so candidates seen before cost nothing) and scored with one
+    requirement × sentence matrix product. A requirement is covered when its best sentence
+    reaches the similarity threshold. A requirement naming a known skill is covered only when
+    the resume names that skill too (by any alias); the most similar such sentence is the
+    evidence. No LLM is involved.
+    """
+
+    def __init__(self, embeddings, threshold: float = 0.5, max_sentences: int = 200):
+        self.embeddings = embeddings
+        self.threshold = threshold
+        self.max_sentences = max_sentences
+
+    @classmethod
+    def from_env(cls, embeddings) -> Optional["MatchExplainer"]:
+        if os.getenv("ATS_EXPLAIN", "1") == "0":
+            return None
+        return cls(embeddings, threshold=float(os.getenv("ATS_EXPLAIN_THRESHOLD", "0.5")))
+
+    def explain(self, job_description: str, matches: List[Document]) -> List[dict]:
+        """One explanation per match: coverage and, per requirement, similarity and evidence."""
+        requirements = split_requirements(job_description)
+        if not requirements or not matches:
+            return []
+        explain_start = time.time()
+        sentences = [split_spans(doc.page_content, min_chars=20, max_chars=300)[:self.max_sentences]
+                     for doc in matches]
+        flat = [sentence for doc_sentences in sentences for sentence in doc_sentences]
+        vectors = np.asarray(self.embeddings.embed_documents([r["text"] for r in requirements] + flat),
+                             dtype=np.float32)
+        requirement_vectors, sentence_vectors = vectors[:len(requirements)], vectors[len(requirements):]
+        similarity = requirement_vectors @ sentence_vectors.T if flat else np.zeros((len(requirements), 0))
+
+        # Sentences naming a requirement's skill outrank every merely similar one
+        is_skill = np.array([requirement["skill"] is not None for requirement in requirements])
+        mentions = np.zeros_like(similarity, dtype=bool)
+        for row, requirement in enumerate(requirements):
+            if requirement["skill"] is not None:
+                mentions[row] = [mentions_skill(requirement["skill"], sentence) for sentence in flat]
+        ranked = similarity + mentions
+
+        explanations = []
+        offset = 0
+        rows = np.arange(len(requirements))
+        for doc, doc_sentences in zip(matches, sentences):
+            end = offset + len(doc_sentences)
+            if end == offset:
+                best = np.zeros(len(requirements), dtype=np.int64)
+                best_similarity = np.zeros(len(requirements))
+                mentioned = np.zeros(len(requirements), dtype=bool)
+            else:
+                best = ranked[:, offset:end].argmax(axis=1)
+                best_similarity = similarity[:, offset:end][rows, best]
+                mentioned = mentions[:, offset:end][rows, best]
+            covered = np.where(is_skill, mentioned, best_similarity >= self.threshold)
+            explanations.append({
+                "source": doc.metadata.get("source"),
+                "score": doc.metadata.get("score"),
+                "coverage": float(covered.mean()),
+                "requirements": [{
+                    "requirement": requirement["text"],
+                    "covered": bool(covered[row]),
+                    "skill": requirement["skill"],
+                    "similarity": round(float(best_similarity[row]), 3),
+                    "evidence": doc_sentences[best[row]] if covered[row] else None,
+                } for row, requirement in enumerate(requirements)],
+            })
+            offset = end
+
+        explain_time = time.time() - explain_start
+        metrics.observe("explain.matches", explain_time, candidates=len(matches), requirements=len(requirements))
+        if metrics.verbose:
+            print(f"🧾 Explained {len(matches)} matches against {len(requirements)} requirements "
+                  f"({len(flat)} resume sentences) in {explain_time*1000:.0f}ms")
+        return explanations
+
+def format_explanation(explanation: dict, max_evidence_chars: int = 120) -> str:
+    """Indented lines for the console: covered requirements with evidence, then the gaps."""
+    covered = [r for r in explanation["requirements"] if r["covered"]]
+    missing = [r["requirement"] for r in explanation["requirements"] if not r["covered"]]
+    lines = [f"   Covers {len(covered)}/{len(explanation['requirements'])} requirements"]
+    for requirement in covered:
+        evidence = requirement["evidence"]
+        if len(evidence) > max_evidence_chars:
+            evidence = evidence[:max_evidence_chars].rsplit(" ", 1)[0] + "…"
+        how = "named" if requirement["skill"] else f"{requirement['similarity']:.2f}"
+        lines.append(f"   ✔ {requirement['requirement']} ({how}): \"{evidence}\"")
+    if missing:
+        lines.append(f"   ✘ Not evident: {'; '.join(missing)}")
+    return "\n".join(lines)
@@ -0,0 +1,257 @@
+import os
+import re
+import threading
+import numpy as np
+from typing import Dict, List, Optional
+
+FILTER_FIELDS = ("years", "degree", "location")
+DEGREE_LEVELS = {"none": 0, "associate": 1, "bachelor": 2, "master": 3, "phd": 4}
+
+_DEGREE_PATTERNS = [
+    ("phd", re.compile(r"\b(ph\.?\s?d|doctor of philosophy|doctorate)\b", re.I)),
+    ("master", re.compile(r"\b(master'?s?|m\.?sc|m\.?s\.|mba|m\.?tech|m\.?eng)\b", re.I)),
+    ("bachelor", re.compile(r"\b(bachelor'?s?|b\.?sc|b\.?s\.|b\.?a\.|b\.?tech|b\.?eng|undergraduate degree)\b", re.I)),
+    ("associate", re.compile(r"\bassociate'?s? degree\b", re.I)),
+]
+_YEARS_PATTERN = re.compile(r"(\d{1,2})\s*\+?\s*(?:years?|yrs?)(?:\s+of)?\s+(?:\w+\s+){0,3}?experience", re.I)
+_LOCATION_PATTERN = re.compile(r"\b(?i:location|based in|located in|address)\s*[:\-]?\s*([A-Z][A-Za-z .'\-]{1,40}?)(?=[,;|\n]|\.\s|\s{2}|\s+[A-Z][a-z]+:|$)")
+
+def extract_fields(text: str) -> Dict[str, object]:
+    """Pull the structured fields recruiters filter on out of resume text."""
+    degree = "none"
+    for level, pattern in _DEGREE_PATTERNS:
+        if pattern.search(text):
+            degree = level
+            break
+
+    years = [int(match) for match in _YEARS_PATTERN.findall(text)]
+    location = _LOCATION_PATTERN.search(text)
+    return {
+        "years": max(years) if years else None,
+        "degree": degree,
+        "location": location.group(1).strip().lower() if location else None,
+    }
+
+_FILTER_TOKEN = re.compile(r"""\s*(?:'([^']*)'|"([^"]*)"|(>=|<=|!=|=|>|<)|([(),])|([^\s(),<>=!'"]+))""")
+_NUMERIC_OPS = (">=", "<=", "!=", "=", ">", "<")
+
+def _filter_tokens(expression: str) -> List[tuple]:
+    """(kind, text) tokens: "value" for quoted strings, "op", "punct" or "word"."""
+    tokens = []
+    expression = expression.strip()
+    position = 0
+    while position < len(expression):
+        match = _FILTER_TOKEN.match(expression, position)
+        if match is None:
+            raise ValueError(f"Cannot parse filter at '{expression[position:]}'")
+        single, double, op, punct, word = match.groups()
+        if single is not None or double is not None:
+            tokens.append(("value", single if single is not None else double))
+        elif op is not None:
+            tokens.append(("op", op))
+        elif punct is not None:
+            tokens.append(("punct", punct))
+        else:
+            tokens.append(("word", word))
+        position = match.end()
+    return tokens
+
+def _is_and(token: Optional[tuple]) -> bool:
+    return token is not None and token[0] == "word" and token[1].lower() == "and"
+
+def parse_filter(expression: str) -> List[tuple]:
+    """Parse e.g. "years >= 5 and degree >= master and location in (london, 'new york')".
+
+    Returns (field, operator, value) clauses that are all required: value is a float for
+    years, a degree level for degree and a list of lowercase names for location. Clauses
+    are joined by "and" outside parentheses and quotes, so `location in (trinidad and tobago)`
+    is one location. Raises ValueError saying what could not be parsed.
+    """
+    tokens = _filter_tokens(expression)
+    clauses = []
+    position = 0
+
+    def peek() -> Optional[tuple]:
+        return tokens[position] if position < len(tokens) else None
+
+    while position < len(tokens):
+        if clauses:
+            if not _is_and(peek()):
+                raise ValueError(f"Expected 'and' between filter clauses, got '{peek()[1]}'")
+            position += 1
+        token = peek()
+        if token is None or token[0] != "word":
+            raise ValueError(f"Expected a filter field, got '{token[1] if token else 'end of filter'}'")
+        field = token[1].lower()
+        if field not in FILTER_FIELDS:
+            raise ValueError(f"Unknown filter field '{field}', expected one of {list(FILTER_FIELDS)}")
+        position += 1
+
+        token = peek()
+        if token is None or not (token[0] == "op" or (token[0] == "word" and token[1].lower() == "in")):
+            raise ValueError(f"Expected an operator after '{field}'")
+        op = token[1].lower()
+        position += 1
+
+        values, words = [], []
+        if peek() == ("punct", "("):
+            position += 1
+            while True:
+                token = peek()
+                if token is None:
+                    raise ValueError(f"Missing ')' in the {field} filter")
+                position += 1
+                if token[0] == "punct":
+                    if token[1] == "(":
+                        raise ValueError(f"Nested '(' in the {field} filter")
+                    if words:
+                        values.append(" ".join(words))
+                    words = []
+                    if token[1] == ")":
+                        break
+                else:
+                    words.append(token[1])
+        else:
+            # Only locations run to several words ("new york"); years and degree take one
+            while (peek() is not None and not _is_and(peek()) and peek()[0] in ("word", "value")
+                   and (field == "location" or not words)):
+                words.append(peek()[1])
+                position += 1
+            if words:
+                values.append(" ".join(words))
+        if not values:
+            raise ValueError(f"Missing value in the {field} filter")
+        clauses.append((field, op, _filter_value(field, op, values)))
+
+    if not clauses:
+        raise ValueError("Empty filter")
+    return clauses
+
+def _filter_value(field: str, op: str, values: List[str]):
+    if field == "location":
+        if op not in ("=", "!=", "in"):
+            raise ValueError(f"Unsupported operator '{op}' for location")
+        return [value.strip().lower() for value in values]
+    if op not in _NUMERIC_OPS or len(values) != 1:
+        raise ValueError(f"{field} takes one value and one of {', '.join(_NUMERIC_OPS)}")
+    if field == "years":
+        try:
+            return float(values[0])
+        except ValueError:
+            raise ValueError(f"years must be a number, got '{values[0]}'") from None
+    level = values[0].strip().lower()
+    if level not in DEGREE_LEVELS:
+        raise ValueError(f"Unknown degree '{level}', expected one of {list(DEGREE_LEVELS)}")
+    return DEGREE_LEVELS[level]
+
+class MetadataIndex:
+    """Columnar filter index aligned with FAISS row ids.
+
+    years is a float32 column (NaN when unknown), degree an int8 ordinal column and location
+    a dictionary-encoded int32 column. A filter expression evaluates to a boolean row mask
+    that is handed to FAISS as an ID selector.
+    """
+
+    def __init__(self):
+        self.years = np.zeros(0, dtype=np.float32)
+        self.degree = np.zeros(0, dtype=np.int8)
+        self.location = np.zeros(0, dtype=np.int32)
+        self.locations: List[str] = [""]  # code 0 = unknown
+        self._location_codes: Dict[str, int] = {"": 0}
+        # Appended rows are buffered and folded into the columns on first read, so streaming
+        # ingest does not copy every column on every batch
+        self._pending: List[tuple] = []
+        self._pending_rows = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.years) + self._pending_rows
+
+    def append(self, metadatas: List[dict]):
+        """Append rows in the same order their vectors were added to FAISS."""
+        years = [m.get("years") if m.get("years") is not None else np.nan for m in metadatas]
+        degrees = [DEGREE_LEVELS.get(m.get("degree") or "none", 0) for m in metadatas]
+        with self._lock:
+            locations = [self._encode_location(m.get("location")) for m in metadatas]
+            self._pending.append((np.array(years, dtype=np.float32), np.array(degrees, dtype=np.int8),
+                                  np.array(locations, dtype=np.int32)))
+            self._pending_rows += len(metadatas)
+
+    def _consolidate(self):
+        with self._lock:
+            if not self._pending:
+                return
+            self.years = np.concatenate([self.years] + [years for years, _, _ in self._pending])
+            self.degree = np.concatenate([self.degree] + [degrees for _, degrees, _ in self._pending])
+            self.location = np.concatenate([self.location] + [locations for _, _, locations in self._pending])
+            self._pending = []
+            self._pending_rows = 0
+
+    def _encode_location(self, location: Optional[str]) -> int:
+        location = (location or "").strip().lower()
+        code = self._location_codes.get(location)
+        if code is None:
+            code = self._location_codes[location] = len(self.locations)
+            self.locations.append(location)
+        return code
+
+    def mask(self, expression: str) -> np.ndarray:
+        """Evaluate e.g. "years >= 5 and degree >= master and location in (london, berlin)"."""
+        clauses = parse_filter(expression)
+        self._consolidate()
+        result = np.ones(len(self), dtype=bool)
+        for field, op, value in clauses:
+            result &= self._clause_mask(field, op, value)
+        return result
+
+    def _clause_mask(self, field: str, op: str, value) -> np.ndarray:
+        if field == "location":
+            codes = [self._location_codes[v] for v in value if v in self._location_codes]
+            hit = np.isin(self.location, codes)
+            return ~hit if op == "!=" else hit
+
+        column = self.years if field == "years" else self.degree
+        with np.errstate(invalid="ignore"):
+            if op == ">=":
+                return column >= value
+            if op == "<=":
+                return column <= value
+            if op == ">":
+                return column > value
+            if op == "<":
+                return column < value
+            if op == "=":
+                return column == value
+            return column != value
+
+    def save(self, folder_path: str):
+        self._consolidate()
+        np.savez(os.path.join(folder_path, "metadata_index.npz"), years=self.years, degree=self.degree,
+                 location=self.location, locations=np.array(self.locations, dtype=object))
+
+    @classmethod
+    def load(cls, folder_path: str, expected_rows: int) -> Optional["MetadataIndex"]:
+        path = os.path.join(folder_path, "metadata_index.npz")
+        if not os.path.exists(path):
+            return None
+        data = np.load(path, allow_pickle=True)
+        if len(data["years"]) != expected_rows:
+            return None
+        index = cls()
+        index.years = data["years"]
+        index.degree = data["degree"]
+        index.location = data["location"]
+        index.locations = list(data["locations"])
+        index._location_codes = {location: code for code, location in enumerate(index.locations)}
+        return index
+
+    @classmethod
+    def from_faiss(cls, faiss_store) -> "MetadataIndex":
+        """Rebuild from the Document metadata held in a LangChain FAISS docstore."""
+        index = cls()
+        metadatas = []
+        for idx in range(faiss_store.index.ntotal):
+            doc = faiss_store.docstore.search(faiss_store.index_to_docstore_id[idx])
+            metadatas.append(getattr(doc, "metadata", {}))
+        index.append(metadatas)
+        return index
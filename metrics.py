@@ -0,0 +1,247 @@
+"""Process-wide metrics registry: named spans, histograms, counters and structured trace logs.
+
+    from metrics import metrics
+    with metrics.span("search.vector", k=5):
+        ...
+    metrics.observe("qa.time_to_first_token", seconds)
+    metrics.inc("qa.answer_cache_hits")
+
+Configuration (environment variables):
+    ATS_METRICS=0           disable recording entirely; span() returns a shared no-op
+    ATS_LOG_FORMAT=text     text (emoji progress output, default) | json (also emit one JSON
+                            object per finished span) | quiet (suppress per-page/per-file detail)
+    ATS_TRACE_FILE=path     where JSON spans go (default stderr)
+    ATS_METRICS_PORT=9464   serve Prometheus text format on this port
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import bisect
+import threading
+import contextvars
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_current_span: contextvars.ContextVar = contextvars.ContextVar("ats_span", default=None)
+
+def _metric_name(name: str) -> str:
+    return "ats_" + "".join(c if c.isalnum() else "_" for c in name)
+
+class Histogram:
+    """Cumulative buckets for Prometheus plus a bounded sample window for p50/p95/p99."""
+
+    def __init__(self, name: str, buckets=DEFAULT_BUCKETS, window: int = 4096):
+        self.name = name
+        self.buckets = tuple(buckets)
+        self.bucket_counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        with self._lock:
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                self.bucket_counts[index] += 1
+            self.count += 1
+            self.sum += value
+            self.samples.append(value)
+
+    def percentiles(self, quantiles=(50, 95, 99)) -> Dict[int, float]:
+        with self._lock:
+            ordered = sorted(self.samples)
+        if not ordered:
+            return {q: 0.0 for q in quantiles}
+        return {q: ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))] for q in quantiles}
+
+class Counter:
+    def __init__(self, name: str):
+        self.name = name
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self.value += amount
+
+class Span:
+    __slots__ = ("registry", "name", "attrs", "start", "span_id", "trace_id", "parent_id", "_token")
+
+    def __init__(self, registry: "MetricsRegistry", name: str, attrs: dict):
+        self.registry = registry
+        self.name = name
+        self.attrs = attrs
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        parent = _current_span.get()
+        self.span_id = uuid.uuid4().hex[:16]
+        self.trace_id = parent.trace_id if parent is not None else uuid.uuid4().hex
+        self.parent_id = parent.span_id if parent is not None else None
+        self._token = _current_span.set(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self.start
+        _current_span.reset(self._token)
+        self.registry.histogram(self.name).observe(duration)
+        if self.registry.log_format == "json":
+            self.registry.emit({
+                "ts": time.time(), "span": self.name, "duration_ms": round(duration * 1000, 3),
+                "trace_id": self.trace_id, "span_id": self.span_id, "parent_id": self.parent_id,
+                "status": "error" if exc_type else "ok", **self.attrs,
+            })
+        return False
+
+class _NoopSpan:
+    def set(self, **attrs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_NOOP_SPAN = _NoopSpan()
+
+class MetricsRegistry:
+    def __init__(self, enabled: bool = True, log_format: str = "text", trace_file: Optional[str] = None):
+        self.enabled = enabled
+        self.log_format = log_format
+        self._trace_stream = open(trace_file, "a", buffering=1) if trace_file else sys.stderr
+        self._histograms: Dict[str, Histogram] = {}
+        self._counters: Dict[str, Counter] = {}
+        self._lock = threading.Lock()
+        self._emit_lock = threading.Lock()
+        self._server = None
+
+    @classmethod
+    def from_env(cls) -> "MetricsRegistry":
+        return cls(enabled=os.getenv("ATS_METRICS", "1") != "0",
+                   log_format=os.getenv("ATS_LOG_FORMAT", "text"),
+                   trace_file=os.getenv("ATS_TRACE_FILE") or None)
+
+    @property
+    def verbose(self) -> bool:
+        """Whether per-page / per-file detail should be printed."""
+        return self.log_format == "text"
+
+    def histogram(self, name: str) -> Histogram:
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(name, Histogram(name))
+        return histogram
+
+    def counter(self, name: str) -> Counter:
+        counter = self._counters.get(name)
+        if counter is None:
+            with self._lock:
+                counter = self._counters.setdefault(name, Counter(name))
+        return counter
+
+    def observe(self, name: str, seconds: float, **attrs):
+        """Record a duration measured elsewhere; in JSON mode it is logged under the current span."""
+        if not self.enabled:
+            return
+        self.histogram(name).observe(seconds)
+        if self.log_format == "json":
+            parent = _current_span.get()
+            self.emit({"ts": time.time(), "span": name, "duration_ms": round(seconds * 1000, 3),
+                       "trace_id": parent.trace_id if parent is not None else None,
+                       "parent_id": parent.span_id if parent is not None else None, **attrs})
+
+    def inc(self, name: str, amount: float = 1):
+        if self.enabled:
+            self.counter(name).inc(amount)
+
+    def span(self, name: str, **attrs):
+        if not self.enabled:
+            return _NOOP_SPAN
+        return Span(self, name, attrs)
+
+    def event(self, name: str, **fields):
+        """Structured log record (JSON mode only)."""
+        if self.enabled and self.log_format == "json":
+            span = _current_span.get()
+            self.emit({"ts": time.time(), "event": name,
+                       "trace_id": span.trace_id if span is not None else None, **fields})
+
+    def emit(self, record: dict):
+        line = json.dumps(record, default=str)
+        with self._emit_lock:
+            self._trace_stream.write(line + "\n")
+
+    def reset(self):
+        with self._lock:
+            self._histograms = {}
+            self._counters = {}
+
+    def snapshot(self) -> dict:
+        return {
+            "histograms": {name: {"count": h.count, "sum": h.sum, **{f"p{q}": v for q, v in h.percentiles().items()}}
+                           for name, h in sorted(self._histograms.items())},
+            "counters": {name: c.value for name, c in sorted(self._counters.items())},
+        }
+
+    def render_prometheus(self) -> str:
+        lines: List[str] = []
+        for name, histogram in sorted(self._histograms.items()):
+            metric = _metric_name(name) + "_seconds"
+            lines.append(f"# TYPE {metric} histogram")
+            cumulative = 0
+            with histogram._lock:
+                for bound, count in zip(histogram.buckets, histogram.bucket_counts):
+                    cumulative += count
+                    lines.append(f'{metric}_bucket{{le="{bound}"}} {cumulative}')
+                lines.append(f'{metric}_bucket{{le="+Inf"}} {histogram.count}')
+                lines.append(f"{metric}_sum {histogram.sum}")
+                lines.append(f"{metric}_count {histogram.count}")
+        for name, counter in sorted(self._counters.items()):
+            metric = _metric_name(name) + "_total"
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric} {counter.value}")
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port: int, host: str = "0.0.0.0"):
+        """Expose /metrics in Prometheus text format from a background thread."""
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = registry.render_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True, name="metrics").start()
+        print(f"📈 Prometheus metrics on http://{host}:{port}/metrics")
+
+    def print_summary(self):
+        if not self.enabled or not self._histograms:
+            return
+        print(f"\n{'stage':<28} {'count':>7} {'p50':>9} {'p95':>9} {'p99':>9} {'total':>9}")
+        for name, histogram in sorted(self._histograms.items()):
+            p = histogram.percentiles()
+            print(f"{name:<28} {histogram.count:>7} {p[50]*1000:>7.1f}ms {p[95]*1000:>7.1f}ms "
+                  f"{p[99]*1000:>7.1f}ms {histogram.sum:>8.2f}s")
+        for name, counter in sorted(self._counters.items()):
+            print(f"{name:<28} {counter.value:>7}")
+
+metrics = MetricsRegistry.from_env()
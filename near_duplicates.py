@@ -0,0 +1,138 @@
+import os
+import re
+import zlib
+import numpy as np
+from typing import Dict, Iterable, List, Optional, Tuple
+from metrics import metrics
+
+_WORD = re.compile(r"\w+")
+_PRIME = np.uint64((1 << 31) - 1)
+
+class DedupConfig:
+    def __init__(self, threshold: float = 0.8, num_perm: int = 128, bands: int = 32, shingle_words: int = 3):
+        if num_perm % bands:
+            raise ValueError(f"ATS_DEDUP_PERMUTATIONS ({num_perm}) must be a multiple of the band count ({bands})")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.shingle_words = shingle_words
+
+    @classmethod
+    def from_env(cls) -> Optional["DedupConfig"]:
+        """None when ATS_DEDUP=0, which indexes every resume as before."""
+        if os.getenv("ATS_DEDUP", "1") == "0":
+            return None
+        return cls(threshold=float(os.getenv("ATS_DEDUP_THRESHOLD", "0.8")),
+                   num_perm=int(os.getenv("ATS_DEDUP_PERMUTATIONS", "128")),
+                   bands=int(os.getenv("ATS_DEDUP_BANDS", "32")),
+                   shingle_words=int(os.getenv("ATS_DEDUP_SHINGLE_WORDS", "3")))
+
+    def describe(self) -> str:
+        return (f"Jaccard >= {self.threshold}, {self.num_perm} permutations in {self.bands} bands, "
+                f"{self.shingle_words}-word shingles")
+
+class NearDuplicateIndex:
+    """MinHash signatures with an LSH band index, collapsing near-duplicate resumes as they stream in.
+
+    The first resume seen becomes the canonical copy; later resumes whose estimated Jaccard
+    similarity of word shingles reaches the threshold are recorded as its aliases and never
+    embedded. LSH bands only nominate candidates, the full signature decides.
+    """
+
+    def __init__(self, config: Optional[DedupConfig] = None):
+        self.config = config or DedupConfig()
+        rng = np.random.default_rng(1)
+        self._a = rng.integers(1, int(_PRIME), size=self.config.num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, int(_PRIME), size=self.config.num_perm, dtype=np.uint64)
+        self.rows = self.config.num_perm // self.config.bands
+        self.signatures: Dict[str, np.ndarray] = {}
+        self.buckets: Dict[Tuple[int, bytes], List[str]] = {}
+        self.aliases: Dict[str, List[str]] = {}
+        self.canonical_of: Dict[str, str] = {}
+        self.stats = {"checked": 0, "duplicates": 0, "text_bytes_saved": 0}
+
+    def shingles(self, text: str) -> np.ndarray:
+        words = _WORD.findall(text.lower())
+        size = self.config.shingle_words
+        if len(words) < size:
+            grams = [" ".join(words)]
+        else:
+            grams = [" ".join(words[i:i + size]) for i in range(len(words) - size + 1)]
+        return np.unique(np.fromiter((zlib.crc32(gram.encode("utf-8")) for gram in grams),
+                                     dtype=np.uint64, count=len(grams)) % _PRIME)
+
+    def signature(self, text: str) -> np.ndarray:
+        hashes = self.shingles(text)
+        # (a*x + b) mod p for every permutation and shingle; a, b, x < p = 2^31-1, so no uint64 overflow
+        permuted = (np.outer(self._a, hashes) + self._b[:, None]) % _PRIME
+        return permuted.min(axis=1)
+
+    def _band_keys(self, signature: np.ndarray):
+        for band in range(self.config.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def similarity(self, first: np.ndarray, second: np.ndarray) -> float:
+        return float(np.mean(first == second))
+
+    def check(self, source: str, text: str) -> Optional[str]:
+        """The canonical source this resume duplicates, or None after registering it as canonical."""
+        self.stats["checked"] += 1
+        signature = self.signature(text)
+        candidates = {other for key in self._band_keys(signature) for other in self.buckets.get(key, ())}
+        best, best_similarity = None, 0.0
+        for other in candidates:
+            similarity = self.similarity(signature, self.signatures[other])
+            if similarity > best_similarity:
+                best, best_similarity = other, similarity
+        if best is not None and best_similarity >= self.config.threshold:
+            self.aliases.setdefault(best, []).append(source)
+            self.canonical_of[source] = best
+            self.stats["duplicates"] += 1
+            self.stats["text_bytes_saved"] += len(text.encode("utf-8"))
+            metrics.inc("dedup.duplicates")
+            if metrics.verbose:
+                print(f"🧬 {source} duplicates {best} (similarity {best_similarity:.2f})")
+            return best
+        self._register(source, signature)
+        return None
+
+    def _register(self, source: str, signature: np.ndarray):
+        self.signatures[source] = signature
+        for key in self._band_keys(signature):
+            self.buckets.setdefault(key, []).append(source)
+
+    def add(self, source: str, text: str, aliases: Iterable[str] = ()):
+        """Register an already indexed canonical resume and the aliases collapsed into it."""
+        self._register(source, self.signature(text))
+        for alias in aliases:
+            self.aliases.setdefault(source, []).append(alias)
+            self.canonical_of[alias] = source
+
+    def remove(self, source: str) -> List[str]:
+        """Forget a resume; for a canonical one, return its aliases, which no longer have a copy indexed."""
+        canonical = self.canonical_of.pop(source, None)
+        if canonical is not None:
+            self.aliases[canonical].remove(source)
+            if not self.aliases[canonical]:
+                del self.aliases[canonical]
+            return []
+        signature = self.signatures.pop(source, None)
+        if signature is None:
+            return []
+        for key in self._band_keys(signature):
+            bucket = self.buckets[key]
+            bucket.remove(source)
+            if not bucket:
+                del self.buckets[key]
+        orphans = self.aliases.pop(source, [])
+        for alias in orphans:
+            del self.canonical_of[alias]
+        return orphans
+
+    def print_summary(self, embeddings_saved: int):
+        if not self.stats["duplicates"]:
+            print(f"🧬 No near-duplicates among {self.stats['checked']} resumes")
+            return
+        print(f"🧬 Collapsed {self.stats['duplicates']} near-duplicate resumes into "
+              f"{len(self.aliases)} canonical ones: {embeddings_saved} embeddings and "
+              f"{self.stats['text_bytes_saved'] / 1024:.1f} KB of text not indexed")
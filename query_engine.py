@@ -6,22 +6,148 @@ import requests
 import time
 import json
 import os
+from typing import Iterator, List, Optional
+import numpy as np
+from langchain.callbacks.base import BaseCallbackHandler
+from langchain.schema import Document
+from answer_cache import AnswerCache, document_key
+from context_packer import ContextPacker, estimate_tokens
+from match_explainer import MatchExplainer
+from metrics import metrics
+
+QA_TEMPLATE = """
+You are an HR assistant. Answer based only on the resume information provided.
+
+Resume Information:
+{context}
+
+Question: {input}
+
+Answer clearly and concisely. If information is not available, say "I don't have that information."
+
+Answer: """
+
+def ollama_eval_stats(info: dict) -> dict:
+    """Token counts and rates from the final Ollama response; durations are in nanoseconds."""
+    stats = {}
+    if info.get("eval_count") and info.get("eval_duration"):
+        stats["eval_count"] = info["eval_count"]
+        stats["eval_tokens_per_sec"] = info["eval_count"] / (info["eval_duration"] / 1e9)
+    if info.get("prompt_eval_count") and info.get("prompt_eval_duration"):
+        stats["prompt_eval_count"] = info["prompt_eval_count"]
+        stats["prompt_tokens_per_sec"] = info["prompt_eval_count"] / (info["prompt_eval_duration"] / 1e9)
+    if info.get("load_duration"):
+        stats["load_time"] = info["load_duration"] / 1e9
+    return stats
+
+def ensure_ollama_model(base_url):
+    """Wait for the Ollama server and pull llama2:7b if it is missing."""
+    connection_start = time.time()
+    print("⏳ Connecting to Ollama...")
+    session = requests.Session()  # one keep-alive connection for all the calls below
+    
+    # Wait for service
+    for i in range(30):
+        try:
+            response = session.get(f"{base_url}/api/tags", timeout=5)
+            if response.status_code == 200:
+                connection_time = time.time() - connection_start
+                print(f"✅ Ollama connected in {connection_time:.2f}s")
+                break
+        except:
+            if i < 29:
+                print(f"⏳ Waiting... ({i+1}/30)")
+                time.sleep(3)
+            else:
+                raise Exception("❌ Could not connect to Ollama")
+    
+    # Check/download model
+    try:
+        model_check_start = time.time()
+        models_response = session.get(f"{base_url}/api/tags")
+        models = models_response.json().get("models", [])
+        model_names = [model.get("name", "") for model in models]
+        
+        llama2_available = any("llama2" in name.lower() for name in model_names)
+        
+        if not llama2_available:
+            print("📥 Downloading Llama2 7B...")
+            print("💡 This takes 5-15 minutes (one-time)")
+            
+            download_start = time.time()
+            pull_response = session.post(
+                f"{base_url}/api/pull",
+                json={"name": "llama2:7b"},
+                stream=True,
+                timeout=1800
+            )
+            
+            if pull_response.status_code == 200:
+                for line in pull_response.iter_lines():
+                    if line:
+                        try:
+                            data = json.loads(line)
+                            if "status" in data:
+                                print(f"📥 {data['status']}")
+                        except:
+                            pass
+                
+                download_time = time.time() - download_start
+                print(f"✅ Download complete in {download_time/60:.1f} minutes!")
+        else:
+            model_check_time = time.time() - model_check_start
+            print(f"✅ Llama2 ready (checked in {model_check_time:.2f}s)")
+            
+    except Exception as e:
+        print(f"⚠️  Model setup warning: {e}")
+
+class OllamaStatsHandler(BaseCallbackHandler):
+    """Capture the eval counters Ollama reports on the final chunk of a streamed generation."""
+
+    def __init__(self):
+        self.info = {}
+
+    def on_llm_end(self, response, **kwargs):
+        for generations in response.generations:
+            for generation in generations:
+                if generation.generation_info:
+                    self.info = generation.generation_info
+
+    def stats(self) -> dict:
+        return ollama_eval_stats(self.info)
 
 class QueryEngine:
-    def __init__(self, vector_store_wrapper):
-        """Initialize with VectorStore wrapper object."""
+    def __init__(self, vector_store_wrapper, setup_model: bool = True,
+                 answer_cache: Optional[AnswerCache] = None,
+                 context_packer: Optional[ContextPacker] = None, profile_fast_path: bool = True,
+                 match_explainer: Optional[MatchExplainer] = None):
+        """Initialize with VectorStore wrapper object.
+
+        Pass setup_model=False when ensure_ollama_model has already run, e.g. concurrently at startup.
+        answer_cache reuses Llama2 answers for repeated or rephrased questions; context_packer
+        trims retrieved resumes to the spans relevant to the question before prompting.
+        With profile_fast_path, skill/years/degree/contact lookups are answered from the
+        candidate profiles without calling Llama2. match_explainer adds requirement coverage
+        and evidence to every job match, also without calling Llama2.
+        """
         init_start = time.time()
         self.vector_store_wrapper = vector_store_wrapper
+        self.answer_cache = answer_cache
+        self.context_packer = context_packer
+        self.profile_fast_path = profile_fast_path
+        self.match_explainer = match_explainer
+        self._cached_index = None
         
         print("🤖 Setting up Llama2 7B AI model...")
         
         ollama_base_url = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
         
         # Time the model setup
-        setup_start = time.time()
-        self._setup_ollama_model(ollama_base_url)
-        setup_time = time.time() - setup_start
-        print(f"⏱️  Model setup: {setup_time:.2f}s")
+        if setup_model:
+            setup_start = time.time()
+            self._setup_ollama_model(ollama_base_url)
+            setup_time = time.time() - setup_start
+            print(f"⏱️  Model setup: {setup_time:.2f}s")
         
         # Time the LLM initialization
         llm_start = time.time()
@@ -34,90 +160,64 @@ class QueryEngine:
         print(f"⏱️  LLM initialization: {llm_time:.2f}s")
         
         total_init_time = time.time() - init_start
-        print(f"✅ Llama2 7B ready in {total_init_time:.2f}s total!")
+        if setup_model:
+            print(f"✅ Llama2 7B ready in {total_init_time:.2f}s total!")
+        else:
+            print(f"✅ Llama2 7B client configured in {total_init_time:.2f}s")
         
     def _setup_ollama_model(self, base_url):
-        connection_start = time.time()
-        print("⏳ Connecting to Ollama...")
-        
-        # Wait for service
-        for i in range(30):
-            try:
-                response = requests.get(f"{base_url}/api/tags", timeout=5)
-                if response.status_code == 200:
-                    connection_time = time.time() - connection_start
-                    print(f"✅ Ollama connected in {connection_time:.2f}s")
-                    break
-            except:
-                if i < 29:
-                    print(f"⏳ Waiting... ({i+1}/30)")
-                    time.sleep(3)
-                else:
-                    raise Exception("❌ Could not connect to Ollama")
-        
-        # Check/download model
-        try:
-            model_check_start = time.time()
-            models_response = requests.get(f"{base_url}/api/tags")
-            models = models_response.json().get("models", [])
-            model_names = [model.get("name", "") for model in models]
-            
-            llama2_available = any("llama2" in name.lower() for name in model_names)
-            
-            if not llama2_available:
-                print("📥 Downloading Llama2 7B...")
-                print("💡 This takes 5-15 minutes (one-time)")
-                
-                download_start = time.time()
-                pull_response = requests.post(
-                    f"{base_url}/api/pull",
-                    json={"name": "llama2:7b"},
-                    stream=True,
-                    timeout=1800
-                )
-                
-                if pull_response.status_code == 200:
-                    for line in pull_response.iter_lines():
-                        if line:
-                            try:
-                                data = json.loads(line)
-                                if "status" in data:
-                                    print(f"📥 {data['status']}")
-                            except:
-                                pass
-                    
-                    download_time = time.time() - download_start
-                    print(f"✅ Download complete in {download_time/60:.1f} minutes!")
-            else:
-                model_check_time = time.time() - model_check_start
-                print(f"✅ Llama2 ready (checked in {model_check_time:.2f}s)")
-                
-        except Exception as e:
-            print(f"⚠️  Model setup warning: {e}")
+        ensure_ollama_model(base_url)
     
-    def find_matching_resumes(self, job_description: str, top_k: int = 5):
-        """Find matching resumes with timing."""
+    def find_matching_resumes(self, job_description: str, top_k: int = 5,
+                              mode: str = "vector", prefilter: bool = False,
+                              filter: Optional[str] = None):
+        """Find matching resumes with timing; metadata["score"] holds each match's ranking score.
+
+        mode="hybrid" fuses BM25 over the full resume text with the vector ranking, so exact
+        must-have terms are not missed; prefilter=True restricts the vector stage to resumes
+        that match at least one job description term. filter applies hard metadata constraints
+        such as "years >= 5 and location in (london, berlin)" inside the FAISS search.
+        With a match_explainer, metadata["explanation"] lists the requirements each match covers.
+        """
         if not job_description.strip():
             return []
             
         search_start = time.time()
-        print(f"🔍 Searching for top {top_k} matching resumes...")
+        if metrics.verbose:
+            print(f"🔍 Searching for top {top_k} matching resumes ({mode})...")
         
         try:
-            results = self.vector_store_wrapper.search(job_description, k=top_k)
+            if mode == "hybrid":
+                results = self.vector_store_wrapper.hybrid_search(job_description, k=top_k, prefilter=prefilter,
+                                                                   filter=filter)
+            else:
+                results = self.vector_store_wrapper.search(job_description, k=top_k, filter=filter)
             search_time = time.time() - search_start
             
-            print(f"✅ Found {len(results)} matching resumes")
-            print(f"⏱️  Total search time: {search_time:.3f}s")
-            
-            if len(results) > 0:
-                print(f"📊 Search efficiency: {len(results)/search_time:.1f} results/second")
+            if metrics.verbose:
+                print(f"✅ Found {len(results)} matching resumes")
+                print(f"⏱️  Total search time: {search_time:.3f}s")
+                if len(results) > 0:
+                    print(f"📊 Search efficiency: {len(results)/search_time:.1f} results/second")
             
+            if self.match_explainer is not None and results:
+                self.explain_matches(job_description, results)
             return results
         except Exception as e:
             print(f"❌ Search error: {e}")
             return []
     
+    def explain_matches(self, job_description: str, matches: List) -> List[dict]:
+        """Set metadata["explanation"] on each match; if explaining fails the matches are left as they are."""
+        try:
+            explanations = self.match_explainer.explain(job_description, matches)
+        except Exception as e:
+            print(f"⚠️  Could not explain matches: {e}")
+            return []
+        for doc, explanation in zip(matches, explanations):
+            doc.metadata["explanation"] = explanation
+        return explanations
+    
     def setup_natural_language_query(self):
         """Setup Q&A chain with timing."""
         setup_start = time.time()
@@ -130,20 +230,10 @@ class QueryEngine:
             print(f"⏱️  Retriever setup: {retriever_time:.3f}s")
             
             chain_start = time.time()
-            prompt = PromptTemplate.from_template("""
-You are an HR assistant. Answer based only on the resume information provided.
-
-Resume Information:
-{context}
-
-Question: {input}
-
-Answer clearly and concisely. If information is not available, say "I don't have that information."
-
-Answer: """)
+            prompt = PromptTemplate.from_template(QA_TEMPLATE)
             
-            document_chain = create_stuff_documents_chain(self.llm, prompt)
-            self.retrieval_chain = create_retrieval_chain(retriever, document_chain)
+            self.document_chain = create_stuff_documents_chain(self.llm, prompt)
+            self.retrieval_chain = create_retrieval_chain(retriever, self.document_chain)
             chain_time = time.time() - chain_start
             print(f"⏱️  Chain setup: {chain_time:.3f}s")
             
@@ -156,11 +246,32 @@ Answer: """)
         
     def query(self, question: str):
         """Answer questions with detailed timing."""
+        answer = "".join(self.stream_query(question)).strip()
+        self.print_query_stats()
+        return answer
+    
+    def stream_query(self, question: str) -> Iterator[str]:
+        """Yield the answer as Llama2 generates it.
+
+        Timing for the finished answer (time to first token, inter-token latency and Ollama's
+        own eval counters) is left in last_query_stats; see print_query_stats.
+        """
+        self.last_query_stats = {}
         if not question.strip():
-            return "Please ask a specific question."
+            yield "Please ask a specific question."
+            return
             
         query_start = time.time()
         
+        fast_answer = self.answer_from_profiles(question)
+        if fast_answer is not None:
+            self.last_query_stats = {"cached": False, "fast_path": True, "total_time": time.time() - query_start,
+                                     "time_to_first_token": time.time() - query_start}
+            metrics.inc("qa.fast_path")
+            self._record_query_metrics()
+            yield fast_answer
+            return
+        
         # Setup timing
         if not hasattr(self, 'retrieval_chain') or self.retrieval_chain is None:
             setup_start = time.time()
@@ -169,36 +280,157 @@ Answer: """)
             print(f"⏱️  Q&A setup time: {setup_time:.3f}s")
         
         if not self.retrieval_chain:
-            return "Q&A system not available."
+            yield "Q&A system not available."
+            return
         
-        print("🤖 Llama2 is thinking...")
-        thinking_start = time.time()
+        if metrics.verbose:
+            print("🤖 Llama2 is thinking...")
         
         try:
-            # Document retrieval timing
-            retrieval_start = time.time()
-            response = self.retrieval_chain.invoke({"input": question})
-            total_response_time = time.time() - thinking_start
+            context = self.retrieve_context(question)
+            retrieval_time = context["retrieval_time"]
+            if context["cached"] is not None:
+                self.last_query_stats = {"cached": True, "total_time": time.time() - query_start,
+                                         "time_to_first_token": time.time() - query_start}
+                self._record_query_metrics()
+                yield context["cached"]
+                return
             
-            answer = response.get("answer", "").strip()
+            generation_start = time.time()
+            token_times = []
+            chunks = []
+            ollama_stats = OllamaStatsHandler()
+            metrics.inc("qa.llm_calls")
+            for chunk in self.document_chain.stream({"input": question, "context": context["prompt_docs"]},
+                                                    config={"callbacks": [ollama_stats]}):
+                if not chunk:
+                    continue
+                token_times.append(time.time())
+                chunks.append(chunk)
+                yield chunk
             
+            answer = "".join(chunks).strip()
             if not answer:
-                return "I couldn't generate an answer. Please try rephrasing."
-            
-            # Performance metrics
-            query_total_time = time.time() - query_start
-            print(f"⏱️  AI thinking time: {total_response_time:.2f}s")
-            print(f"⏱️  Total query time: {query_total_time:.2f}s")
+                yield "I couldn't generate an answer. Please try rephrasing."
+                return
             
-            # Estimate tokens per second (rough calculation)
-            answer_length = len(answer.split())
-            if total_response_time > 0:
-                tokens_per_sec = answer_length / total_response_time
-                print(f"📊 Generation speed: ~{tokens_per_sec:.1f} tokens/second")
+            self.remember_answer(question, context, answer)
             
-            return answer
+            gaps = np.diff(token_times) if len(token_times) > 1 else np.zeros(0)
+            self.last_query_stats = {
+                "cached": False,
+                "retrieval_time": retrieval_time,
+                "time_to_first_token": token_times[0] - query_start,
+                "generation_time": token_times[-1] - generation_start,
+                "total_time": time.time() - query_start,
+                "chunks": len(token_times),
+                "inter_token_p50": float(np.percentile(gaps, 50)) if len(gaps) else 0.0,
+                "inter_token_p95": float(np.percentile(gaps, 95)) if len(gaps) else 0.0,
+                **ollama_stats.stats(),
+            }
+            self._record_query_metrics(gaps)
             
         except Exception as e:
+            metrics.inc("qa.errors")
             error_time = time.time() - query_start
             print(f"❌ Query error after {error_time:.2f}s: {e}")
-            return f"Sorry, there was an error: {str(e)}"
+            yield f"Sorry, there was an error: {str(e)}"
+    
+    def _record_query_metrics(self, gaps=()):
+        stats = self.last_query_stats
+        metrics.observe("qa.total", stats["total_time"], cached=stats.get("cached"),
+                        fast_path=stats.get("fast_path", False))
+        metrics.observe("qa.time_to_first_token", stats["time_to_first_token"])
+        if "generation_time" in stats:
+            metrics.observe("qa.generation", stats["generation_time"], chunks=stats["chunks"])
+        if metrics.enabled and len(gaps):
+            inter_token = metrics.histogram("qa.inter_token")
+            for gap in gaps:
+                inter_token.observe(float(gap))
+    
+    def answer_from_profiles(self, question: str) -> Optional[str]:
+        """Answer common lookup questions from the candidate profile index, or None for the LLM."""
+        if not self.profile_fast_path:
+            return None
+        return self.vector_store_wrapper.profile_index.answer(question)
+    
+    def retrieve_context(self, question: str) -> dict:
+        """Retrieve the resumes a question is answered from and look up a cached answer.
+
+        Retrieval is done separately from generation so answers can be cached per document set.
+        On a cache miss, prompt_docs holds the (packed) documents to put in the prompt.
+        """
+        with metrics.span("qa.retrieve") as span:
+            retrieval_start = time.time()
+            docs = self.vector_store_wrapper.search(question, k=3)
+            retrieval_time = time.time() - retrieval_start
+            if metrics.verbose:
+                print(f"⏱️  Document retrieval: {retrieval_time:.3f}s")
+            
+            context = {"docs": docs, "retrieval_time": retrieval_time, "cached": None,
+                       "question_vector": None, "doc_keys": None}
+            if self.answer_cache is not None:
+                self._invalidate_answers_if_index_changed()
+                context["question_vector"] = self.vector_store_wrapper.embeddings.embed_query(question)
+                context["doc_keys"] = [document_key(doc) for doc in docs]
+                context["cached"] = self.answer_cache.get(context["question_vector"], context["doc_keys"])
+            if context["cached"] is None and self.context_packer:
+                pack_start = time.time()
+                context["prompt_docs"] = self.context_packer.pack(question, docs)
+                metrics.observe("qa.pack", time.time() - pack_start)
+                span.set(tokens_before=sum(estimate_tokens(doc.page_content) for doc in docs),
+                         tokens_after=sum(estimate_tokens(doc.page_content) for doc in context["prompt_docs"]))
+            elif context["cached"] is None:
+                context["prompt_docs"] = docs
+            else:
+                metrics.inc("qa.answer_cache_hits")
+            span.set(docs=len(docs), cached=context["cached"] is not None)
+        return context
+    
+    def remember_answer(self, question: str, context: dict, answer: str):
+        if self.answer_cache is not None and answer:
+            self.answer_cache.put(question, context["question_vector"], context["doc_keys"], answer)
+    
+    @staticmethod
+    def build_prompt(question: str, docs) -> str:
+        """The prompt the stuff-documents chain would send, for callers talking to Ollama directly."""
+        return QA_TEMPLATE.format(context="\n\n".join(doc.page_content for doc in docs), input=question)
+    
+    def print_query_stats(self):
+        stats = getattr(self, "last_query_stats", None)
+        if not stats:
+            return
+        if stats.get("fast_path"):
+            print(f"⚡ Answered from candidate profiles in {stats['total_time']*1000:.1f}ms (no LLM call)")
+            return
+        if stats["cached"]:
+            print(f"⏱️  Total query time: {stats['total_time']:.3f}s (cached answer)")
+            return
+        print(f"⏱️  Time to first token: {stats['time_to_first_token']:.2f}s "
+              f"(retrieval {stats['retrieval_time']*1000:.0f}ms)")
+        print(f"⏱️  Inter-token latency: p50 {stats['inter_token_p50']*1000:.0f}ms, "
+              f"p95 {stats['inter_token_p95']*1000:.0f}ms over {stats['chunks']} chunks")
+        print(f"⏱️  Total query time: {stats['total_time']:.2f}s")
+        if "eval_tokens_per_sec" in stats:
+            print(f"📊 Generation speed: {stats['eval_tokens_per_sec']:.1f} tokens/second "
+                  f"({stats['eval_count']} tokens, Ollama eval counters)")
+        if "prompt_tokens_per_sec" in stats:
+            print(f"📊 Prompt processing: {stats['prompt_tokens_per_sec']:.1f} tokens/second "
+                  f"({stats['prompt_eval_count']} tokens)"
+                  + (f", model load {stats['load_time']:.2f}s" if stats.get("load_time", 0) > 0.05 else ""))
+    
+    def _invalidate_answers_if_index_changed(self):
+        """Drop cached answers built on resumes that a rebuild or refresh changed or removed.
+
+        Only the resumes cached answers refer to are read back, not the whole corpus.
+        """
+        marker = self.vector_store_wrapper.index_marker()
+        if marker == self._cached_index:
+            return
+        self._cached_index = marker
+        current = []
+        for source in self.answer_cache.sources():
+            doc = self.vector_store_wrapper.document_for_source(source)
+            if isinstance(doc, Document):
+                current.append(document_key(doc))
+        self.answer_cache.invalidate(current)
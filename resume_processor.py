@@ -1,82 +1,424 @@
 import os
 import time
+import signal
 import pypdf
 import docx2txt
-from typing import List, Tuple
+from collections import defaultdict, deque
+from itertools import chain, groupby
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Iterator, List, Optional, Tuple
+from ingest_manifest import IngestManifest
+from metrics import metrics
+
+class ExtractionTimeout(BaseException):
+    """Raised inside a worker when a single file exceeds its time limit."""
+
+_worker_processor = None
+
+def _init_worker(resume_dir: str, memory_limit_mb: Optional[int]):
+    """Process pool initializer: quiet per-page logging and cap the worker's address space."""
+    global _worker_processor
+    _worker_processor = ResumeProcessor(resume_dir)
+    _worker_processor.verbose = False
+    if memory_limit_mb:
+        try:
+            import resource
+            limit = memory_limit_mb * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        except (ImportError, ValueError, OSError) as e:
+            print(f"⚠️  Could not apply memory limit in worker: {e}")
+
+def _raise_timeout(signum, frame):
+    raise ExtractionTimeout()
+
+def _extract_task(task: Tuple[str, str, Optional[Tuple[int, int]], float]):
+    """Extract one file (or one page range of a PDF) inside a pool worker."""
+    filename, file_path, page_range, timeout = task
+    task_start = time.time()
+    use_alarm = timeout and hasattr(signal, "setitimer")
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        if filename.lower().endswith('.pdf'):
+            text = _worker_processor._extract_from_pdf(file_path, page_range)
+        else:
+            text = _worker_processor._extract_from_docx(file_path)
+        error = None
+    except ExtractionTimeout:
+        text, error = "", f"timed out after {timeout:g}s"
+    except MemoryError:
+        text, error = "", "exceeded memory limit"
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    return text, error, time.time() - task_start, os.getpid()
 
 class ResumeProcessor:
-    def __init__(self, resume_dir: str = "data/resumes"):
+    def __init__(self, resume_dir: str = "data/resumes", workers: int = 1,
+                 file_timeout: float = 120.0, memory_limit_mb: Optional[int] = None,
+                 pages_per_task: int = 0):
+        """Configure extraction.
+
+        workers > 1 extracts files in a process pool. file_timeout and memory_limit_mb bound each
+        worker so one pathological PDF cannot stall the batch; while either is set, a single
+        worker is a one-process pool too, since neither limit can be applied inside this process.
+        file_timeout=0 and no memory limit extract in-process. pages_per_task > 0 splits PDFs
+        longer than that many pages into page ranges extracted by separate workers.
+        """
         self.resume_dir = resume_dir
+        self.workers = workers
+        self.file_timeout = file_timeout
+        self.memory_limit_mb = memory_limit_mb
+        self.pages_per_task = pages_per_task
+        self.verbose = metrics.verbose
         os.makedirs(resume_dir, exist_ok=True)
         
-    def load_resumes(self) -> List[Tuple[str, str]]:
+    @classmethod
+    def from_env(cls, resume_dir: str = "data/resumes") -> "ResumeProcessor":
+        return cls(
+            resume_dir,
+            workers=int(os.getenv("ATS_EXTRACT_WORKERS", "1")),
+            file_timeout=float(os.getenv("ATS_EXTRACT_TIMEOUT", "120")),
+            memory_limit_mb=int(os.getenv("ATS_EXTRACT_MEMORY_MB", "0")) or None,
+            pages_per_task=int(os.getenv("ATS_PDF_PAGES_PER_TASK", "0"))
+        )
+    
+    def load_resumes(self, manifest: Optional[IngestManifest] = None) -> List[Tuple[str, str]]:
+        """Extract text from every resume, reusing cached text for unchanged files when a manifest is given."""
+        return list(self.iter_resumes(manifest))
+    
+    def iter_resumes(self, manifest: Optional[IngestManifest] = None) -> Iterator[Tuple[str, str]]:
+        """Yield (filename, text) one resume at a time in sorted filename order."""
         load_start = time.time()
-        resume_texts = []
         
         if not os.path.exists(self.resume_dir):
             print(f"❌ Directory {self.resume_dir} not found")
-            return resume_texts
+            return
             
-        files = os.listdir(self.resume_dir)
+        files = sorted(os.listdir(self.resume_dir))
         if not files:
             print(f"📁 No files found in {self.resume_dir}")
-            return resume_texts
+            if manifest is not None:
+                manifest.finalize()
+            return
         
         total_chars = 0
+        file_count = 0
+        reused = 0
         
+        # Resolve cached text first so only new or changed files reach the extractors
+        planned = []
+        pending = []
         for filename in files:
-            file_start = time.time()
             file_path = os.path.join(self.resume_dir, filename)
             
-            print(f"📄 Processing: {filename}")
-            
-            if filename.lower().endswith('.pdf'):
-                text = self._extract_from_pdf(file_path)
-            elif filename.lower().endswith('.docx'):
-                text = self._extract_from_docx(file_path)
-            else:
+            if not filename.lower().endswith(('.pdf', '.docx')):
                 print(f"⚠️  Skipping unsupported file: {filename}")
                 continue
             
-            file_time = time.time() - file_start
+            content_hash = None
+            cached = False
+            if manifest is not None:
+                content_hash = manifest.file_hash(filename, file_path)
+                cached = manifest.has_text(content_hash)
+            
+            if cached:
+                reused += 1
+            else:
+                pending.append((filename, file_path))
+            planned.append((filename, file_path, content_hash, cached))
+        
+        extracted = self._iter_extracted(pending)
+        
+        for filename, file_path, content_hash, cached in planned:
+            file_time = 0.0
+            if cached:
+                text = manifest.get_text(content_hash)
+            else:
+                _, text, file_time = next(extracted)
+                if manifest is not None and text and text.strip():
+                    manifest.put_text(content_hash, text)
             
             if text and text.strip():
-                resume_texts.append((filename, text))
                 total_chars += len(text)
-                print(f"✅ Successfully processed: {filename} ({len(text)} chars) in {file_time:.2f}s")
+                file_count += 1
+                if manifest is not None:
+                    manifest.record(filename, file_path, content_hash, len(text))
+                if not cached:
+                    metrics.observe("extract.file", file_time, file=filename, chars=len(text))
+                if self.verbose:
+                    print(f"✅ Successfully processed: {filename} ({len(text)} chars) in {file_time:.2f}s")
+                yield filename, text
             else:
+                metrics.inc("extract.failures")
                 print(f"❌ Failed to extract text from: {filename} in {file_time:.2f}s")
         
+        # Run the extractor to completion so the pool shuts down and reports its stats
+        for _ in extracted:
+            pass
+        
+        if manifest is not None:
+            manifest.finalize()
+            manifest.print_summary()
+        
         total_time = time.time() - load_start
+        metrics.observe("extract.run", total_time, files=file_count, reused=reused, chars=total_chars)
         print(f"📊 Processing summary:")
         print(f"   ⏱️  Total time: {total_time:.2f}s")
-        print(f"   📄 Files processed: {len(resume_texts)}")
+        print(f"   📄 Files processed: {file_count}")
+        if manifest is not None:
+            print(f"   ♻️  Reused cached text: {reused}")
         print(f"   📝 Total characters: {total_chars:,}")
         if total_time > 0:
-            print(f"   🚀 Processing speed: {len(resume_texts)/total_time:.1f} files/second")
+            print(f"   🚀 Processing speed: {file_count/total_time:.1f} files/second")
             print(f"   📊 Character rate: {total_chars/total_time:,.0f} chars/second")
+    
+    def extract_files(self, filenames: List[str],
+                      manifest: Optional[IngestManifest] = None) -> Iterator[Tuple[str, Optional[str]]]:
+        """Yield (filename, text) for just the named files, text None when extraction fails.
+
+        Cached text is reused and each file is recorded in the manifest, which is not finalized,
+        so entries for the rest of the directory are kept.
+        """
+        planned = []
+        pending = []
+        for filename in filenames:
+            file_path = os.path.join(self.resume_dir, filename)
+            if not os.path.exists(file_path):
+                yield filename, None
+                continue
+            content_hash = manifest.file_hash(filename, file_path) if manifest is not None else None
+            cached = manifest is not None and manifest.has_text(content_hash)
+            if not cached:
+                pending.append((filename, file_path))
+            planned.append((filename, file_path, content_hash, cached))
         
-        return resume_texts
+        extracted = self._iter_extracted(pending)
+        for filename, file_path, content_hash, cached in planned:
+            file_time = 0.0
+            if cached:
+                text = manifest.get_text(content_hash)
+            else:
+                _, text, file_time = next(extracted)
+                if manifest is not None and text and text.strip():
+                    manifest.put_text(content_hash, text)
+                metrics.observe("extract.file", file_time, file=filename, chars=len(text or ""))
+            if text and text.strip():
+                if manifest is not None:
+                    manifest.record(filename, file_path, content_hash, len(text))
+                yield filename, text
+            else:
+                metrics.inc("extract.failures")
+                print(f"❌ Failed to extract text from: {filename} in {file_time:.2f}s")
+                yield filename, None
+        for _ in extracted:
+            pass
+    
+    def prefetch(self, manifest: IngestManifest) -> int:
+        """Extract new or changed files into the manifest's text cache without recording them.
+
+        Lets extraction start before the embeddings model is loaded; the later iter_resumes pass
+        then reads the cached text and does the manifest bookkeeping as usual.
+        """
+        if not os.path.exists(self.resume_dir):
+            return 0
+        
+        pending = []
+        hashes = {}
+        for filename in sorted(os.listdir(self.resume_dir)):
+            if not filename.lower().endswith(('.pdf', '.docx')):
+                continue
+            file_path = os.path.join(self.resume_dir, filename)
+            content_hash = manifest.file_hash(filename, file_path)
+            if not manifest.has_text(content_hash):
+                pending.append((filename, file_path))
+                hashes[filename] = content_hash
+        
+        extracted = 0
+        for filename, text, _ in self._iter_extracted(pending):
+            if text and text.strip():
+                manifest.put_text(hashes[filename], text)
+                extracted += 1
+        print(f"📥 Prefetched text for {extracted}/{len(pending)} new or changed resumes")
+        return extracted
+    
+    @property
+    def isolated(self) -> bool:
+        """Whether files are extracted in worker processes, where the time and memory limits apply."""
+        return self.workers > 1 or bool(self.file_timeout) or bool(self.memory_limit_mb)
+    
+    def _iter_extracted(self, pending: List[Tuple[str, str]]) -> Iterator[Tuple[str, str, float]]:
+        """Yield (filename, text, seconds) for pending files in order, sequentially or from the pool."""
+        if pending and self.isolated:
+            yield from self._extract_parallel(pending)
+            return
+        
+        for filename, file_path in pending:
+            file_start = time.time()
+            if self.verbose:
+                print(f"📄 Processing: {filename}")
+            try:
+                if filename.lower().endswith('.pdf'):
+                    text = self._extract_from_pdf(file_path)
+                else:
+                    text = self._extract_from_docx(file_path)
+            except MemoryError:
+                print(f"❌ {filename}: ran out of memory")
+                text = ""
+            yield filename, text, time.time() - file_start
+    
+    def _plan_tasks(self, pending: List[Tuple[str, str]]) -> Iterator[Tuple[str, str, Optional[Tuple[int, int]], float]]:
+        """Split pending files into pool tasks, fanning long PDFs out into page ranges."""
+        for filename, file_path in pending:
+            page_count = 0
+            if self.pages_per_task > 0 and filename.lower().endswith('.pdf'):
+                try:
+                    page_count = len(pypdf.PdfReader(file_path).pages)
+                except Exception:
+                    page_count = 0
+            
+            if page_count > self.pages_per_task > 0:
+                for start in range(0, page_count, self.pages_per_task):
+                    page_range = (start, min(start + self.pages_per_task, page_count))
+                    yield filename, file_path, page_range, self.file_timeout
+            else:
+                yield filename, file_path, None, self.file_timeout
+    
+    def _extract_parallel(self, pending: List[Tuple[str, str]]) -> Iterator[Tuple[str, str, float]]:
+        """Extract files across a process pool, yielding whole files in submission order."""
+        parallel_start = time.time()
+        print(f"⚡ Extracting {len(pending)} files on {self.workers} worker{'s' if self.workers > 1 else ''}...")
+        
+        worker_stats = defaultdict(lambda: {"tasks": 0, "busy": 0.0, "chars": 0})
+        
+        results = self._iter_task_results(self._plan_tasks(pending), worker_stats)
+        # Page-range tasks of one PDF are planned contiguously, so grouping rebuilds each file
+        for filename, group in groupby(results, key=lambda result: result[0]):
+            group = list(group)
+            file_time = sum(task_time for _, _, task_time, _ in group)
+            failed = sum(1 for _, _, _, error in group if error)
+            if failed and len(group) > 1:
+                # Indexing the pages that did finish would pass a truncated resume off as complete
+                metrics.inc("extract.incomplete")
+                print(f"❌ {filename}: {failed} of {len(group)} page ranges failed, not indexing partial text")
+            text = "" if failed else "\n".join(part for _, part, _, _ in group if part).strip()
+            yield filename, text, file_time
+        
+        parallel_time = time.time() - parallel_start
+        print(f"⚡ Parallel extraction finished in {parallel_time:.2f}s")
+        for pid, stats in sorted(worker_stats.items()):
+            rate = stats["tasks"] / stats["busy"] if stats["busy"] > 0 else 0
+            print(f"   👷 Worker {pid}: {stats['tasks']} tasks, {stats['chars']:,} chars, "
+                  f"{stats['busy']:.2f}s busy ({rate:.1f} tasks/second)")
+    
+    def _new_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                   initargs=(self.resume_dir, self.memory_limit_mb))
+    
+    @staticmethod
+    def _finished(future) -> bool:
+        return future.done() and not future.cancelled() and future.exception() is None
+    
+    def _iter_task_results(self, tasks, worker_stats) -> Iterator[Tuple[str, str, float, Optional[str]]]:
+        """Yield task results in order while keeping only a bounded window of tasks in flight.
+
+        A worker dying (segfault, OOM kill) breaks the whole pool. The pool is then rebuilt and
+        results that had already finished are kept. If exactly one task was unfinished it is the
+        one that killed the worker; otherwise each unfinished task is rerun on its own, so only
+        a task that kills its worker again is reported as failed.
+        """
+        window = self.workers * 4
+        in_flight = deque()
+        tasks = iter(tasks)
+        pool = self._new_pool()
+        try:
+            while True:
+                broken = False
+                for task in tasks:
+                    try:
+                        in_flight.append((task, pool.submit(_extract_task, task)))
+                    except BrokenProcessPool:
+                        tasks, broken = chain([task], tasks), True
+                        break
+                    if len(in_flight) >= window:
+                        break
+                if not broken:
+                    if not in_flight:
+                        return
+                    task, future = in_flight[0]
+                    try:
+                        result = future.result()
+                    except BrokenProcessPool:
+                        broken = True
+                    else:
+                        in_flight.popleft()
+                        yield self._task_result(task, result, worker_stats)
+                        continue
+                
+                pool.shutdown(wait=True)
+                pool = self._new_pool()
+                entries = list(in_flight)
+                in_flight.clear()
+                unfinished = [task for task, future in entries if not self._finished(future)]
+                metrics.inc("extract.pool_restarts")
+                print(f"⚠️  Extraction worker died; restarted the pool, "
+                      f"{len(unfinished)} unfinished tasks to recover")
+                for task, future in entries:
+                    if self._finished(future):
+                        result = future.result()
+                    elif len(unfinished) == 1:
+                        result = ("", "worker process died", 0.0, None)
+                    else:
+                        try:
+                            result = pool.submit(_extract_task, task).result()
+                        except BrokenProcessPool:
+                            result = ("", "worker process died", 0.0, None)
+                            pool.shutdown(wait=True)
+                            pool = self._new_pool()
+                    yield self._task_result(task, result, worker_stats)
+        finally:
+            pool.shutdown(wait=True)
+    
+    @staticmethod
+    def _task_result(task, result, worker_stats) -> Tuple[str, str, float, Optional[str]]:
+        filename, _, page_range, _ = task
+        text, error, task_time, pid = result
+        if error:
+            pages = f" pages {page_range[0] + 1}-{page_range[1]}" if page_range else ""
+            print(f"❌ {filename}{pages}: {error}")
+        if pid is not None:
+            worker_stats[pid]["tasks"] += 1
+            worker_stats[pid]["busy"] += task_time
+            worker_stats[pid]["chars"] += len(text or "")
+        return filename, text or "", task_time, error
     
-    def _extract_from_pdf(self, file_path: str) -> str:
+    def _extract_from_pdf(self, file_path: str, page_range: Optional[Tuple[int, int]] = None) -> str:
         extract_start = time.time()
         try:
             text = ""
             reader = pypdf.PdfReader(file_path)
+            start, end = page_range if page_range else (0, len(reader.pages))
             
-            for page_num, page in enumerate(reader.pages):
+            for page_num in range(start, end):
                 page_start = time.time()
-                page_text = page.extract_text()
+                page_text = reader.pages[page_num].extract_text()
                 page_time = time.time() - page_start
+                metrics.observe("extract.pdf_page", page_time)
                 
                 if page_text:
                     text += page_text + "\n"
-                    print(f"     📄 Page {page_num+1}: {len(page_text)} chars in {page_time*1000:.1f}ms")
+                    if self.verbose:
+                        print(f"     📄 Page {page_num+1}: {len(page_text)} chars in {page_time*1000:.1f}ms")
             
             extract_time = time.time() - extract_start
-            print(f"     ⏱️  PDF extraction: {extract_time:.3f}s total")
+            if self.verbose:
+                print(f"     ⏱️  PDF extraction: {extract_time:.3f}s total")
             return text.strip()
             
+        except MemoryError:
+            raise  # reported by the caller; not a readable-but-empty file
         except Exception as e:
             extract_time = time.time() - extract_start
             print(f"❌ PDF extraction error for {file_path} after {extract_time:.2f}s: {str(e)}")
@@ -87,9 +429,13 @@ class ResumeProcessor:
         try:
             text = docx2txt.process(file_path)
             extract_time = time.time() - extract_start
-            print(f"     ⏱️  DOCX extraction: {extract_time:.3f}s")
+            metrics.observe("extract.docx", extract_time)
+            if self.verbose:
+                print(f"     ⏱️  DOCX extraction: {extract_time:.3f}s")
             return text.strip() if text else ""
             
+        except MemoryError:
+            raise  # reported by the caller; not a readable-but-empty file
         except Exception as e:
             extract_time = time.time() - extract_start
             print(f"❌ DOCX extraction error for {file_path} after {extract_time:.2f}s: {str(e)}")
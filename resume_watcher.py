@@ -0,0 +1,225 @@
+import os
+import time
+import threading
+from typing import Dict, List, Optional, Tuple
+from resume_processor import ResumeProcessor
+from ingest_manifest import IngestManifest
+from ingest_pipeline import IngestPipeline
+from near_duplicates import DedupConfig, NearDuplicateIndex
+from metrics import metrics
+
+class WatchConfig:
+    def __init__(self, interval: float = 2.0, debounce: float = 3.0, max_delay: float = 30.0,
+                 checkpoint_interval: float = 300.0, compact_ratio: float = 0.2):
+        self.interval = interval
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.checkpoint_interval = checkpoint_interval
+        self.compact_ratio = compact_ratio
+
+    @classmethod
+    def from_env(cls) -> Optional["WatchConfig"]:
+        """None unless ATS_WATCH=1."""
+        if os.getenv("ATS_WATCH", "0") != "1":
+            return None
+        return cls(interval=float(os.getenv("ATS_WATCH_INTERVAL", "2")),
+                   debounce=float(os.getenv("ATS_WATCH_DEBOUNCE", "3")),
+                   max_delay=float(os.getenv("ATS_WATCH_MAX_DELAY", "30")),
+                   checkpoint_interval=float(os.getenv("ATS_WATCH_CHECKPOINT", "300")),
+                   compact_ratio=float(os.getenv("ATS_WATCH_COMPACT_RATIO", "0.2")))
+
+class ResumeWatcher:
+    """Apply resume files added, changed or deleted in the resume directory to the live index.
+
+    The directory is polled for size/mtime changes. Changes are batched until the directory has
+    been quiet for `debounce` seconds (or `max_delay` has passed since the first one), then only
+    the affected files are extracted and embedded and applied to the index in place. The index
+    is checkpointed every `checkpoint_interval` seconds while changed, and rebuilt in the
+    background once replaced and deleted rows exceed `compact_ratio` of the index. With dedup,
+    new and edited resumes are collapsed into near-duplicates already indexed, and the aliases
+    of an edited or deleted canonical resume are checked again and indexed if nothing covers them.
+    """
+
+    def __init__(self, processor: ResumeProcessor, vector_store, manifest: IngestManifest,
+                 config: Optional[WatchConfig] = None, index_path: str = "data/faiss_index",
+                 batch_size: int = 32, dedup: Optional[DedupConfig] = None, min_chars: int = 50):
+        self.processor = processor
+        self.vector_store = vector_store
+        self.manifest = manifest
+        self.config = config or WatchConfig()
+        self.index_path = index_path
+        self.batch_size = batch_size
+        self.dedup = dedup
+        self.min_chars = min_chars
+        self.duplicates: Optional[NearDuplicateIndex] = None
+        self.fingerprint = None
+        self._dirty = False
+        self.stats = {"batches": 0, "added": 0, "replaced": 0, "removed": 0, "duplicates": 0,
+                      "checkpoints": 0, "compactions": 0}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def snapshot(self) -> Dict[str, Tuple[int, float]]:
+        files = {}
+        for filename in os.listdir(self.processor.resume_dir):
+            if not filename.lower().endswith(('.pdf', '.docx')):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.processor.resume_dir, filename))
+            except FileNotFoundError:
+                continue
+            files[filename] = (stat.st_size, stat.st_mtime)
+        return files
+
+    def indexed_snapshot(self) -> Dict[str, Tuple[int, float]]:
+        """What the index was built from, per the manifest; the first poll diffs against this."""
+        return {filename: (entry.get("size"), entry.get("mtime")) for filename, entry in self.manifest.files.items()}
+
+    def start(self, after: Optional[threading.Thread] = None) -> "ResumeWatcher":
+        """Watch on a daemon thread, once `after` (e.g. a background refresh) has finished."""
+        self._thread = threading.Thread(target=self._run, args=(after,), daemon=True, name="resume-watcher")
+        self._thread.start()
+        return self
+
+    def stop(self, checkpoint: bool = True):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        if checkpoint and self._dirty:
+            self.checkpoint()
+
+    def _run(self, after: Optional[threading.Thread]):
+        if after is not None:
+            after.join()
+        print(f"👀 Watching {self.processor.resume_dir} for resume changes "
+              f"(every {self.config.interval:g}s, batched after {self.config.debounce:g}s of quiet)")
+        self.duplicate_index()
+        indexed = self.indexed_snapshot()
+        last_seen = None
+        last_change = first_change = None
+        last_checkpoint = time.time()
+        while not self._stop.wait(self.config.interval):
+            try:
+                current = self.snapshot()
+                now = time.time()
+                if current != last_seen:
+                    last_seen, last_change = current, now
+                changed = current != indexed
+                if changed and first_change is None:
+                    first_change = now
+                if changed and (now - last_change >= self.config.debounce
+                                or now - first_change >= self.config.max_delay):
+                    self.apply(indexed, current)
+                    indexed, first_change = current, None
+                    self._dirty = True
+                    if not self.vector_store.live_updates:
+                        self.checkpoint()
+                if self._dirty and now - last_checkpoint >= self.config.checkpoint_interval:
+                    self.checkpoint()
+                    last_checkpoint = now
+                if self._needs_compaction():
+                    self.compact()
+                    indexed = self.indexed_snapshot()
+            except Exception as e:
+                print(f"⚠️  Watch error: {e}")
+
+    def duplicate_index(self) -> Optional[NearDuplicateIndex]:
+        """Near-duplicate index of what is served, built once from the index and the manifest's cached text."""
+        if self.dedup is None or self.duplicates is not None:
+            return self.duplicates
+        seed_start = time.time()
+        duplicates = NearDuplicateIndex(self.dedup)
+        if self.vector_store.document_count:
+            for doc in self.vector_store.iter_documents():
+                source = doc.metadata["source"]
+                content_hash = self.manifest.hash_for(source)
+                text = self.manifest.get_text(content_hash) if content_hash else None
+                # Signatures cover the full cleaned text, as in IngestPipeline; page_content is cut short
+                duplicates.add(source, self.processor.clean_text(text) if text else doc.page_content,
+                               doc.metadata.get("aliases", ()))
+        self.duplicates = duplicates
+        print(f"🧬 Near-duplicate index: {len(duplicates.signatures)} resumes, "
+              f"{len(duplicates.canonical_of)} aliases in {time.time() - seed_start:.2f}s")
+        return duplicates
+
+    def apply(self, before: Dict[str, Tuple[int, float]], after: Dict[str, Tuple[int, float]]) -> dict:
+        """Extract, embed and apply the files that differ between two directory snapshots."""
+        apply_start = time.time()
+        changed = sorted(name for name, state in after.items() if before.get(name) != state)
+        deleted = sorted(name for name in before if name not in after)
+        self.fingerprint = self.manifest.scan_fingerprint(self.processor.resume_dir)
+
+        duplicates = self.duplicate_index()
+        touched = set()  # canonical resumes whose alias list changes
+        if duplicates is not None:
+            orphans = []
+            for filename in changed + deleted:
+                canonical = duplicates.canonical_of.get(filename)
+                if canonical is not None:
+                    touched.add(canonical)
+                orphans.extend(duplicates.remove(filename))
+            # Aliases were never embedded, so without their canonical copy they must be checked
+            # again (their text is cached) and indexed unless another resume covers them
+            changed += sorted(name for name in set(orphans) if name in after and name not in changed)
+
+        upserts: List[Tuple[str, str]] = []
+        collapsed: List[str] = []
+        for filename, text in self.processor.extract_files(changed, self.manifest):
+            cleaned_text = self.processor.clean_text(text) if text else ""
+            if not cleaned_text or len(cleaned_text.strip()) <= self.min_chars:
+                deleted.append(filename)
+                continue
+            canonical = duplicates.check(filename, cleaned_text) if duplicates is not None else None
+            if canonical is None:
+                upserts.append((filename, cleaned_text))
+            else:
+                touched.add(canonical)
+                collapsed.append(filename)
+        for filename in deleted:
+            self.manifest.forget(filename)
+        self.manifest.save()
+
+        with metrics.span("watch.apply", changed=len(changed), deleted=len(deleted), duplicates=len(collapsed)):
+            # A collapsed resume that had its own row (an edit that now duplicates another) is removed
+            result = self.vector_store.apply_changes(upserts, deleted + collapsed, manifest=self.manifest)
+            if touched:
+                self.vector_store.set_aliases({source: list(duplicates.aliases.get(source, []))
+                                               for source in touched if source in duplicates.signatures})
+        result["duplicates"] = len(collapsed)
+        self.stats["batches"] += 1
+        for key in ("added", "replaced", "removed", "duplicates"):
+            self.stats[key] += result[key]
+        print(f"👀 Applied {result['added']} added, {result['replaced']} updated, {result['removed']} removed, "
+              f"{result['duplicates']} near-duplicate resumes in {time.time() - apply_start:.2f}s "
+              f"({self.vector_store.document_count} indexed)")
+        return result
+
+    def checkpoint(self):
+        checkpoint_start = time.time()
+        self.vector_store.save(self.index_path, fingerprint=self.fingerprint)
+        self._dirty = False
+        self.stats["checkpoints"] += 1
+        metrics.observe("watch.checkpoint", time.time() - checkpoint_start)
+
+    def _needs_compaction(self) -> bool:
+        rows = self.vector_store.row_count
+        return rows > 0 and self.vector_store.deleted_rows / rows > self.config.compact_ratio
+
+    def compact(self):
+        """Rebuild without deleted rows (cached text and vectors make this cheap) and swap it in."""
+        compact_start = time.time()
+        print(f"🧹 {self.vector_store.deleted_rows} of {self.vector_store.row_count} index rows are "
+              f"replaced or deleted, rebuilding")
+        self.fingerprint = self.manifest.scan_fingerprint(self.processor.resume_dir)
+        staging = self.vector_store.empty_copy()
+        pipeline = IngestPipeline(self.processor, staging, manifest=self.manifest,
+                                  batch_size=self.batch_size, dedup=self.dedup)
+        stats = pipeline.run(save=False)
+        if stats["documents"] > 0:
+            staging.save(self.index_path, fingerprint=self.fingerprint)
+            self.vector_store.swap_from(staging)
+            self.duplicates = pipeline.duplicates
+            self._dirty = False
+        self.stats["compactions"] += 1
+        metrics.observe("watch.compact", time.time() - compact_start)
+        print(f"🧹 Compacted index in {time.time() - compact_start:.2f}s")
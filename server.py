@@ -0,0 +1,440 @@
+"""Multi-user HTTP service: job matching and resume Q&A over one shared index.
+
+Usage:
+    python server.py --port 8080
+
+Endpoints:
+    GET  /health    index size, active/queued generations
+    GET  /metrics   stage latency histograms and counters in Prometheus text format
+    POST /match     {"job_description": "...", "top_k": 5, "mode": "vector", "filter": "years >= 5"}
+    POST /ask       {"question": "...", "stream": false}
+                    with "stream": true the answer is sent as NDJSON lines as Llama2 generates it
+    POST /summaries same body as /match; streams NDJSON: the shortlist, then one Llama2 fit
+                    summary per candidate as each finishes (cached ones first)
+
+Searches run on a thread pool alongside generations. At most ATS_MAX_GENERATIONS Llama2
+generations run at once, up to ATS_MAX_QUEUED more wait for a slot, and anything beyond that
+is rejected with 503 + Retry-After so clients back off instead of piling up.
+"""
+import os
+import json
+import time
+import asyncio
+import argparse
+import contextvars
+import aiohttp
+from aiohttp import web
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional, Tuple
+from resume_processor import ResumeProcessor
+from vector_store import VectorStore
+from metadata_index import parse_filter
+from ingest_manifest import IngestManifest
+from sharded_store import vector_store_from_env
+from warm_start import WarmStart
+from near_duplicates import DedupConfig
+from resume_watcher import ResumeWatcher, WatchConfig
+from answer_cache import AnswerCache
+from context_packer import ContextPacker
+from match_explainer import MatchExplainer
+from shortlist_summaries import ShortlistSummarizer
+from query_engine import QueryEngine, ensure_ollama_model, ollama_eval_stats
+from metrics import metrics
+
+MAX_TOP_K = 100
+SEARCH_MODES = ("vector", "hybrid")
+
+class Overloaded(Exception):
+    pass
+
+async def read_json(request: web.Request) -> dict:
+    """The request body as a JSON object; ValueError (→ 400) for anything else."""
+    try:
+        body = await request.json()
+    except ValueError:
+        raise ValueError("request body must be valid JSON")
+    if not isinstance(body, dict):
+        raise ValueError("request body must be a JSON object")
+    return body
+
+def text_field(body: dict, name: str) -> str:
+    value = body.get(name) or ""
+    if not isinstance(value, str):
+        raise ValueError(f"{name} must be a string")
+    return value.strip()
+
+def search_params(body: dict) -> dict:
+    """Validated top_k, mode, prefilter and filter from a /match or /summaries body."""
+    top_k = body.get("top_k", 5)
+    if isinstance(top_k, bool) or not isinstance(top_k, int) or not 1 <= top_k <= MAX_TOP_K:
+        raise ValueError(f"top_k must be an integer between 1 and {MAX_TOP_K}")
+    mode = body.get("mode", "vector")
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"mode must be one of {', '.join(SEARCH_MODES)}")
+    search_filter = body.get("filter")
+    if search_filter is not None and not isinstance(search_filter, str):
+        raise ValueError("filter must be a string")
+    if search_filter:
+        try:
+            parse_filter(search_filter)
+        except ValueError as e:
+            raise ValueError(f"invalid filter: {e}") from None
+    return {"top_k": top_k, "mode": mode, "prefilter": bool(body.get("prefilter", False)),
+            "filter": search_filter}
+
+def upstream_error(error: Exception) -> Tuple[int, str]:
+    """HTTP status and message for a failed Ollama call: 504 on timeouts, 502 otherwise."""
+    if isinstance(error, asyncio.TimeoutError):
+        return 504, "Ollama timed out"
+    if isinstance(error, aiohttp.ClientResponseError):
+        return 502, f"Ollama returned {error.status}: {error.message}"
+    return 502, f"Ollama unavailable: {error}"
+
+class AdmissionController:
+    """Bound concurrent LLM generations, with a bounded wait queue in front of them."""
+
+    def __init__(self, max_active: int = 2, max_waiting: int = 16):
+        self.max_active = max_active
+        self.max_waiting = max_waiting
+        self.waiting = 0
+        self.active = 0
+        self.rejected = 0
+        self._slots = asyncio.Semaphore(max_active)
+
+    @asynccontextmanager
+    async def slot(self):
+        if self.waiting >= self.max_waiting:
+            self.rejected += 1
+            metrics.inc("http.rejected")
+            raise Overloaded()
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._slots.release()
+
+class OllamaClient:
+    """Async Ollama client reusing pooled keep-alive connections across requests."""
+
+    def __init__(self, base_url: str, model: str = "llama2:7b", pool_size: int = 8,
+                 temperature: float = 0.2):
+        self.base_url = base_url
+        self.model = model
+        self.pool_size = pool_size
+        self.temperature = temperature
+        self.session: Optional[aiohttp.ClientSession] = None
+
+    async def start(self):
+        connector = aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=60)
+        self.session = aiohttp.ClientSession(connector=connector,
+                                             timeout=aiohttp.ClientTimeout(total=None, sock_read=300))
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+
+    async def generate(self, prompt: str) -> AsyncIterator[dict]:
+        """Yield Ollama's streamed response objects; the last one has done=True and eval counters."""
+        payload = {"model": self.model, "prompt": prompt, "stream": True,
+                   "options": {"temperature": self.temperature}}
+        async with self.session.post(f"{self.base_url}/api/generate", json=payload) as response:
+            response.raise_for_status()
+            async for line in response.content:
+                if line.strip():
+                    yield json.loads(line)
+
+class MatchService:
+    def __init__(self, vector_store: VectorStore, query_engine: QueryEngine, ollama: OllamaClient,
+                 admission: AdmissionController, search_workers: int = 4,
+                 summarizer: Optional[ShortlistSummarizer] = None):
+        self.vector_store = vector_store
+        self.query_engine = query_engine
+        self.ollama = ollama
+        self.admission = admission
+        self.summarizer = summarizer
+        self.executor = ThreadPoolExecutor(max_workers=search_workers, thread_name_prefix="search")
+        self.requests_served = 0
+
+    async def _run(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        # Run in a copy of the request's context so spans opened on the thread join its trace
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(self.executor, lambda: context.run(fn, *args, **kwargs))
+
+    async def health(self, request: web.Request) -> web.Response:
+        documents = self.vector_store.document_count
+        return web.json_response({
+            "status": "ok" if documents else "loading",
+            "documents": documents,
+            "active_generations": self.admission.active,
+            "queued_generations": self.admission.waiting,
+            "rejected_generations": self.admission.rejected,
+            "requests_served": self.requests_served,
+        })
+
+    async def metrics(self, request: web.Request) -> web.Response:
+        return web.Response(text=metrics.render_prometheus(), content_type="text/plain")
+
+    async def match(self, request: web.Request) -> web.Response:
+        start = time.time()
+        try:
+            body = await read_json(request)
+            job_description = text_field(body, "job_description")
+            if not job_description:
+                raise ValueError("job_description is required")
+            docs = await self._run(self._search, job_description, **search_params(body))
+        except ValueError as e:
+            return web.json_response({"error": str(e)}, status=400)
+        if body.get("explain") and docs and self.query_engine.match_explainer is not None:
+            await self._run(self.query_engine.explain_matches, job_description, docs)
+        self.requests_served += 1
+        return web.json_response({
+            "matches": [{"source": doc.metadata["source"], "preview": doc.page_content[:300],
+                         "metadata": doc.metadata} for doc in docs],
+            "search_ms": round((time.time() - start) * 1000, 1),
+        })
+
+    async def summaries(self, request: web.Request) -> web.StreamResponse:
+        if self.summarizer is None:
+            return web.json_response({"error": "shortlist summaries are not configured"}, status=404)
+
+        start = time.time()
+        try:
+            body = await read_json(request)
+            job_description = text_field(body, "job_description")
+            if not job_description:
+                raise ValueError("job_description is required")
+            docs = await self._run(self._search, job_description, **search_params(body))
+        except ValueError as e:
+            return web.json_response({"error": str(e)}, status=400)
+
+        response = web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+        await response.prepare(request)
+
+        async def send(payload: dict):
+            await response.write((json.dumps(payload) + "\n").encode("utf-8"))
+
+        await send({"matches": [{"rank": rank, "source": doc.metadata["source"], "score": doc.metadata.get("score")}
+                                for rank, doc in enumerate(docs, 1)]})
+        pending = []
+        for rank, doc in enumerate(docs, 1):
+            summary = self.summarizer.cached(job_description, doc)
+            if summary is None:
+                pending.append((rank, doc))
+            else:
+                metrics.inc("summary.cache_hits")
+                await send(self.summarizer.result(rank, doc, summary, True, 0.0))
+
+        # Per-request limit on top of the admission controller's global one
+        limit = asyncio.Semaphore(self.summarizer.concurrency)
+        tasks = [asyncio.create_task(self._summarize(job_description, rank, doc, limit)) for rank, doc in pending]
+        for finished in asyncio.as_completed(tasks):
+            await send(await finished)
+        await send({"done": True, "candidates": len(docs), "generated": len(pending),
+                    "total_time": time.time() - start})
+        await response.write_eof()
+        self.requests_served += 1
+        return response
+
+    async def _summarize(self, job_description: str, rank: int, doc, limit: asyncio.Semaphore) -> dict:
+        start = time.time()
+        try:
+            async with limit, self.admission.slot():
+                prompt = await self._run(self.summarizer.build_prompt, job_description, doc)
+                chunks = [message.get("response", "") async for message in self.ollama.generate(prompt)]
+        except Overloaded:
+            return self.summarizer.result(rank, doc, "", False, time.time() - start,
+                                          error="too many generations in flight, retry shortly")
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            metrics.inc("summary.errors")
+            return self.summarizer.result(rank, doc, "", False, time.time() - start, error=upstream_error(e)[1])
+        except Exception as e:
+            metrics.inc("summary.errors")
+            return self.summarizer.result(rank, doc, "", False, time.time() - start, error=str(e))
+        summary = "".join(chunks).strip()
+        metrics.observe("summary.generate", time.time() - start)
+        await self._run(self.summarizer.remember, job_description, doc, summary)
+        return self.summarizer.result(rank, doc, summary, False, time.time() - start)
+
+    def _search(self, job_description: str, top_k: int, mode: str, prefilter: bool,
+                filter: Optional[str]):
+        # Called directly rather than through find_matching_resumes so bad filters surface as errors
+        if mode == "hybrid":
+            return self.vector_store.hybrid_search(job_description, k=top_k, prefilter=prefilter, filter=filter)
+        return self.vector_store.search(job_description, k=top_k, filter=filter)
+
+    async def ask(self, request: web.Request) -> web.StreamResponse:
+        try:
+            body = await read_json(request)
+            question = text_field(body, "question")
+            if not question:
+                raise ValueError("question is required")
+        except ValueError as e:
+            return web.json_response({"error": str(e)}, status=400)
+
+        start = time.time()
+        fast_answer = self.query_engine.answer_from_profiles(question)
+        if fast_answer is not None:
+            metrics.inc("qa.fast_path")
+            self.requests_served += 1
+            return web.json_response({"answer": fast_answer, "cached": False, "fast_path": True,
+                                      "total_time": time.time() - start})
+        context = await self._run(self.query_engine.retrieve_context, question)
+        if context["cached"] is not None:
+            self.requests_served += 1
+            return web.json_response({"answer": context["cached"], "cached": True,
+                                      "total_time": time.time() - start})
+
+        try:
+            async with self.admission.slot():
+                queue_time = time.time() - start
+                metrics.observe("qa.queue_wait", queue_time - context["retrieval_time"])
+                if body.get("stream"):
+                    return await self._stream_answer(request, question, context, start, queue_time)
+                answer, stats = await self._generate(question, context, start)
+        except Overloaded:
+            return web.json_response({"error": "too many questions in flight, retry shortly"},
+                                     status=503, headers={"Retry-After": "2"})
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            metrics.inc("qa.llm_errors")
+            status, message = upstream_error(e)
+            return web.json_response({"error": message}, status=status)
+        stats["queue_time"] = queue_time
+        self.requests_served += 1
+        return web.json_response({"answer": answer, "cached": False, "stats": stats})
+
+    async def _generate(self, question: str, context: dict, start: float, on_token=None):
+        prompt = self.query_engine.build_prompt(question, context["prompt_docs"])
+        metrics.inc("qa.llm_calls")
+        chunks = []
+        first_token = None
+        final = {}
+        async for message in self.ollama.generate(prompt):
+            token = message.get("response", "")
+            if token:
+                if first_token is None:
+                    first_token = time.time()
+                chunks.append(token)
+                if on_token is not None:
+                    await on_token(token)
+            if message.get("done"):
+                final = message
+        answer = "".join(chunks).strip()
+        await self._run(self.query_engine.remember_answer, question, context, answer)
+        stats = {
+            "retrieval_time": context["retrieval_time"],
+            "time_to_first_token": (first_token or time.time()) - start,
+            "total_time": time.time() - start,
+            **ollama_eval_stats(final),
+        }
+        metrics.observe("qa.time_to_first_token", stats["time_to_first_token"])
+        metrics.observe("qa.total", stats["total_time"], cached=False)
+        return answer, stats
+
+    async def _stream_answer(self, request: web.Request, question: str, context: dict,
+                             start: float, queue_time: float) -> web.StreamResponse:
+        response = web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+
+        async def send_token(token: str):
+            # Headers go out with the first token, so Ollama failing to start is still a plain error
+            if not response.prepared:
+                await response.prepare(request)
+            await response.write((json.dumps({"token": token}) + "\n").encode("utf-8"))
+
+        try:
+            _, stats = await self._generate(question, context, start, on_token=send_token)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            metrics.inc("qa.llm_errors")
+            status, message = upstream_error(e)
+            if not response.prepared:
+                return web.json_response({"error": message}, status=status)
+            await response.write((json.dumps({"error": message, "status": status}) + "\n").encode("utf-8"))
+            await response.write_eof()
+            return response
+        if not response.prepared:
+            await response.prepare(request)
+        stats["queue_time"] = queue_time
+        await response.write((json.dumps({"done": True, "stats": stats}) + "\n").encode("utf-8"))
+        await response.write_eof()
+        self.requests_served += 1
+        return response
+
+@web.middleware
+async def trace_requests(request: web.Request, handler):
+    """One span per request; search and retrieval spans on worker threads nest under it."""
+    with metrics.span(f"http.{request.path.strip('/') or 'root'}", method=request.method) as span:
+        response = await handler(request)
+        span.set(status=response.status)
+        return response
+
+def build_app(service: MatchService) -> web.Application:
+    app = web.Application(middlewares=[trace_requests])
+    app.router.add_get("/health", service.health)
+    app.router.add_get("/metrics", service.metrics)
+    app.router.add_post("/match", service.match)
+    app.router.add_post("/ask", service.ask)
+    app.router.add_post("/summaries", service.summaries)
+
+    async def start_ollama(app):
+        await service.ollama.start()
+
+    async def stop_ollama(app):
+        await service.ollama.close()
+        service.executor.shutdown(wait=False)
+
+    app.on_startup.append(start_ollama)
+    app.on_cleanup.append(stop_ollama)
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve job matching and resume Q&A over HTTP")
+    parser.add_argument("--host", default=os.getenv("ATS_HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("ATS_PORT", "8080")))
+    parser.add_argument("--skip-model-check", action="store_true",
+                        help="Do not wait for Ollama or pull llama2:7b at startup")
+    args = parser.parse_args()
+
+    ollama_base_url = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+    vector_store = vector_store_from_env()
+    processor, manifest = ResumeProcessor.from_env(), IngestManifest()
+    batch_size = int(os.getenv("ATS_INGEST_BATCH_SIZE", "32"))
+    warm_start = WarmStart(processor, vector_store, manifest, batch_size=batch_size, dedup=DedupConfig.from_env())
+    warm_start.start()
+    if not warm_start.ready:
+        print("❌ No valid resumes found in data/resumes/")
+        return
+    watcher = None
+    watch_config = WatchConfig.from_env()
+    if watch_config is not None:
+        watcher = ResumeWatcher(processor, vector_store, manifest, watch_config, batch_size=batch_size,
+                                dedup=DedupConfig.from_env()).start(after=warm_start.refresh_thread)
+    if not args.skip_model_check:
+        ensure_ollama_model(ollama_base_url)
+
+    query_engine = QueryEngine(vector_store, setup_model=False, answer_cache=AnswerCache.from_env(),
+                               context_packer=ContextPacker.from_env(vector_store.embeddings),
+                               profile_fast_path=os.getenv("ATS_PROFILE_FAST_PATH", "1") == "1",
+                               match_explainer=MatchExplainer.from_env(vector_store.embeddings))
+    service = MatchService(
+        vector_store, query_engine,
+        OllamaClient(ollama_base_url, pool_size=int(os.getenv("ATS_OLLAMA_POOL_SIZE", "8"))),
+        AdmissionController(max_active=int(os.getenv("ATS_MAX_GENERATIONS", "2")),
+                            max_waiting=int(os.getenv("ATS_MAX_QUEUED", "16"))),
+        search_workers=int(os.getenv("ATS_SEARCH_WORKERS", "4")),
+        summarizer=ShortlistSummarizer.from_env(ollama_base_url, force=True, manifest=manifest),
+    )
+    print(f"🌐 Serving on http://{args.host}:{args.port} "
+          f"({service.admission.max_active} concurrent generations, {service.admission.max_waiting} queued)")
+    web.run_app(build_app(service), host=args.host, port=args.port, print=None)
+    if watcher is not None:
+        watcher.stop()
+
+if __name__ == "__main__":
+    main()
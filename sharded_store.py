@@ -0,0 +1,645 @@
+"""Partition the resume index into shards searched in parallel and merged exactly.
+
+Usage:
+    ATS_SHARDS=8 python app.py                       # hash partitioning, shards searched on threads
+    ATS_SHARDS=8 ATS_SHARD_PROCESSES=1 python server.py
+    ATS_SHARD_BY=date python app.py                  # one shard per intake month
+    python sharded_store.py status
+    python sharded_store.py rebuild 03               # rebuild and hot-swap one shard
+
+Each shard is a complete VectorStore (FAISS index, docstore, BM25, metadata columns, profiles,
+chunk vectors) saved in its own versioned directory under data/faiss_index/, listed in
+shards.json. A search embeds the query once, fans it out to every shard and merges the
+per-shard top-k by cosine similarity, which is exactly the global top-k. Hybrid search merges
+the per-shard vector and BM25 candidate lists before fusing them; BM25 statistics are
+per shard, so lexical scores are close to, not identical with, a single index.
+
+With ATS_SHARD_PROCESSES=1 each loaded shard is served by its own worker process holding only
+that shard (no embeddings model), so shards can exceed what one process wants to hold and
+searches run on separate cores. Shards are only ever written in-process: additions to a
+process-served shard become searchable when the store is saved, at which point a fresh worker
+is started on the new version and swapped in, one shard at a time.
+"""
+import os
+import json
+import time
+import zlib
+import shutil
+import argparse
+import threading
+import multiprocessing
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from langchain.schema import Document
+from langchain_core.embeddings import Embeddings
+from vector_store import StoreRetriever, VectorStore, fuse_rankings, scored_documents
+from index_factory import IndexConfig
+from embedding_backends import EmbeddingConfig
+from chunk_index import ChunkConfig
+from candidate_profiles import ProfileIndex
+from ingest_manifest import IngestManifest
+from metrics import metrics
+
+SHARDS_FILE = "shards.json"
+
+class ShardConfig:
+    def __init__(self, num_shards: int = 4, partition: str = "hash", processes: bool = False,
+                 date_format: str = "%Y-%m"):
+        if partition not in ("hash", "date"):
+            raise ValueError(f"Unknown shard partitioning '{partition}', expected 'hash' or 'date'")
+        self.num_shards = num_shards
+        self.partition = partition
+        self.processes = processes
+        self.date_format = date_format
+
+    @classmethod
+    def from_env(cls) -> Optional["ShardConfig"]:
+        """None (a single index) unless ATS_SHARDS > 1 or ATS_SHARD_BY=date."""
+        num_shards = int(os.getenv("ATS_SHARDS", "0"))
+        partition = os.getenv("ATS_SHARD_BY", "hash")
+        if num_shards <= 1 and partition != "date":
+            return None
+        return cls(num_shards=max(num_shards, 1), partition=partition,
+                   processes=os.getenv("ATS_SHARD_PROCESSES", "0") == "1",
+                   date_format=os.getenv("ATS_SHARD_DATE_FORMAT", "%Y-%m"))
+
+    def shard_for(self, source: str, intake_time: float) -> str:
+        if self.partition == "date":
+            return time.strftime(self.date_format, time.localtime(intake_time))
+        return f"{zlib.crc32(source.encode('utf-8')) % self.num_shards:02d}"
+
+    def describe(self) -> str:
+        if self.partition == "date":
+            return f"date ({self.date_format})"
+        return f"hash ({self.num_shards} shards)"
+
+def vector_store_from_env(**kwargs):
+    """The index configured by the ATS_* variables: a VectorStore, or a ShardedVectorStore."""
+    sharding = ShardConfig.from_env()
+    if sharding is None:
+        return VectorStore(index_config=IndexConfig.from_env(), chunking=ChunkConfig.from_env(),
+                           embedding_config=EmbeddingConfig.from_env(), **kwargs)
+    return ShardedVectorStore(index_config=IndexConfig.from_env(), chunking=ChunkConfig.from_env(),
+                              sharding=sharding, embedding_config=EmbeddingConfig.from_env(), **kwargs)
+
+class QueryVectorsOnly(Embeddings):
+    """Embeddings for shard workers, which are sent query vectors and never embed text."""
+
+    def embed_documents(self, texts):
+        raise RuntimeError("Shard workers search with precomputed query vectors")
+
+    def embed_query(self, text):
+        raise RuntimeError("Shard workers search with precomputed query vectors")
+
+# Calls a shard answers, whether it lives in this process or in a worker
+_SHARD_CALLS = {
+    "search_vectors": lambda store, *args: store.search_vectors(*args),
+    "hybrid_candidates": lambda store, *args: store.hybrid_candidates(*args),
+    "document_for_source": lambda store, source: store.document_for_source(source),
+    "documents": lambda store: list(store.iter_documents()),
+    "layout_staleness": lambda store: store.layout_staleness(),
+    "set_search_params": lambda store, *args: store.set_search_params(*args),
+    "row_counts": lambda store: (store.deleted_rows, store.row_count),
+}
+
+def _serve_shard(conn, folder: str, model_name: str, index_config: IndexConfig, chunking: Optional[ChunkConfig],
+                 embedding_config: EmbeddingConfig):
+    """Worker process main loop: load one shard and answer calls until told to stop."""
+    store = VectorStore(model_name, cache_dir=None, index_config=index_config, chunking=chunking,
+                        embeddings=QueryVectorsOnly(), embedding_config=embedding_config)
+    conn.send(store.document_count if store.load_vector_store(folder) else None)
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            break
+        if message is None:
+            break
+        call, args = message
+        try:
+            conn.send(("ok", _SHARD_CALLS[call](store, *args)))
+        except Exception as e:
+            conn.send(("error", e))
+
+class LocalShard:
+    """A shard held in this process; also how shards are built and updated."""
+
+    def __init__(self, store: VectorStore):
+        self.store = store
+
+    @property
+    def document_count(self) -> int:
+        return self.store.document_count
+
+    def call(self, name: str, *args):
+        return _SHARD_CALLS[name](self.store, *args)
+
+    def close(self):
+        pass
+
+class ShardProcess:
+    """A shard loaded and searched in its own worker process."""
+
+    def __init__(self, name: str, folder: str, model_name: str, index_config: IndexConfig,
+                 chunking: Optional[ChunkConfig], embedding_config: EmbeddingConfig):
+        context = multiprocessing.get_context("spawn")
+        self.conn, child = context.Pipe()
+        self.process = context.Process(target=_serve_shard,
+                                       args=(child, folder, model_name, index_config, chunking, embedding_config),
+                                       name=f"shard-{name}", daemon=True)
+        self.process.start()
+        child.close()
+        self.name = name
+        self.document_count = None
+        self._lock = threading.Lock()
+
+    def wait_ready(self) -> "ShardProcess":
+        self.document_count = self.conn.recv()
+        if self.document_count is None:
+            self.close()
+            raise RuntimeError(f"Shard worker {self.name} could not load its index")
+        return self
+
+    def call(self, name: str, *args):
+        with self._lock:
+            self.conn.send((name, args))
+            status, result = self.conn.recv()
+        if status == "error":
+            raise result
+        return result
+
+    def close(self):
+        try:
+            self.conn.send(None)
+        except (OSError, EOFError):
+            pass
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.terminate()
+
+class ShardedVectorStore:
+    """Drop-in for VectorStore whose index is split into independently persisted shards."""
+
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2",
+                 cache_dir: Optional[str] = "data/embedding_cache", cache_capacity: int = 100_000,
+                 index_config: Optional[IndexConfig] = None, chunking: Optional[ChunkConfig] = None,
+                 sharding: Optional[ShardConfig] = None, embeddings=None, embedding_cache=None,
+                 embedding_config: Optional[EmbeddingConfig] = None):
+        """Load the embeddings model once; every shard (and empty_copy) shares it and its cache."""
+        self.embedding_config = embedding_config or EmbeddingConfig()
+        if embeddings is None:
+            loader = VectorStore(model_name, cache_dir, cache_capacity, index_config, chunking,
+                                 embedding_config=self.embedding_config)
+            embeddings, embedding_cache = loader.embeddings, loader.embedding_cache
+        self.model_name = model_name
+        self.embeddings = embeddings
+        self.embedding_cache = embedding_cache
+        self.index_config = index_config or IndexConfig()
+        self.chunking = chunking
+        self.sharding = sharding or ShardConfig()
+        self.shards: Dict[str, object] = {}      # name -> LocalShard | ShardProcess
+        self.versions: Dict[str, str] = {}       # name -> directory of the saved version
+        self.assignments: Dict[str, str] = {}    # source -> shard name
+        self.profile_index = ProfileIndex()
+        self.index_meta = {}
+        self._staging: Dict[str, VectorStore] = {}
+        self._dirty = set()
+        self._retired: List[str] = []
+        self._folder = None
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max(2, min(32, self.sharding.num_shards * 2)),
+                                        thread_name_prefix="shard-search")
+        print(f"🧱 Sharded index: {self.sharding.describe()}"
+              + (", one worker process per shard" if self.sharding.processes else ""))
+
+    # -- building -------------------------------------------------------------
+
+    def _new_store(self) -> VectorStore:
+        return VectorStore(self.model_name, cache_dir=None, index_config=self.index_config, chunking=self.chunking,
+                           embeddings=self.embeddings, embedding_cache=self.embedding_cache,
+                           embedding_config=self.embedding_config)
+
+    def _writable(self, name: str) -> VectorStore:
+        """The in-process store that additions to a shard go to."""
+        shard = self.shards.get(name)
+        if isinstance(shard, LocalShard):
+            return shard.store
+        store = self._staging.get(name)
+        if store is None:
+            store = self._new_store()
+            if name in self.versions and self._folder is not None:
+                store.load_vector_store(os.path.join(self._folder, self.versions[name]), mmap=False)
+            self._staging[name] = store
+            if shard is None and not self.sharding.processes:
+                self.shards[name] = LocalShard(store)
+                self._staging.pop(name)
+        return store
+
+    def _shard_name(self, source: str, manifest: Optional[IngestManifest]) -> str:
+        name = self.assignments.get(source)
+        if name is None:
+            record = manifest.files.get(source) if manifest is not None else None
+            name = self.sharding.shard_for(source, record["mtime"] if record else time.time())
+            self.assignments[source] = name
+        return name
+
+    def add_documents(self, documents: List[Tuple[str, str]],
+                      manifest: Optional[IngestManifest] = None) -> int:
+        """Route a batch of (filename, text) pairs to their shards and index them there."""
+        groups: Dict[str, List[Tuple[str, str]]] = {}
+        for filename, text in documents:
+            groups.setdefault(self._shard_name(filename, manifest), []).append((filename, text))
+        added = 0
+        for name, group in groups.items():
+            store = self._writable(name)
+            added += store.add_documents(group, manifest=manifest)
+            self._index_profiles(store, group)
+            self._dirty.add(name)
+        return added
+
+    def _index_profiles(self, store: VectorStore, documents: List[Tuple[str, str]]):
+        for filename, _ in documents:
+            profile = store.profile_index.profiles.get(filename)
+            if profile is not None:
+                self.profile_index.remove(filename)
+                self.profile_index.profiles[filename] = profile
+                for skill in profile["skills"]:
+                    self.profile_index.by_skill[skill].add(filename)
+
+    def set_aliases(self, aliases: Dict[str, List[str]]):
+        groups: Dict[str, Dict[str, List[str]]] = {}
+        for source, names in aliases.items():
+            if source in self.assignments:
+                groups.setdefault(self.assignments[source], {})[source] = names
+        for name, group in groups.items():
+            self._writable(name).set_aliases(group)
+            self._dirty.add(name)
+
+    @property
+    def live_updates(self) -> bool:
+        """Whether apply_changes is searchable immediately; process-served shards wait for save."""
+        return not self.sharding.processes
+
+    def apply_changes(self, upserts: List[Tuple[str, str]], deletes: List[str] = (),
+                      manifest: Optional[IngestManifest] = None) -> dict:
+        """Apply adds, replacements and deletes to the shards that own the affected resumes."""
+        groups: Dict[str, Tuple[list, list]] = {}
+        for filename, text in upserts:
+            groups.setdefault(self._shard_name(filename, manifest), ([], []))[0].append((filename, text))
+        for source in deletes:
+            if source in self.assignments:
+                groups.setdefault(self.assignments[source], ([], []))[1].append(source)
+        totals = {"added": 0, "replaced": 0, "removed": 0}
+        for name, (shard_upserts, shard_deletes) in groups.items():
+            store = self._writable(name)
+            for key, value in store.apply_changes(shard_upserts, shard_deletes, manifest).items():
+                totals[key] += value
+            self._dirty.add(name)
+        for source in deletes:
+            self.assignments.pop(source, None)
+            self.profile_index.remove(source)
+        for name, (shard_upserts, _) in groups.items():
+            self._index_profiles(self._writable(name), shard_upserts)
+        return totals
+
+    def finalize_index(self):
+        for name in self._dirty:
+            self._writable(name).finalize_index()
+
+    # -- persistence ----------------------------------------------------------
+
+    def save(self, folder_path: str = "data/faiss_index", fingerprint: Optional[str] = None):
+        """Save changed shards as new versions, then point shards.json at them.
+
+        Readers of the previous versions (including worker processes) keep working until the
+        new version of their shard is swapped in.
+        """
+        save_start = time.time()
+        os.makedirs(folder_path, exist_ok=True)
+        saved = []
+        dropped = []
+        for name in sorted(self._dirty):
+            store = self._writable(name)
+            if store.document_count == 0 and not store._untrained:
+                # Every resume in it was deleted; keeping the old version would bring them back on reload
+                self._drop_shard(name, folder_path)
+                dropped.append(name)
+                continue
+            version = f"shard-{name.replace(os.sep, '_')}.{int(time.time() * 1000)}"
+            store.save(os.path.join(folder_path, version), fingerprint=fingerprint)
+            if name in self.versions and self._folder == folder_path:
+                self._retired.append(os.path.join(folder_path, self.versions[name]))
+            self.versions[name] = version
+            saved.append(name)
+        self._folder = folder_path
+        self.index_meta = {
+            "embedding_model": self.embedding_config.model_key(self.model_name),
+            "index_type": self.index_config.index_type,
+            "chunking": self.chunking.describe() if self.chunking is not None else None,
+            "sharding": self.sharding.describe(),
+            "fingerprint": fingerprint,
+            "shards": dict(self.versions),
+            "documents": self.document_count,
+            "assignments": self.assignments,
+            "saved": time.time(),
+        }
+        self._write_meta(folder_path)
+        if self.embedding_cache is not None:
+            self.embedding_cache.flush()
+
+        if self.sharding.processes:
+            for name in saved:
+                self._swap_in(name, self._start_worker(name))
+        self._dirty.clear()
+        self._remove_retired()
+        print(f"💾 Saved {len(saved)} of {len(self.versions)} shards in {time.time() - save_start:.2f}s"
+              + (f", dropped {len(dropped)} emptied" if dropped else ""))
+
+    def _drop_shard(self, name: str, folder_path: str):
+        version = self.versions.pop(name, None)
+        if version is not None and self._folder == folder_path:
+            self._retired.append(os.path.join(folder_path, version))
+        with self._lock:
+            shard = self.shards.pop(name, None)
+            self._staging.pop(name, None)
+        if shard is not None:
+            shard.close()
+
+    def _write_meta(self, folder_path: str):
+        tmp_path = os.path.join(folder_path, SHARDS_FILE + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(self.index_meta, f)
+        os.replace(tmp_path, os.path.join(folder_path, SHARDS_FILE))
+
+    def _start_worker(self, name: str) -> ShardProcess:
+        return ShardProcess(name, os.path.join(self._folder, self.versions[name]), self.model_name,
+                            self.index_config, self.chunking, self.embedding_config)
+
+    def _swap_in(self, name: str, shard):
+        """Replace one shard atomically; searches already running on the old one finish first."""
+        if isinstance(shard, ShardProcess) and shard.document_count is None:
+            shard.wait_ready()
+        with self._lock:
+            old = self.shards.get(name)
+            self.shards[name] = shard
+            self._staging.pop(name, None)
+        if old is not None and old is not shard:
+            old.close()
+
+    def _remove_retired(self):
+        for path in self._retired:
+            shutil.rmtree(path, ignore_errors=True)
+        self._retired = []
+
+    def load_vector_store(self, folder_path: str = "data/faiss_index", mmap: bool = True) -> bool:
+        meta_path = os.path.join(folder_path, SHARDS_FILE)
+        if not os.path.exists(meta_path):
+            print(f"📭 No saved shards in {folder_path}")
+            return False
+        load_start = time.time()
+        with open(meta_path, "r") as f:
+            self.index_meta = json.load(f)
+        self._folder = folder_path
+        self.versions = dict(self.index_meta.get("shards", {}))
+        self.assignments = dict(self.index_meta.get("assignments", {}))
+
+        def load(name: str):
+            if self.sharding.processes:
+                return self._start_worker(name)
+            store = self._new_store()
+            if not store.load_vector_store(os.path.join(folder_path, self.versions[name]), mmap=mmap):
+                raise RuntimeError(f"shard {name} could not be loaded")
+            return LocalShard(store)
+
+        try:
+            # Workers start concurrently; each is waited on once all have been launched
+            shards = dict(zip(self.versions, self._pool.map(load, self.versions)))
+            for shard in shards.values():
+                if isinstance(shard, ShardProcess):
+                    shard.wait_ready()
+        except Exception as e:
+            print(f"⚠️  Could not load saved shards: {e}")
+            return False
+        for name, shard in shards.items():
+            self._swap_in(name, shard)
+        self.profile_index = ProfileIndex()
+        for version in self.versions.values():
+            self.profile_index.extend(ProfileIndex.load(os.path.join(folder_path, version)) or ProfileIndex())
+        print(f"📂 Loaded {len(shards)} shards ({self.document_count} vectors) in {(time.time() - load_start)*1000:.1f}ms")
+        return True
+
+    def staleness(self, fingerprint: Optional[str]) -> Optional[str]:
+        reason = self.layout_staleness()
+        if reason is not None:
+            return reason
+        if fingerprint is None or self.index_meta.get("fingerprint") != fingerprint:
+            return "resume directory changed"
+        return None
+
+    def layout_staleness(self) -> Optional[str]:
+        if not self.shards:
+            return "no index loaded"
+        if self.index_meta.get("sharding") != self.sharding.describe():
+            return f"sharding changed ({self.index_meta.get('sharding')} → {self.sharding.describe()})"
+        for name, shard in sorted(self.shards.items()):
+            reason = shard.call("layout_staleness")
+            if reason is not None:
+                return f"shard {name}: {reason}"
+        return None
+
+    def empty_copy(self) -> "ShardedVectorStore":
+        """A store sharing the embeddings model and shard assignments, with no shards yet."""
+        clone = ShardedVectorStore(self.model_name, index_config=self.index_config, chunking=self.chunking,
+                                   sharding=self.sharding, embeddings=self.embeddings,
+                                   embedding_cache=self.embedding_cache, embedding_config=self.embedding_config)
+        clone.assignments = dict(self.assignments)
+        return clone
+
+    def swap_from(self, other: "ShardedVectorStore"):
+        """Adopt another store's shards one at a time and retire the ones it replaced."""
+        for name, shard in other.shards.items():
+            self._swap_in(name, shard)
+        for name in set(self.shards) - set(other.shards):
+            with self._lock:
+                old = self.shards.pop(name)
+            old.close()
+        if self._folder is not None:
+            self._retired.extend(os.path.join(self._folder, version) for name, version in self.versions.items()
+                                 if other.versions.get(name) != version)
+        self.versions = dict(other.versions)
+        self.assignments = dict(other.assignments)
+        self.profile_index = other.profile_index
+        self.index_meta = other.index_meta
+        self._folder = other._folder or self._folder
+        other._pool.shutdown(wait=False)
+        self._remove_retired()
+
+    def rebuild_shard(self, name: str, documents: List[Tuple[str, str]], folder_path: str = "data/faiss_index",
+                      manifest: Optional[IngestManifest] = None):
+        """Re-embed one shard from scratch and hot-swap it in; the other shards keep serving."""
+        rebuild_start = time.time()
+        store = self._new_store()
+        store.add_documents(documents, manifest=manifest)
+        store.finalize_index()
+        version = f"shard-{name.replace(os.sep, '_')}.{int(time.time() * 1000)}"
+        store.save(os.path.join(folder_path, version), fingerprint=self.index_meta.get("fingerprint"))
+        if name in self.versions:
+            self._retired.append(os.path.join(folder_path, self.versions[name]))
+        self.versions[name] = version
+        self._folder = folder_path
+        for filename, _ in documents:
+            self.assignments[filename] = name
+        self._index_profiles(store, documents)
+        self._dirty.discard(name)
+        self._swap_in(name, self._start_worker(name) if self.sharding.processes else LocalShard(store))
+        self.index_meta.update(shards=dict(self.versions), documents=self.document_count,
+                               assignments=self.assignments)
+        self._write_meta(folder_path)
+        self._remove_retired()
+        print(f"🔁 Rebuilt shard {name} ({store.document_count} resumes) in {time.time() - rebuild_start:.2f}s")
+
+    def close(self):
+        for shard in self.shards.values():
+            shard.close()
+        self._pool.shutdown(wait=False)
+
+    # -- search ---------------------------------------------------------------
+
+    @property
+    def document_count(self) -> int:
+        return sum(shard.document_count for shard in list(self.shards.values()))
+
+    @property
+    def row_count(self) -> int:
+        return sum(rows for _, (_, rows) in self._scatter("row_counts"))
+
+    @property
+    def deleted_rows(self) -> int:
+        return sum(deleted for _, (deleted, _) in self._scatter("row_counts"))
+
+    def index_marker(self) -> tuple:
+        return tuple(sorted((name, id(shard), shard.store.index_marker() if isinstance(shard, LocalShard)
+                             else shard.document_count) for name, shard in self.shards.items()))
+
+    def _scatter(self, call: str, *args) -> List[Tuple[str, object]]:
+        """Run one call on every non-empty shard in parallel and return (shard name, result) pairs."""
+        with self._lock:
+            shards = [(name, shard) for name, shard in self.shards.items() if shard.document_count]
+        futures = [(name, self._pool.submit(shard.call, call, *args)) for name, shard in shards]
+        return [(name, future.result()) for name, future in futures]
+
+    @staticmethod
+    def _merge(rows: List[List[Tuple[Document, float]]], k: int) -> List[Tuple[Document, float]]:
+        merged = [hit for row in rows for hit in row]
+        merged.sort(key=lambda hit: -hit[1])
+        return merged[:k]
+
+    def search(self, query: str, k: int = 5, filter: Optional[str] = None):
+        if not self.shards:
+            raise ValueError("Vector store not initialized")
+        search_start = time.time()
+        query_vector = np.array([self.embeddings.embed_query(query)], dtype=np.float32)
+        results = self._scatter("search_vectors", query_vector, k, filter)
+        hits = self._merge([rows[0] for _, rows in results], k)
+        search_time = time.time() - search_start
+        metrics.observe("search.sharded", search_time, k=k, shards=len(results), filtered=bool(filter))
+        if metrics.verbose:
+            print(f"⏱️  Sharded search: {search_time*1000:.1f}ms for {len(hits)} results across {len(results)} shards")
+        return scored_documents(hits)
+
+    def search_batch(self, queries: List[str], k: int = 5, batch_size: int = 64,
+                     filter: Optional[str] = None) -> List[List[Tuple[Document, float]]]:
+        if not self.shards:
+            raise ValueError("Vector store not initialized")
+        search_start = time.time()
+        results = []
+        for start in range(0, len(queries), batch_size):
+            vectors = np.array(self.embeddings.embed_documents(queries[start:start + batch_size]), dtype=np.float32)
+            per_shard = [rows for _, rows in self._scatter("search_vectors", vectors, k, filter)]
+            results.extend(self._merge([rows[i] for rows in per_shard], k) for i in range(len(vectors)))
+        search_time = time.time() - search_start
+        metrics.observe("search.batch", search_time, queries=len(queries), shards=len(self.shards))
+        if metrics.verbose:
+            print(f"⏱️  Batch sharded search: {len(queries)} queries in {search_time:.2f}s "
+                  f"({len(queries)/search_time if search_time > 0 else 0:.1f} queries/second)")
+        return results
+
+    def hybrid_search(self, query: str, k: int = 5, candidates: int = 100,
+                      prefilter: bool = False, rrf_k: int = 60, filter: Optional[str] = None) -> List[Document]:
+        if not self.shards:
+            raise ValueError("Vector store not initialized")
+        search_start = time.time()
+        query_vector = np.array([self.embeddings.embed_query(query)], dtype=np.float32)
+        results = self._scatter("hybrid_candidates", query, query_vector, candidates, prefilter, filter)
+        owners = {}
+        for name, (_, lexical) in results:
+            owners.update((source, name) for source, _ in lexical)
+        vector_hits = self._merge([vector for _, (vector, _) in results], candidates)
+        lexical_hits = sorted((hit for _, (_, lexical) in results for hit in lexical), key=lambda hit: -hit[1])[:candidates]
+        fused = fuse_rankings(vector_hits, lexical_hits, k, rrf_k, prefilter,
+                              lambda source: self.shards[owners[source]].call("document_for_source", source))
+        search_time = time.time() - search_start
+        metrics.observe("search.hybrid", search_time, prefilter=prefilter, filtered=bool(filter), shards=len(results))
+        if metrics.verbose:
+            print(f"⏱️  Sharded hybrid search: {search_time*1000:.1f}ms for {len(fused)} results "
+                  f"({len(lexical_hits)} lexical candidates, {len(results)} shards)")
+        return fused
+
+    def set_search_params(self, nprobe: Optional[int] = None, ef_search: Optional[int] = None):
+        self._scatter("set_search_params", nprobe, ef_search)
+
+    def iter_documents(self):
+        for _, documents in self._scatter("documents"):
+            yield from documents
+
+    def document_for_source(self, source: str) -> Optional[Document]:
+        with self._lock:
+            shard = self.shards.get(self.assignments.get(source))
+        return shard.call("document_for_source", source) if shard is not None else None
+
+    def as_retriever(self, search_kwargs: Optional[dict] = None, **kwargs):
+        if not self.shards:
+            raise ValueError("Vector store not initialized")
+        return StoreRetriever(store=self, k=(search_kwargs or {}).get("k", 4))
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or rebuild index shards")
+    parser.add_argument("command", choices=["status", "rebuild"])
+    parser.add_argument("shard", nargs="?", help="Shard to rebuild, or 'all'")
+    parser.add_argument("--index-path", default="data/faiss_index")
+    parser.add_argument("--resume-dir", default="data/resumes")
+    args = parser.parse_args()
+
+    sharding = ShardConfig.from_env()
+    if sharding is None:
+        raise SystemExit("❌ Sharding is off; set ATS_SHARDS=N or ATS_SHARD_BY=date")
+    sharding.processes = False
+    store = ShardedVectorStore(index_config=IndexConfig.from_env(), chunking=ChunkConfig.from_env(), sharding=sharding,
+                               embedding_config=EmbeddingConfig.from_env())
+    if not store.load_vector_store(args.index_path):
+        raise SystemExit(1)
+
+    if args.command == "status":
+        print(f"\n{'shard':<12} {'resumes':>8}  version")
+        for name, shard in sorted(store.shards.items()):
+            print(f"{name:<12} {shard.document_count:>8}  {store.versions[name]}")
+        return
+
+    if not args.shard:
+        raise SystemExit("❌ Name the shard to rebuild, or 'all'")
+    from resume_processor import ResumeProcessor
+    processor = ResumeProcessor(args.resume_dir)
+    manifest = IngestManifest()
+    names = sorted(store.shards) if args.shard == "all" else [args.shard]
+    wanted = {source for source, name in store.assignments.items() if name in names}
+    documents: Dict[str, List[Tuple[str, str]]] = {name: [] for name in names}
+    for filename, text in processor.iter_resumes(manifest):
+        if filename in wanted:
+            documents[store.assignments[filename]].append((filename, processor.clean_text(text)))
+    manifest.save()
+    for name in names:
+        store.rebuild_shard(name, documents[name], args.index_path, manifest=manifest)
+
+if __name__ == "__main__":
+    main()
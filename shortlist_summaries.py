@@ -0,0 +1,242 @@
+import os
+import json
+import time
+import hashlib
+import threading
+import requests
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Iterator, List, Optional
+from langchain.schema import Document
+from ingest_manifest import IngestManifest
+from metrics import metrics
+
+SUMMARY_TEMPLATE = """
+You are an HR assistant. Assess how well this candidate fits the job, based only on the resume.
+
+Job Description:
+{job_description}
+
+Resume ({source}):
+{resume}
+
+In 3-4 sentences: the candidate's strongest matching qualifications, any clear gaps against the
+job description, and an overall fit verdict (strong, moderate or weak).
+
+Summary: """
+
+def text_hash(text: str) -> str:
+    """Whitespace-insensitive content hash, so reformatted copies of the same text share a key."""
+    return hashlib.sha256(" ".join(text.split()).encode("utf-8")).hexdigest()
+
+class SummaryCache:
+    """Per-candidate fit summaries keyed by (resume hash, job description hash, model).
+
+    Keys depend only on content, so re-running a requisition reuses every summary, and an
+    edited resume or job description simply misses. Entries are evicted least recently used
+    beyond capacity and expire after ttl_seconds.
+    """
+
+    def __init__(self, path: str = "data/summary_cache.json", capacity: int = 2000,
+                 ttl_seconds: float = 30 * 24 * 3600):
+        self.path = path
+        self.capacity = capacity
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()  # summaries finish on several threads at once
+        self._entries: "OrderedDict[str, dict]" = OrderedDict()
+        self._load()
+
+    @classmethod
+    def from_env(cls) -> Optional["SummaryCache"]:
+        if os.getenv("ATS_SUMMARY_CACHE", "1") == "0":
+            return None
+        return cls(
+            capacity=int(os.getenv("ATS_SUMMARY_CACHE_SIZE", "2000")),
+            ttl_seconds=float(os.getenv("ATS_SUMMARY_CACHE_TTL", str(30 * 24 * 3600))),
+        )
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r") as f:
+                entries = json.load(f)["entries"]
+            now = time.time()
+            self._entries = OrderedDict((key, entry) for key, entry in entries
+                                        if now - entry["created"] < self.ttl_seconds)
+            print(f"📦 Summary cache: {len(self._entries)} summaries loaded")
+        except Exception as e:
+            print(f"⚠️  Could not load summary cache: {e}")
+            self._entries = OrderedDict()
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with self._save_lock:
+            with self._lock:
+                entries = list(self._entries.items())
+            with open(tmp_path, "w") as f:
+                json.dump({"updated": time.time(), "entries": entries}, f)
+            os.replace(tmp_path, self.path)
+
+    @staticmethod
+    def key(resume_hash: str, job_description: str, model: str) -> str:
+        """resume_hash identifies the whole resume (file content hash, or text_hash of its full text)."""
+        return hashlib.sha256(f"{resume_hash}\n{text_hash(job_description)}\n{model}"
+                              .encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.time() - entry["created"] >= self.ttl_seconds:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry["summary"]
+
+    def put(self, key: str, source: str, summary: str):
+        with self._lock:
+            self._entries[key] = {"source": source, "summary": summary, "created": time.time()}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+        self.save()
+
+    def print_stats(self):
+        total = self.hits + self.misses
+        hit_rate = self.hits / total * 100 if total else 0.0
+        print(f"🗂️  Summary cache: {len(self._entries)} summaries, {self.hits} hits / {total} candidates "
+              f"({hit_rate:.0f}%)")
+
+class ShortlistSummarizer:
+    """Llama2 fit summaries for every shortlisted candidate, generated concurrently.
+
+    Cached summaries are returned first without touching Ollama; the rest are generated at most
+    `concurrency` at a time and yielded in the order they finish, not the order they were ranked.
+    Each resume is cut to max_resume_chars so prompts stay within Llama2's context window. With
+    a manifest, prompts use the full extracted text rather than the indexed first 4000
+    characters, and summaries are keyed by the file's content hash, so any edit regenerates them.
+    """
+
+    def __init__(self, base_url: str, model: str = "llama2:7b", concurrency: int = 2,
+                 cache: Optional[SummaryCache] = None, max_resume_chars: int = 6000,
+                 temperature: float = 0.2, manifest: Optional[IngestManifest] = None):
+        self.base_url = base_url
+        self.model = model
+        self.concurrency = max(1, concurrency)
+        self.cache = cache
+        self.max_resume_chars = max_resume_chars
+        self.temperature = temperature
+        self.manifest = manifest
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=self.concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    @classmethod
+    def from_env(cls, base_url: str, force: bool = False,
+                 manifest: Optional[IngestManifest] = None) -> Optional["ShortlistSummarizer"]:
+        """None unless ATS_SHORTLIST_SUMMARIES=1; force=True builds one regardless (e.g. for an endpoint)."""
+        if not force and os.getenv("ATS_SHORTLIST_SUMMARIES", "0") != "1":
+            return None
+        return cls(base_url, concurrency=int(os.getenv("ATS_SUMMARY_CONCURRENCY", "2")),
+                   cache=SummaryCache.from_env(),
+                   max_resume_chars=int(os.getenv("ATS_SUMMARY_MAX_RESUME_CHARS", "6000")),
+                   manifest=manifest)
+
+    def _content_hash(self, doc: Document) -> Optional[str]:
+        return self.manifest.hash_for(doc.metadata.get("source", "")) if self.manifest is not None else None
+
+    def resume_text(self, doc: Document) -> str:
+        """The full resume text; page_content only holds the first 4000 characters."""
+        content_hash = self._content_hash(doc)
+        text = self.manifest.get_text(content_hash) if content_hash else None
+        return " ".join(text.split()) if text else doc.page_content
+
+    def build_prompt(self, job_description: str, doc: Document) -> str:
+        resume = self.resume_text(doc)
+        if len(resume) > self.max_resume_chars:
+            resume = resume[:self.max_resume_chars].rsplit(" ", 1)[0] + " …"
+        return SUMMARY_TEMPLATE.format(job_description=job_description.strip(),
+                                       source=doc.metadata.get("source", "resume"), resume=resume)
+
+    def cache_key(self, job_description: str, doc: Document) -> str:
+        resume_hash = self._content_hash(doc) or text_hash(doc.page_content)
+        return SummaryCache.key(resume_hash, job_description, self.model)
+
+    def cached(self, job_description: str, doc: Document) -> Optional[str]:
+        if self.cache is None:
+            return None
+        return self.cache.get(self.cache_key(job_description, doc))
+
+    def remember(self, job_description: str, doc: Document, summary: str):
+        if self.cache is not None and summary:
+            self.cache.put(self.cache_key(job_description, doc), doc.metadata.get("source", ""), summary)
+
+    @staticmethod
+    def result(rank: int, doc: Document, summary: str, cached: bool, seconds: float,
+               error: Optional[str] = None) -> dict:
+        result = {"rank": rank, "source": doc.metadata.get("source"), "summary": summary,
+                  "cached": cached, "seconds": round(seconds, 3)}
+        if error is not None:
+            result["error"] = error
+        return result
+
+    def _generate(self, prompt: str) -> str:
+        payload = {"model": self.model, "prompt": prompt, "stream": True,
+                   "options": {"temperature": self.temperature}}
+        chunks = []
+        with self.session.post(f"{self.base_url}/api/generate", json=payload, stream=True,
+                               timeout=(10, 300)) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if line:
+                    chunks.append(json.loads(line).get("response", ""))
+        return "".join(chunks).strip()
+
+    def _summarize_one(self, rank: int, job_description: str, doc: Document) -> dict:
+        start = time.time()
+        try:
+            summary = self._generate(self.build_prompt(job_description, doc))
+        except Exception as e:
+            metrics.inc("summary.errors")
+            return self.result(rank, doc, "", False, time.time() - start, error=str(e))
+        elapsed = time.time() - start
+        metrics.observe("summary.generate", elapsed)
+        self.remember(job_description, doc, summary)
+        return self.result(rank, doc, summary, False, elapsed)
+
+    def summarize(self, job_description: str, matches: List[Document]) -> Iterator[dict]:
+        """Yield one result per match as soon as it is ready; rank is the match's 1-based position."""
+        batch_start = time.time()
+        pending = []
+        for rank, doc in enumerate(matches, 1):
+            summary = self.cached(job_description, doc)
+            if summary is None:
+                pending.append((rank, doc))
+            else:
+                metrics.inc("summary.cache_hits")
+                yield self.result(rank, doc, summary, True, 0.0)
+
+        if pending:
+            print(f"📝 Summarizing {len(pending)} candidates ({len(matches) - len(pending)} cached, "
+                  f"{min(self.concurrency, len(pending))} at a time)...")
+            with ThreadPoolExecutor(max_workers=min(self.concurrency, len(pending)),
+                                    thread_name_prefix="summary") as executor:
+                futures = [executor.submit(self._summarize_one, rank, job_description, doc)
+                           for rank, doc in pending]
+                for future in as_completed(futures):
+                    yield future.result()
+
+        batch_time = time.time() - batch_start
+        metrics.observe("summary.shortlist", batch_time, candidates=len(matches), generated=len(pending))
+        print(f"⏱️  Shortlist summaries: {len(matches)} candidates in {batch_time:.2f}s "
+              f"({len(pending)} generated)")
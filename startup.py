@@ -0,0 +1,106 @@
+import time
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Sequence
+from metrics import metrics
+
+class StartupScheduler:
+    """Run independent startup stages concurrently, blocking each only on its own dependencies.
+
+    Each stage is a callable that receives the results of its dependencies as positional
+    arguments, in the order they were declared. Stages run on threads: the slow phases here
+    (model loading, HTTP polling, subprocess-based extraction) release the GIL.
+    """
+
+    def __init__(self, origin: Optional[float] = None):
+        self.origin = origin if origin is not None else time.time()
+        self._stages: Dict[str, tuple] = {}
+        self._futures: Dict[str, Future] = {}
+        self._timings: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def add(self, name: str, fn: Callable[..., Any], deps: Sequence[str] = ()):
+        for dep in deps:
+            if dep not in self._stages:
+                raise ValueError(f"Stage '{name}' depends on unknown stage '{dep}'")
+        self._stages[name] = (fn, tuple(deps))
+        self._futures[name] = Future()
+
+    def start(self):
+        """Launch every stage; returns immediately."""
+        self._executor = ThreadPoolExecutor(max_workers=len(self._stages), thread_name_prefix="startup")
+        for name in self._stages:
+            self._executor.submit(self._run_stage, name)
+        self._executor.shutdown(wait=False)
+
+    def _run_stage(self, name: str):
+        fn, deps = self._stages[name]
+        future = self._futures[name]
+        queued = time.time()
+        try:
+            args = [self._futures[dep].result() for dep in deps]
+        except BaseException as e:
+            self._record(name, queued, time.time(), time.time(), "skipped")
+            future.set_exception(RuntimeError(f"dependency of '{name}' failed: {e}"))
+            return
+
+        started = time.time()
+        try:
+            result = fn(*args)
+        except BaseException as e:
+            self._record(name, queued, started, time.time(), "failed")
+            future.set_exception(e)
+            return
+        self._record(name, queued, started, time.time(), "ok")
+        future.set_result(result)
+
+    def _record(self, name: str, queued: float, started: float, finished: float, status: str):
+        if status == "ok":
+            metrics.observe(f"startup.{name}", finished - started, waited=started - queued)
+        with self._lock:
+            self._timings[name] = {
+                "waited": started - queued,
+                "start": started - self.origin,
+                "end": finished - self.origin,
+                "status": status,
+            }
+
+    def result(self, name: str, timeout: Optional[float] = None) -> Any:
+        """Block until one stage has finished and return its result (or raise its error)."""
+        return self._futures[name].result(timeout=timeout)
+
+    def duration(self, name: str) -> float:
+        timing = self._timings.get(name)
+        return timing["end"] - timing["start"] if timing else 0.0
+
+    def span(self) -> float:
+        """Seconds from the origin until the last finished stage ended."""
+        with self._lock:
+            return max((timing["end"] for timing in self._timings.values()), default=0.0)
+
+    def wait_all(self):
+        for future in self._futures.values():
+            try:
+                future.result()
+            except BaseException:
+                pass
+
+    def print_timeline(self, width: int = 40):
+        """Print a text Gantt chart of the finished stages relative to process start."""
+        with self._lock:
+            timings = dict(self._timings)
+        if not timings:
+            return
+
+        span = self.span() or 1e-9
+        print("\n🗓️  STARTUP TIMELINE")
+        print("-" * 30)
+        for name, timing in sorted(timings.items(), key=lambda item: item[1]["start"]):
+            begin = int(timing["start"] / span * width)
+            length = max(1, int((timing["end"] - timing["start"]) / span * width))
+            bar = " " * begin + "█" * min(length, width - begin)
+            status = "" if timing["status"] == "ok" else f" [{timing['status']}]"
+            waited = f", waited {timing['waited']:.2f}s on deps" if timing["waited"] >= 0.01 else ""
+            print(f"   {name:<12} |{bar:<{width}}| {timing['start']:6.2f}s → {timing['end']:6.2f}s{waited}{status}")
+        print(f"   Startup critical path: {span:.2f}s")
@@ -0,0 +1,179 @@
+"""Generate reproducible synthetic resume corpora as real PDF and DOCX files.
+
+Usage:
+    python synthetic_corpus.py data/bench/resumes --count 1000 --docx-fraction 0.3 --seed 0
+
+Resumes have a name and contact line, location, title, years of experience, skills, 2-6 jobs
+with bullet points and a degree, so extraction, metadata filters, candidate profiles and
+chunking all see realistic structure. The same seed always produces the same corpus. No
+third-party writers are needed: PDFs are written directly (Helvetica text, one page per
+~55 lines) and DOCX files are assembled as a minimal WordprocessingML zip.
+"""
+import os
+import json
+import time
+import random
+import zipfile
+import argparse
+from typing import List, Tuple
+from xml.sax.saxutils import escape
+from candidate_profiles import SKILLS
+
+FIRST_NAMES = ["Alice", "Bilal", "Chen", "Diana", "Emeka", "Farah", "Gustavo", "Hana", "Ivan", "Jia",
+               "Kofi", "Laura", "Mateo", "Nadia", "Omar", "Priya", "Quinn", "Rosa", "Sven", "Tariq",
+               "Uma", "Victor", "Wen", "Ximena", "Yusuf", "Zoe"]
+LAST_NAMES = ["Adams", "Bauer", "Costa", "Dubois", "Eriksen", "Fischer", "Garcia", "Haddad", "Ito",
+              "Jensen", "Kowalski", "Lopez", "Moreau", "Novak", "Okafor", "Patel", "Rossi", "Silva",
+              "Tanaka", "Usman", "Varga", "Wang", "Yilmaz", "Zhou"]
+CITIES = ["London", "Berlin", "Paris", "Amsterdam", "Madrid", "Toronto", "New York", "Austin",
+          "San Francisco", "Bangalore", "Singapore", "Sydney", "Remote"]
+TITLES = ["Software Engineer", "Senior Software Engineer", "Data Scientist", "Data Engineer",
+          "Backend Developer", "Frontend Developer", "DevOps Engineer", "Machine Learning Engineer",
+          "Product Manager", "QA Engineer", "Security Analyst", "Solutions Architect"]
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella Labs", "Stark Industries", "Wayne Tech",
+             "Hooli", "Pied Piper", "Vandelay Imports", "Cyberdyne", "Tyrell Systems", "Soylent Data"]
+DEGREES = [("Bachelor of Science in Computer Science", 0.5), ("Master of Science in Data Science", 0.25),
+           ("PhD in Machine Learning", 0.07), ("Associate Degree in Information Technology", 0.08),
+           ("Coding Bootcamp Certificate", 0.1)]
+VERBS = ["Built", "Designed", "Led", "Migrated", "Optimized", "Automated", "Maintained", "Launched",
+         "Scaled", "Refactored", "Mentored", "Shipped"]
+OBJECTS = ["a payments platform", "the data pipeline", "customer-facing APIs", "an internal analytics tool",
+           "the recommendation service", "CI pipelines", "a real-time event system", "the search backend",
+           "a mobile checkout flow", "monitoring and alerting", "the billing system", "an ML feature store"]
+OUTCOMES = ["reducing latency by {n}%", "serving {n}k requests per second", "cutting costs by {n}%",
+            "for {n} enterprise customers", "improving conversion by {n}%", "with {n} engineers"]
+
+def resume_text(rng: random.Random, index: int) -> str:
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    years = rng.randint(1, 25)
+    title = rng.choice(TITLES)
+    skills = rng.sample(list(SKILLS), rng.randint(4, 12))
+    degree = rng.choices([d for d, _ in DEGREES], weights=[w for _, w in DEGREES])[0]
+
+    lines = [
+        name,
+        f"{name.split()[0].lower()}.{index}@example.com | +1 555 {rng.randint(100, 999)} {rng.randint(1000, 9999)}",
+        f"Location: {rng.choice(CITIES)}",
+        "",
+        title,
+        f"Summary: {title} with {years} years of experience in {', '.join(skills[:3])}.",
+        f"{rng.randint(1, years)} years of experience with {skills[0]}.",
+        "",
+        "Skills: " + ", ".join(skills),
+        "",
+        "Experience",
+    ]
+    for _ in range(rng.randint(2, 6)):
+        start = rng.randint(1998, 2022)
+        lines.append(f"{rng.choice(TITLES)}, {rng.choice(COMPANIES)} ({start} - {min(2024, start + rng.randint(1, 6))})")
+        for _ in range(rng.randint(2, 6)):
+            outcome = rng.choice(OUTCOMES).format(n=rng.randint(5, 90))
+            lines.append(f"- {rng.choice(VERBS)} {rng.choice(OBJECTS)} using {rng.choice(skills)}, {outcome}.")
+        lines.append("")
+    lines += ["Education", degree, f"Graduated {rng.randint(1990, 2022)}"]
+    return "\n".join(lines)
+
+def job_descriptions(count: int, seed: int = 1) -> List[str]:
+    rng = random.Random(seed)
+    jobs = []
+    for _ in range(count):
+        skills = rng.sample(list(SKILLS), rng.randint(2, 5))
+        jobs.append(f"{rng.choice(TITLES)} with {rng.randint(2, 10)}+ years of experience in "
+                    f"{', '.join(skills)}. Based in {rng.choice(CITIES)}.")
+    return jobs
+
+def _pdf_escape(line: str) -> str:
+    return line.encode("latin-1", "replace").decode("latin-1").replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+def write_pdf(path: str, text: str, lines_per_page: int = 55):
+    lines = text.splitlines() or [""]
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)]
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None,
+               "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for page in pages:
+        stream = "BT /F1 10 Tf 13 TL 50 780 Td " + " ".join(f"({_pdf_escape(line)}) Tj T*" for line in page) + " ET"
+        objects.append(f"<< /Length {len(stream.encode('latin-1'))} >>\nstream\n{stream}\nendstream")
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>")
+        page_ids.append(len(objects))
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(f'{i} 0 R' for i in page_ids)}] /Count {len(page_ids)} >>"
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode("latin-1")
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1")
+    with open(path, "wb") as f:
+        f.write(out)
+
+_CONTENT_TYPES = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                  '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+                  '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+                  '<Default Extension="xml" ContentType="application/xml"/>'
+                  '<Override PartName="/word/document.xml" '
+                  'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+                  '</Types>')
+_RELS = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+         '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+         '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+         'Target="word/document.xml"/></Relationships>')
+
+def write_docx(path: str, text: str):
+    paragraphs = "".join(f"<w:p><w:r><w:t xml:space=\"preserve\">{escape(line)}</w:t></w:r></w:p>"
+                         for line in text.splitlines())
+    document = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+                f"<w:body>{paragraphs}</w:body></w:document>")
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", _CONTENT_TYPES)
+        archive.writestr("_rels/.rels", _RELS)
+        archive.writestr("word/document.xml", document)
+
+def generate_corpus(folder: str, count: int, docx_fraction: float = 0.3, seed: int = 0) -> Tuple[int, float]:
+    """Write count resumes into folder; an existing corpus with the same parameters is reused.
+
+    Returns (files written, seconds).
+    """
+    spec = {"count": count, "docx_fraction": docx_fraction, "seed": seed}
+    spec_path = folder.rstrip("/\\") + ".corpus.json"  # beside the folder, so extraction never sees it
+    if os.path.exists(spec_path) and os.path.isdir(folder):
+        with open(spec_path, "r") as f:
+            if json.load(f) == spec:
+                print(f"♻️  Reusing synthetic corpus of {count:,} resumes in {folder}")
+                return 0, 0.0
+        for filename in os.listdir(folder):
+            if filename.startswith("synthetic_"):
+                os.remove(os.path.join(folder, filename))
+
+    os.makedirs(folder, exist_ok=True)
+    start = time.time()
+    rng = random.Random(seed)
+    width = len(str(count))
+    for i in range(count):
+        text = resume_text(rng, i)
+        if rng.random() < docx_fraction:
+            write_docx(os.path.join(folder, f"synthetic_{i:0{width}d}.docx"), text)
+        else:
+            write_pdf(os.path.join(folder, f"synthetic_{i:0{width}d}.pdf"), text)
+    with open(spec_path, "w") as f:
+        json.dump(spec, f)
+    elapsed = time.time() - start
+    print(f"🏭 Generated {count:,} synthetic resumes in {folder} in {elapsed:.2f}s")
+    return count, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic PDF/DOCX resume corpus")
+    parser.add_argument("folder")
+    parser.add_argument("--count", type=int, default=100)
+    parser.add_argument("--docx-fraction", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    generate_corpus(args.folder, args.count, args.docx_fraction, args.seed)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+from langchain_community.embeddings import DeterministicFakeEmbedding
+from candidate_profiles import extract_profile
+from resume_processor import ResumeProcessor
+from vector_store import VectorStore
+
+RESUME = """Jane Okafor
+jane.okafor@example.com | +1 555 201 3344
+Location: Berlin
+
+Senior Data Engineer
+Summary: Data Engineer with 8 years of experience in python, spark and aws.
+
+Skills: Python, Spark, AWS, SQL
+"""
+
+def test_profile_from_cleaned_text():
+    profile = extract_profile("r1.pdf", ResumeProcessor().clean_text(RESUME))
+    assert profile["name"] == "Jane Okafor"
+    assert profile["email"] == "jane.okafor@example.com"
+    assert {"python", "spark", "aws", "sql"} <= set(profile["skills"])
+
+def test_profile_from_raw_text():
+    assert extract_profile("r1.pdf", RESUME)["name"] == "Jane Okafor"
+
+def test_contact_question_after_add_documents():
+    store = VectorStore(cache_dir=None, embeddings=DeterministicFakeEmbedding(size=32))
+    store.add_documents([("r1.pdf", ResumeProcessor().clean_text(RESUME))])
+    assert store.profile_index.profiles["r1.pdf"]["name"] == "Jane Okafor"
+    answer = store.profile_index.answer("What is Jane's email?")
+    assert answer == "Jane Okafor (r1.pdf): jane.okafor@example.com, +1 555 201 3344"
@@ -0,0 +1,16 @@
+from langchain.schema import Document
+from langchain_community.embeddings import DeterministicFakeEmbedding
+from context_packer import ContextPacker
+from metrics import metrics
+
+def test_pack_records_token_counts_without_text_output(monkeypatch, capsys):
+    monkeypatch.setattr(metrics, "log_format", "quiet")
+    metrics.reset()
+    docs = [Document(page_content=" ".join(f"Sentence {i} about python and kubernetes work." for i in range(60)),
+                     metadata={"source": "a.pdf"})]
+    packed = ContextPacker(DeterministicFakeEmbedding(size=16), token_budget=100).pack("python", docs)
+    counters = metrics.snapshot()["counters"]
+    assert counters["context.packs"] == 1
+    assert counters["context.tokens_before"] > counters["context.tokens_after"] > 0
+    assert len(packed[0].page_content) < len(docs[0].page_content)
+    assert capsys.readouterr().out == ""
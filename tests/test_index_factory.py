@@ -0,0 +1,15 @@
+import numpy as np
+from index_factory import IndexConfig, build_index, built_index_type
+
+def vectors(count: int, dim: int = 32) -> np.ndarray:
+    data = np.random.default_rng(0).normal(size=(count, dim)).astype(np.float32)
+    return data / np.linalg.norm(data, axis=1, keepdims=True)
+
+def test_ivf_pq_falls_back_to_ivf_flat_on_small_sample():
+    config = IndexConfig("ivf_pq", nlist=8, pq_m=8, pq_bits=4)
+    assert built_index_type(build_index(config, 32, vectors(config.pq_min_train - 1))) == "ivf_flat"
+    assert built_index_type(build_index(config, 32, vectors(config.pq_min_train))) == "ivf_pq"
+
+def test_untrained_types():
+    assert built_index_type(build_index(IndexConfig("hnsw"), 32)) == "hnsw"
+    assert built_index_type(build_index(IndexConfig("flat"), 32)) == "flat"
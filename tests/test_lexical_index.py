@@ -0,0 +1,29 @@
+from lexical_index import LexicalIndex
+
+def sources(index, query):
+    return [source for source, _ in index.search(query)]
+
+def test_update_and_remove_drop_old_postings():
+    index = LexicalIndex()
+    index.add("a.pdf", "python kubernetes engineer")
+    index.add("b.pdf", "java spring engineer")
+    index.add("a.pdf", "golang terraform engineer")
+    assert sources(index, "python") == []
+    assert sources(index, "golang") == ["a.pdf"]
+    index.remove("b.pdf")
+    assert "java" not in index.postings and "spring" not in index.postings
+    assert sources(index, "engineer") == ["a.pdf"]
+    assert index.doc_count == 1 and index.total_length == 3
+
+def test_remove_after_load(tmp_path):
+    index = LexicalIndex()
+    index.add("a.pdf", "python kubernetes")
+    index.add("b.pdf", "python java")
+    index.save(str(tmp_path))
+    loaded = LexicalIndex.load(str(tmp_path))
+    loaded.remove("a.pdf")
+    assert "kubernetes" not in loaded.postings
+    assert sources(loaded, "python") == ["b.pdf"]
+    loaded.add("c.pdf", "rust")
+    loaded.remove("c.pdf")
+    assert "rust" not in loaded.postings
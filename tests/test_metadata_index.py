@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+from metadata_index import MetadataIndex, parse_filter
+
+def test_parse_filter_clauses():
+    assert parse_filter("years >= 5 and degree >= master and location in (london, 'new york')") == [
+        ("years", ">=", 5.0), ("degree", ">=", 3), ("location", "in", ["london", "new york"])]
+
+def test_and_inside_parentheses_and_quotes_is_part_of_the_value():
+    assert parse_filter("location in (trinidad and tobago, berlin) AND years > 2") == [
+        ("location", "in", ["trinidad and tobago", "berlin"]), ("years", ">", 2.0)]
+    assert parse_filter("location = 'trinidad and tobago'") == [("location", "=", ["trinidad and tobago"])]
+    assert parse_filter("location = new york") == [("location", "=", ["new york"])]
+
+@pytest.mark.parametrize("expression, message", [
+    ("salary > 5", "Unknown filter field 'salary'"),
+    ("years >= five", "years must be a number"),
+    ("degree >= wizard", "Unknown degree 'wizard'"),
+    ("location > london", "Unsupported operator '>' for location"),
+    ("location in (london", "Missing '\\)'"),
+    ("years >= 5 degree = phd", "Expected 'and'"),
+    ("years >=", "Missing value"),
+    ("", "Empty filter"),
+])
+def test_parse_filter_errors(expression, message):
+    with pytest.raises(ValueError, match=message):
+        parse_filter(expression)
+
+def test_mask():
+    index = MetadataIndex()
+    index.append([{"years": 8, "degree": "master", "location": "trinidad and tobago"},
+                  {"years": 2, "degree": "phd", "location": "london"},
+                  {"years": None, "degree": "bachelor", "location": None}])
+    assert index.mask("location in (trinidad and tobago)").tolist() == [True, False, False]
+    assert index.mask("years >= 5").tolist() == [True, False, False]
+    assert index.mask("degree >= master and location != london").tolist() == [True, False, False]
+    assert index.mask("years < 5").tolist() == [False, True, False]
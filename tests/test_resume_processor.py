@@ -0,0 +1,32 @@
+import time
+import resume_processor
+from resume_processor import ResumeProcessor
+from synthetic_corpus import write_docx, write_pdf
+
+LONG_RESUME = "\n".join(f"Python engineer, line {i} of a long resume" for i in range(120))
+
+def slow_on_last_pages(self, file_path, page_range=None):
+    if page_range and page_range[0] >= 2:
+        time.sleep(5)
+    return original_pdf(self, file_path, page_range)
+
+original_pdf = ResumeProcessor._extract_from_pdf
+
+def test_timed_out_page_range_fails_the_whole_file(tmp_path, monkeypatch):
+    write_pdf(str(tmp_path / "long.pdf"), LONG_RESUME, lines_per_page=40)
+    write_docx(str(tmp_path / "short.docx"), "Jane Okafor\nPython engineer with 8 years of experience.")
+    # Workers are forked, so they inherit the patched extractor
+    monkeypatch.setattr(resume_processor.ResumeProcessor, "_extract_from_pdf", slow_on_last_pages)
+    processor = ResumeProcessor(str(tmp_path), workers=2, file_timeout=0.5, pages_per_task=1)
+    assert [filename for filename, _ in processor.load_resumes()] == ["short.docx"]
+
+def test_single_worker_applies_time_limit(tmp_path, monkeypatch):
+    write_pdf(str(tmp_path / "long.pdf"), LONG_RESUME, lines_per_page=40)
+    write_docx(str(tmp_path / "short.docx"), "Jane Okafor\nPython engineer with 8 years of experience.")
+    monkeypatch.setattr(resume_processor.ResumeProcessor, "_extract_from_pdf",
+                        lambda self, file_path, page_range=None: time.sleep(5) or "")
+    processor = ResumeProcessor(str(tmp_path), workers=1, file_timeout=0.5)
+    assert processor.isolated
+    start = time.time()
+    assert [filename for filename, _ in processor.load_resumes()] == ["short.docx"]
+    assert time.time() - start < 4
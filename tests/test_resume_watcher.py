@@ -0,0 +1,64 @@
+import os
+import random
+import pytest
+from langchain_community.embeddings import DeterministicFakeEmbedding
+from synthetic_corpus import resume_text, write_docx
+from resume_processor import ResumeProcessor
+from vector_store import VectorStore
+from ingest_manifest import IngestManifest
+from ingest_pipeline import IngestPipeline
+from near_duplicates import DedupConfig
+from resume_watcher import ResumeWatcher
+
+@pytest.fixture
+def watched(tmp_path):
+    resume_dir = tmp_path / "resumes"
+    resume_dir.mkdir()
+    rng = random.Random(3)
+    first, second = resume_text(rng, 0), resume_text(rng, 1)
+    write_docx(str(resume_dir / "a.docx"), first)
+    write_docx(str(resume_dir / "b.docx"), first)
+    write_docx(str(resume_dir / "c.docx"), second)
+
+    processor = ResumeProcessor(str(resume_dir))
+    manifest = IngestManifest(str(tmp_path / "manifest.json"), str(tmp_path / "cache"))
+    store = VectorStore(cache_dir=None, embeddings=DeterministicFakeEmbedding(size=32))
+    IngestPipeline(processor, store, manifest=manifest, dedup=DedupConfig()).run(save=False)
+    watcher = ResumeWatcher(processor, store, manifest, index_path=str(tmp_path / "index"), dedup=DedupConfig())
+    return resume_dir, store, watcher
+
+def indexed(store):
+    return {doc.metadata["source"]: doc.metadata.get("aliases", []) for doc in store.iter_documents()}
+
+def change(watcher, edit):
+    before = watcher.snapshot()
+    edit()
+    return watcher.apply(before, watcher.snapshot())
+
+def test_build_collapses_duplicate(watched):
+    _, store, _ = watched
+    assert indexed(store) == {"a.docx": ["b.docx"], "c.docx": []}
+
+def test_deleted_canonical_promotes_alias(watched):
+    resume_dir, store, watcher = watched
+    result = change(watcher, lambda: os.remove(resume_dir / "a.docx"))
+    assert result["removed"] == 1 and result["added"] == 1
+    assert indexed(store) == {"b.docx": [], "c.docx": []}
+
+def test_edited_canonical_reindexes_alias(watched):
+    resume_dir, store, watcher = watched
+    change(watcher, lambda: write_docx(str(resume_dir / "a.docx"), resume_text(random.Random(9), 7)))
+    assert indexed(store) == {"a.docx": [], "b.docx": [], "c.docx": []}
+
+def test_added_duplicate_is_collapsed(watched):
+    resume_dir, store, watcher = watched
+    text = resume_text(random.Random(3), 0)
+    result = change(watcher, lambda: write_docx(str(resume_dir / "d.docx"), text))
+    assert result["duplicates"] == 1 and result["added"] == 0
+    assert indexed(store) == {"a.docx": ["b.docx", "d.docx"], "c.docx": []}
+
+def test_deleted_alias_leaves_canonical(watched):
+    resume_dir, store, watcher = watched
+    result = change(watcher, lambda: os.remove(resume_dir / "b.docx"))
+    assert result["removed"] == 0
+    assert indexed(store) == {"a.docx": [], "c.docx": []}
@@ -0,0 +1,41 @@
+import random
+from langchain_community.embeddings import DeterministicFakeEmbedding
+from sharded_store import ShardConfig, ShardedVectorStore
+from synthetic_corpus import resume_text
+from vector_store import VectorStore
+
+EMBEDDINGS = DeterministicFakeEmbedding(size=32)
+
+def resumes(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    return [(f"r{i}.pdf", resume_text(rng, i)) for i in range(count)]
+
+def sources(hits):
+    return [doc.metadata["source"] for doc in hits]
+
+def sharded_store():
+    return ShardedVectorStore(cache_dir=None, embeddings=EMBEDDINGS, sharding=ShardConfig(3))
+
+def test_merged_search_matches_a_single_index():
+    documents = resumes(12)
+    sharded, single = sharded_store(), VectorStore(cache_dir=None, embeddings=EMBEDDINGS)
+    sharded.add_documents(documents)
+    single.add_documents(documents)
+    for _, text in documents[::4]:
+        assert sources(sharded.search(text, k=5)) == sources(single.search(text, k=5))
+
+def test_updates_never_return_a_source_twice(tmp_path):
+    documents = resumes(12)
+    store = sharded_store()
+    store.add_documents(documents)
+    replacement = resume_text(random.Random(99), 50)
+    store.apply_changes([("r3.pdf", replacement)], ["r5.pdf"])
+    hits = store.search(replacement, k=12)
+    assert sources(hits)[0] == "r3.pdf"
+    assert len(set(sources(hits))) == len(hits) == 11 and "r5.pdf" not in sources(hits)
+
+    store.save(str(tmp_path))
+    loaded = sharded_store()
+    assert loaded.load_vector_store(str(tmp_path))
+    assert loaded.document_count == 11
+    assert sources(loaded.search(replacement, k=12)) == sources(hits)
@@ -0,0 +1,55 @@
+import os
+from langchain.schema import Document
+from ingest_manifest import IngestManifest
+from shortlist_summaries import ShortlistSummarizer, SummaryCache
+
+JOB = "Senior Python engineer with Kubernetes experience"
+
+def long_resume(tail: str) -> str:
+    return "Jane Okafor\n" + "Built data pipelines in Python. " * 200 + tail
+
+def summarizer_for(tmp_path, text: str) -> ShortlistSummarizer:
+    resume_dir = tmp_path / "resumes"
+    resume_dir.mkdir(exist_ok=True)
+    path = resume_dir / "jane.docx"
+    path.write_text(text)
+    manifest = IngestManifest(str(tmp_path / "manifest.json"), str(tmp_path / "cache"))
+    content_hash = manifest.hash_file(str(path))
+    manifest.put_text(content_hash, text)
+    manifest.record("jane.docx", str(path), content_hash, len(text))
+    cache = SummaryCache(str(tmp_path / "summary_cache.json"))
+    return ShortlistSummarizer("http://localhost:11434", cache=cache, max_resume_chars=8000, manifest=manifest)
+
+def indexed(text: str) -> Document:
+    return Document(page_content=" ".join(text.split())[:4000], metadata={"source": "jane.docx"})
+
+def test_edit_past_indexed_text_invalidates_summary(tmp_path):
+    original = long_resume("Kubernetes certified.")
+    summarizer = summarizer_for(tmp_path, original)
+    summarizer.remember(JOB, indexed(original), "Strong fit.")
+    assert summarizer.cached(JOB, indexed(original)) == "Strong fit."
+
+    edited = long_resume("Kubernetes certified. Left the industry in 2015.")
+    assert indexed(edited).page_content == indexed(original).page_content
+    summarizer = summarizer_for(tmp_path, edited)
+    assert summarizer.cached(JOB, indexed(edited)) is None
+
+def test_prompt_uses_full_resume_text(tmp_path):
+    text = long_resume("Kubernetes certified.")
+    summarizer = summarizer_for(tmp_path, text)
+    prompt = summarizer.build_prompt(JOB, indexed(text))
+    assert "Kubernetes certified." in prompt
+
+def test_job_description_change_misses(tmp_path):
+    text = long_resume("")
+    summarizer = summarizer_for(tmp_path, text)
+    summarizer.remember(JOB, indexed(text), "Strong fit.")
+    assert summarizer.cached(JOB + " and Go", indexed(text)) is None
+    assert summarizer.cached("  " + JOB.replace(" ", "\n"), indexed(text)) == "Strong fit."
+
+def test_cache_persists_across_instances(tmp_path):
+    cache = SummaryCache(str(tmp_path / "summary_cache.json"))
+    key = SummaryCache.key("abc", JOB, "llama2:7b")
+    cache.put(key, "jane.docx", "Strong fit.")
+    assert os.path.exists(tmp_path / "summary_cache.json")
+    assert SummaryCache(str(tmp_path / "summary_cache.json")).get(key) == "Strong fit."
@@ -0,0 +1,44 @@
+import random
+from langchain_community.embeddings import DeterministicFakeEmbedding
+from synthetic_corpus import resume_text
+from vector_store import VectorStore
+
+def make_store():
+    return VectorStore(cache_dir=None, embeddings=DeterministicFakeEmbedding(size=32))
+
+def resumes(count: int, seed: int = 4):
+    rng = random.Random(seed)
+    return [(f"r{i}.pdf", resume_text(rng, i)) for i in range(count)]
+
+def sources(hits):
+    return [doc.metadata["source"] for doc in hits]
+
+def test_apply_changes_tombstones_replaced_and_deleted_rows(tmp_path):
+    store = make_store()
+    documents = resumes(6)
+    store.add_documents(documents)
+    replacement = resume_text(random.Random(99), 42)
+    result = store.apply_changes([("r1.pdf", replacement)], ["r2.pdf"])
+    assert result == {"added": 0, "replaced": 1, "removed": 1}
+    assert (store.document_count, store.deleted_rows) == (5, 2)
+
+    hits = store.search(replacement, k=6)
+    assert sources(hits)[0] == "r1.pdf" and hits[0].page_content == replacement[:4000]
+    assert sorted(sources(hits)) == ["r0.pdf", "r1.pdf", "r3.pdf", "r4.pdf", "r5.pdf"]
+    assert "r2.pdf" not in sources(store.hybrid_search(documents[2][1], k=6))
+
+    store.save(str(tmp_path))
+    loaded = make_store()
+    assert loaded.load_vector_store(str(tmp_path))
+    assert (loaded.document_count, loaded.deleted_rows) == (5, 2)
+    assert sorted(sources(loaded.search(replacement, k=6))) == sorted(sources(hits))
+
+def test_compaction_swaps_in_an_index_without_tombstones():
+    store = make_store()
+    store.add_documents(resumes(6))
+    store.apply_changes([], ["r0.pdf", "r3.pdf"])
+    staging = store.empty_copy()
+    staging.add_documents([document for document in resumes(6) if document[0] not in ("r0.pdf", "r3.pdf")])
+    store.swap_from(staging)
+    assert (store.document_count, store.deleted_rows, store.row_count) == (4, 0, 4)
+    assert sorted(sources(store.search("python", k=6))) == ["r1.pdf", "r2.pdf", "r4.pdf", "r5.pdf"]
@@ -1,26 +1,166 @@
 import os
+import copy
+import json
 import time
-from typing import List, Tuple
-from langchain_community.embeddings import HuggingFaceEmbeddings
+import pickle
+import threading
+import faiss
+import numpy as np
+from contextlib import contextmanager
+from typing import List, Optional, Tuple
 from langchain_community.vectorstores import FAISS
 from langchain.schema import Document
+from langchain_core.retrievers import BaseRetriever
+from ingest_manifest import IngestManifest
+from embedding_cache import CachedEmbeddings, EmbeddingCache
+from embedding_backends import EmbeddingConfig, load_embeddings
+from index_factory import IndexConfig, apply_search_params, build_index, built_index_type, make_writable, selector_params
+from lexical_index import LexicalIndex
+from candidate_profiles import ProfileIndex
+from chunk_index import ChunkConfig, ChunkStore, split_into_chunks
+from disk_docstore import DiskDocstore
+from metadata_index import FILTER_FIELDS, MetadataIndex, extract_fields
+from metrics import metrics
+
+# Deleted rows up to this many are over-fetched and dropped; beyond it searches mask them out
+_OVERFETCH_DELETED = 1024
+
+class ReadWriteLock:
+    """Many concurrent searches, or one writer; a waiting writer holds off new readers."""
 
-class VectorStore:
     def __init__(self):
+        self._cond = threading.Condition()
+        self._readers = 0
+        self._writing = False
+        self._writers_waiting = 0
+
+    @contextmanager
+    def read(self):
+        with self._cond:
+            while self._writing or self._writers_waiting:
+                self._cond.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                if not self._readers:
+                    self._cond.notify_all()
+
+    @contextmanager
+    def write(self):
+        with self._cond:
+            self._writers_waiting += 1
+            while self._writing or self._readers:
+                self._cond.wait()
+            self._writers_waiting -= 1
+            self._writing = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writing = False
+                self._cond.notify_all()
+
+class StoreRetriever(BaseRetriever):
+    """LangChain retriever over VectorStore.search, so it sees live updates and shards."""
+    store: object
+    k: int = 3
+
+    def _get_relevant_documents(self, query: str, *, run_manager) -> List[Document]:
+        return self.store.search(query, k=self.k)
+
+def scored_documents(hits: List[Tuple[Document, float]]) -> List[Document]:
+    """Copies of the hit documents carrying their cosine similarity in metadata score/similarity."""
+    return [Document(page_content=doc.page_content, metadata=dict(doc.metadata, score=score, similarity=score))
+            for doc, score in hits]
+
+def fuse_rankings(vector_hits: List[Tuple[Document, float]], lexical_hits: List[Tuple[str, float]], k: int,
+                  rrf_k: int = 60, prefilter: bool = False, lookup=None) -> List[Document]:
+    """Reciprocal rank fusion of a vector and a BM25 ranking into the top-k Documents.
+
+    lookup(source) supplies the Document for resumes only the lexical ranking found; with
+    prefilter they are dropped, since the vector stage already scored every lexical hit.
+    """
+    fused = {}
+    for rank, (doc, similarity) in enumerate(vector_hits, 1):
+        entry = fused.setdefault(doc.metadata["source"], {"doc": doc, "rrf": 0.0})
+        entry["rrf"] += 1.0 / (rrf_k + rank)
+        entry["vector_rank"] = rank
+        entry["similarity"] = similarity
+    for rank, (source, bm25) in enumerate(lexical_hits, 1):
+        entry = fused.get(source)
+        if entry is None:
+            if prefilter:
+                continue
+            entry = fused[source] = {"doc": None, "rrf": 0.0}
+        entry["rrf"] += 1.0 / (rrf_k + rank)
+        entry["lexical_rank"] = rank
+        entry["bm25"] = bm25
+    
+    results = []
+    for source, entry in sorted(fused.items(), key=lambda item: -item[1]["rrf"]):
+        doc = entry["doc"] or (lookup(source) if lookup is not None else None)
+        if doc is None:
+            continue
+        metadata = dict(doc.metadata, score=entry["rrf"], similarity=entry.get("similarity"),
+                        bm25=entry.get("bm25"), vector_rank=entry.get("vector_rank"),
+                        lexical_rank=entry.get("lexical_rank"))
+        results.append(Document(page_content=doc.page_content, metadata=metadata))
+        if len(results) >= k:
+            break
+    return results
+
+class VectorStore:
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2",
+                 cache_dir: Optional[str] = "data/embedding_cache", cache_capacity: int = 100_000,
+                 index_config: Optional[IndexConfig] = None, chunking: Optional[ChunkConfig] = None,
+                 embeddings=None, embedding_cache: Optional[EmbeddingCache] = None,
+                 embedding_config: Optional[EmbeddingConfig] = None):
+        """Load the embeddings model.
+
+        cache_dir=None disables the on-disk embedding cache; index_config selects the FAISS
+        index type (exact flat search by default). With chunking, each resume is indexed by the
+        mean of its section vectors and search results are re-ranked by their best sections.
+        embedding_config selects the CPU backend (PyTorch, int8, ONNX Runtime) and its batching.
+        Passing already loaded embeddings (and their cache) shares one model between stores.
+        """
         embeddings_start = time.time()
-        print("🔍 Loading embeddings model...")
-        
-        self.embeddings = HuggingFaceEmbeddings(
-            model_name="all-MiniLM-L6-v2",
-            model_kwargs={'device': 'cpu'},
-            encode_kwargs={'normalize_embeddings': True}
-        )
+        self.model_name = model_name
+        self.embedding_config = embedding_config or EmbeddingConfig()
+        self.embedding_cache = embedding_cache
+        if embeddings is not None:
+            self.embeddings = embeddings
+        else:
+            print("🔍 Loading embeddings model...")
+            self.embeddings = load_embeddings(model_name, self.embedding_config)
+        if embeddings is None and cache_dir:
+            self.embedding_cache = EmbeddingCache(cache_dir, model_name=self.embedding_key,
+                                                  normalize=True, capacity=cache_capacity)
+            self.embeddings = CachedEmbeddings(self.embeddings, self.embedding_cache)
+        self.index_config = index_config or IndexConfig()
         self.vector_store = None
+        self.index_meta = {}
+        self._untrained = []
+        self.lexical_index = LexicalIndex()
+        self.metadata_index = MetadataIndex()
+        self.profile_index = ProfileIndex()
+        self.chunking = chunking
+        self.chunk_store = ChunkStore()
+        self._untrained_chunks = []
+        self._source_ids = None
+        self._deleted = set()
+        self._live_mask = None
+        self._lock = ReadWriteLock()
         
-        embeddings_time = time.time() - embeddings_start
-        print(f"✅ Embeddings model loaded in {embeddings_time:.2f}s")
+        if embeddings is None:
+            embeddings_time = time.time() - embeddings_start
+            print(f"✅ Embeddings model loaded in {embeddings_time:.2f}s ({self.embedding_config.describe()})")
         
-    def create_vector_store(self, documents: List[Tuple[str, str]]):
+    def create_vector_store(self, documents: List[Tuple[str, str]],
+                            manifest: Optional[IngestManifest] = None):
+        """Build the FAISS index, reusing cached vectors from the manifest for unchanged files."""
         if not documents:
             raise ValueError("No documents provided")
             
@@ -29,17 +169,7 @@ class VectorStore:
         
         # Document processing timing
         doc_processing_start = time.time()
-        langchain_docs = []
-        
-        for filename, text in documents:
-            if text and text.strip() and len(text.strip()) > 10:
-                doc = Document(
-                    page_content=text[:4000],
-                    metadata={"source": filename, "length": len(text)}
-                )
-                langchain_docs.append(doc)
-                print(f"✅ Added {filename}")
-        
+        langchain_docs = self._build_documents(documents)
         doc_processing_time = time.time() - doc_processing_start
         print(f"⏱️  Document processing: {doc_processing_time:.2f}s")
         
@@ -50,19 +180,20 @@ class VectorStore:
         vector_start = time.time()
         print("🔄 Generating embeddings...")
         
-        self.vector_store = FAISS.from_documents(langchain_docs, self.embeddings)
+        self.vector_store = None
+        self.lexical_index = LexicalIndex()
+        self.metadata_index = MetadataIndex()
+        self.profile_index = ProfileIndex()
+        self.chunk_store = ChunkStore()
+        self._deleted = set()
+        self._live_mask = None
+        self._index_lexically(documents)
+        self._add_to_index(langchain_docs, manifest, dict(documents))
         
         vector_time = time.time() - vector_start
         print(f"⏱️  Vector generation: {vector_time:.2f}s")
         
-        # Save timing
-        save_start = time.time()
-        try:
-            self.vector_store.save_local("data/faiss_index")
-            save_time = time.time() - save_start
-            print(f"💾 Database saved in {save_time:.2f}s")
-        except Exception as e:
-            print(f"⚠️  Save error: {e}")
+        self.save()
         
         total_time = time.time() - total_start
         print(f"✅ Vector database ready in {total_time:.2f}s total")
@@ -73,20 +204,684 @@ class VectorStore:
         
         return self.vector_store
     
-    def search(self, query: str, k: int = 5):
-        """Search method with timing."""
+    def add_documents(self, documents: List[Tuple[str, str]],
+                      manifest: Optional[IngestManifest] = None) -> int:
+        """Embed one batch of (filename, text) pairs and append it to the index."""
+        langchain_docs = self._build_documents(documents)
+        if langchain_docs:
+            self._index_lexically(documents)
+            self._add_to_index(langchain_docs, manifest, dict(documents))
+        return len(langchain_docs)
+    
+    def set_aliases(self, aliases: dict):
+        """List the near-duplicate resumes collapsed into each canonical one in its metadata."""
+        for _, metadata in self._untrained:
+            if metadata["source"] in aliases:
+                metadata["aliases"] = list(aliases[metadata["source"]])
+        if self.vector_store is None:
+            return
+        for source, names in aliases.items():
+            with self._lock.read():
+                idx = self._faiss_ids_by_source().get(source)
+                if idx is None:
+                    continue
+                doc_id = self.vector_store.index_to_docstore_id[idx]
+                doc = self.vector_store.docstore.search(doc_id)
+                doc.metadata["aliases"] = list(names)
+                if isinstance(self.vector_store.docstore, DiskDocstore):
+                    self.vector_store.docstore.add({doc_id: doc})
+    
+    def save(self, folder_path: str = "data/faiss_index", fingerprint: Optional[str] = None):
+        """Persist the index plus metadata used to detect staleness on the next warm start."""
+        self.finalize_index()
+        save_start = time.time()
+        try:
+            self._save_faiss(folder_path)
+            self.lexical_index.save(folder_path)
+            self.metadata_index.save(folder_path)
+            self.profile_index.save(folder_path)
+            if self.chunking is not None:
+                self.chunk_store.save(folder_path)
+            tombstones_path = os.path.join(folder_path, "tombstones.npy")
+            if self._deleted:
+                np.save(tombstones_path, np.array(sorted(self._deleted), dtype=np.int64))
+            elif os.path.exists(tombstones_path):
+                os.remove(tombstones_path)
+            self.index_meta = {
+                "embedding_model": self.embedding_key,
+                "index_type": built_index_type(self.vector_store.index),
+                "fingerprint": fingerprint,
+                "documents": self.document_count,
+                "deleted_rows": len(self._deleted),
+                "filter_fields": list(FILTER_FIELDS),
+                "docstore": "sqlite",
+                "chunking": self.chunking.describe() if self.chunking is not None else None,
+                "saved": time.time(),
+            }
+            with open(os.path.join(folder_path, "index_meta.json"), "w") as f:
+                json.dump(self.index_meta, f, indent=2)
+            if self.embedding_cache is not None:
+                self.embedding_cache.flush()
+            save_time = time.time() - save_start
+            metrics.observe("index.save", save_time)
+            print(f"💾 Database saved in {save_time:.2f}s")
+        except Exception as e:
+            print(f"⚠️  Save error: {e}")
+    
+    def _save_faiss(self, folder_path: str):
+        """Write index.faiss, the SQLite docstore and the row -> docstore id map (index.pkl).
+
+        index.faiss is written beside the old one and renamed over it, so a process that
+        memory-mapped the previous version keeps reading it intact.
+        """
+        os.makedirs(folder_path, exist_ok=True)
+        index_path = os.path.join(folder_path, "index.faiss")
+        faiss.write_index(self.vector_store.index, index_path + ".tmp")
+        os.replace(index_path + ".tmp", index_path)
+        docstore = self.vector_store.docstore
+        if not isinstance(docstore, DiskDocstore):
+            # Index loaded in the old pickled format; move its documents to disk
+            docstore = DiskDocstore()
+            docstore.add({doc_id: self.vector_store.docstore.search(doc_id)
+                          for doc_id in self.vector_store.index_to_docstore_id.values()})
+            self.vector_store.docstore = docstore
+        docstore.save(folder_path)
+        with open(os.path.join(folder_path, "index.pkl"), "wb") as f:
+            pickle.dump((None, self.vector_store.index_to_docstore_id), f)
+    
+    def load_vector_store(self, folder_path: str = "data/faiss_index", mmap: bool = True) -> bool:
+        """Load a previously saved index, memory-mapping the FAISS file where supported."""
+        index_path = os.path.join(folder_path, "index.faiss")
+        docstore_path = os.path.join(folder_path, "index.pkl")
+        meta_path = os.path.join(folder_path, "index_meta.json")
+        if not (os.path.exists(index_path) and os.path.exists(docstore_path)):
+            print(f"📭 No saved index in {folder_path}")
+            return False
+        
+        load_start = time.time()
+        try:
+            try:
+                index = faiss.read_index(index_path, faiss.IO_FLAG_MMAP if mmap else 0)
+            except RuntimeError:
+                index = faiss.read_index(index_path)
+            apply_search_params(index, self.index_config)
+            with open(docstore_path, "rb") as f:
+                docstore, index_to_docstore_id = pickle.load(f)
+            if docstore is None:
+                docstore = DiskDocstore.open(folder_path)
+                if docstore is None:
+                    raise FileNotFoundError(f"document store missing from {folder_path}")
+            self.vector_store = FAISS(self.embeddings, index, docstore, index_to_docstore_id)
+            self.lexical_index = LexicalIndex.load(folder_path) or LexicalIndex()
+            self.profile_index = ProfileIndex.load(folder_path) or ProfileIndex()
+            self.chunk_store = ChunkStore.load(folder_path, index.ntotal) or ChunkStore()
+            self.metadata_index = (MetadataIndex.load(folder_path, index.ntotal)
+                                   or MetadataIndex.from_faiss(self.vector_store))
+            tombstones_path = os.path.join(folder_path, "tombstones.npy")
+            self._deleted = set(np.load(tombstones_path).tolist()) if os.path.exists(tombstones_path) else set()
+            self._live_mask = None
+            self._source_ids = None
+            
+            self.index_meta = {}
+            if os.path.exists(meta_path):
+                with open(meta_path, "r") as f:
+                    self.index_meta = json.load(f)
+        except Exception as e:
+            print(f"⚠️  Could not load saved index: {e}")
+            self.vector_store = None
+            return False
+        
+        load_time = time.time() - load_start
+        metrics.observe("index.load", load_time, vectors=index.ntotal)
+        print(f"📂 Loaded saved index ({index.ntotal} vectors) in {load_time*1000:.1f}ms")
+        return True
+    
+    def staleness(self, fingerprint: Optional[str]) -> Optional[str]:
+        """Return why the loaded index is stale, or None if it matches the model and resume directory."""
+        reason = self.layout_staleness()
+        if reason is not None:
+            return reason
+        if fingerprint is None or self.index_meta.get("fingerprint") != fingerprint:
+            return "resume directory changed"
+        return None
+    
+    def layout_staleness(self) -> Optional[str]:
+        """Why the loaded index no longer matches this store's model and settings, if it does not."""
+        if self.vector_store is None:
+            return "no index loaded"
+        if self.index_meta.get("embedding_model") != self.embedding_key:
+            return f"embedding model changed ({self.index_meta.get('embedding_model')} → {self.embedding_key})"
+        built = self.index_meta.get("index_type", "flat")
+        if built != self.index_config.index_type and not self._pq_fallback_expected(built):
+            return f"index type changed ({built} → {self.index_config.index_type})"
+        if not self.lexical_index.doc_count:
+            return "lexical index missing"
+        if not len(self.profile_index):
+            return "candidate profiles missing"
+        if self.index_meta.get("filter_fields") != list(FILTER_FIELDS):
+            return "metadata filter fields changed"
+        if self.index_meta.get("docstore") != "sqlite":
+            return "document store format changed"
+        chunking = self.chunking.describe() if self.chunking is not None else None
+        if self.index_meta.get("chunking") != chunking:
+            return f"chunking changed ({self.index_meta.get('chunking')} → {chunking})"
+        if self.chunking is not None and len(self.chunk_store) != self.vector_store.index.ntotal:
+            return "chunk index missing"
+        return None
+    
+    def _pq_fallback_expected(self, built: str) -> bool:
+        """An ivf_pq index built as ivf_flat is current until there are enough vectors to train PQ."""
+        return (built == "ivf_flat" and self.index_config.index_type == "ivf_pq"
+                and min(self.row_count, self.index_config.train_size) < self.index_config.pq_min_train)
+    
+    @property
+    def embedding_key(self) -> str:
+        """Model name plus any backend setting that changes the vectors it produces."""
+        return self.embedding_config.model_key(self.model_name)
+    
+    @property
+    def document_count(self) -> int:
+        return self.row_count - len(self._deleted)
+    
+    @property
+    def row_count(self) -> int:
+        """FAISS rows, including rows of replaced or removed resumes not yet compacted away."""
+        return self.vector_store.index.ntotal if self.vector_store is not None else 0
+    
+    @property
+    def live_updates(self) -> bool:
+        """apply_changes is searchable as soon as it returns."""
+        return True
+    
+    @property
+    def deleted_rows(self) -> int:
+        return len(self._deleted)
+    
+    def index_marker(self) -> tuple:
+        """Changes whenever the served index is rebuilt, swapped, grows or has rows removed."""
+        return (id(self.vector_store), self.row_count, len(self._deleted))
+    
+    def empty_copy(self) -> "VectorStore":
+        """Return a VectorStore that shares the loaded embeddings model but has no index yet."""
+        clone = copy.copy(self)
+        clone.vector_store = None
+        clone.index_meta = {}
+        clone._untrained = []
+        clone.lexical_index = LexicalIndex()
+        clone.metadata_index = MetadataIndex()
+        clone.profile_index = ProfileIndex()
+        clone.chunk_store = ChunkStore()
+        clone._untrained_chunks = []
+        clone._source_ids = None
+        clone._deleted = set()
+        clone._live_mask = None
+        clone._lock = ReadWriteLock()
+        return clone
+    
+    def swap_from(self, other: "VectorStore"):
+        """Atomically replace the served index with one built by another VectorStore."""
+        with self._lock.write():
+            self.vector_store = other.vector_store
+            self.index_meta = other.index_meta
+            self.lexical_index = other.lexical_index
+            self.metadata_index = other.metadata_index
+            self.profile_index = other.profile_index
+            self.chunk_store = other.chunk_store
+            self._deleted = set(other._deleted)
+            self._live_mask = None
+            self._source_ids = None
+    
+    def _build_documents(self, documents: List[Tuple[str, str]]) -> List[Document]:
+        langchain_docs = []
+        for filename, text in documents:
+            if text and text.strip() and len(text.strip()) > 10:
+                doc = Document(
+                    page_content=text[:4000],
+                    metadata={"source": filename, "length": len(text), **extract_fields(text)}
+                )
+                langchain_docs.append(doc)
+                if metrics.verbose:
+                    print(f"✅ Added {filename}")
+        return langchain_docs
+    
+    def _index_lexically(self, documents: List[Tuple[str, str]]):
+        """BM25 and candidate profiles cover the full cleaned text, not just the embedded first 4000 chars."""
+        for filename, text in documents:
+            if text and text.strip() and len(text.strip()) > 10:
+                self.lexical_index.add(filename, text)
+                self.profile_index.add(filename, text)
+    
+    def apply_changes(self, upserts: List[Tuple[str, str]], deletes: List[str] = (),
+                      manifest: Optional[IngestManifest] = None) -> dict:
+        """Add or replace the given (filename, text) resumes and remove deleted ones in the live index.
+
+        Embedding happens before the write lock is taken, so searches only wait while rows are
+        appended and old rows are marked deleted. Replaced and deleted rows stay in FAISS as
+        tombstones that every search skips until the index is next rebuilt.
+        """
+        self.finalize_index()
+        langchain_docs = self._build_documents(upserts)
+        vectors, chunk_vectors = [], None
+        if langchain_docs:
+            vectors, chunk_vectors = self._embed_documents(langchain_docs, manifest, dict(upserts))
+        sources = {doc.metadata["source"] for doc in langchain_docs}
+        
+        with self._lock.write():
+            rows = self._faiss_ids_by_source() if self.vector_store is not None else {}
+            replaced = [source for source in sources if source in rows]
+            removed = [source for source in deletes if source in rows and source not in sources]
+            self._deleted.update(rows[source] for source in replaced + removed)
+            for source in removed:
+                self.lexical_index.remove(source)
+                self.profile_index.remove(source)
+            self._index_lexically([(filename, text) for filename, text in upserts if filename in sources])
+            if langchain_docs:
+                self._append(langchain_docs, vectors, chunk_vectors)
+                if self._untrained:
+                    self._train_pending()
+            self._live_mask = None
+            self._source_ids = None
+        return {"added": len(sources) - len(replaced), "replaced": len(replaced), "removed": len(removed)}
+    
+    def _add_to_index(self, langchain_docs: List[Document], manifest: Optional[IngestManifest],
+                      texts: Optional[dict] = None):
+        vectors, chunk_vectors = self._embed_documents(langchain_docs, manifest, texts)
+        with self._lock.write():
+            self._append(langchain_docs, vectors, chunk_vectors)
+    
+    def _embed_documents(self, langchain_docs: List[Document], manifest: Optional[IngestManifest],
+                         texts: Optional[dict] = None):
+        """Resume vectors, plus section vectors when chunking, for a batch of Documents."""
+        chunk_vectors = None
+        embed_start = time.time()
+        if self.chunking is not None and texts is not None:
+            vectors, chunk_vectors = self._embed_chunks(langchain_docs, texts)
+        elif manifest is not None:
+            vectors = self._embed_with_manifest(langchain_docs, manifest)
+        else:
+            vectors = self.embeddings.embed_documents([doc.page_content for doc in langchain_docs])
+        metrics.observe("embed.documents", time.time() - embed_start, resumes=len(langchain_docs))
+        return vectors, chunk_vectors
+    
+    def _append(self, langchain_docs: List[Document], vectors, chunk_vectors):
+        text_embeddings = [(doc.page_content, vector) for doc, vector in zip(langchain_docs, vectors)]
+        metadatas = [doc.metadata for doc in langchain_docs]
+        
+        if self.vector_store is None and self.index_config.needs_training:
+            # IVF indexes are trained on a sample, so hold vectors back until one is available
+            self._untrained.extend(zip(text_embeddings, metadatas))
+            if chunk_vectors is not None:
+                self._untrained_chunks.extend(chunk_vectors)
+            if len(self._untrained) >= self.index_config.train_size:
+                self._train_pending()
+            return
+        
+        if self.vector_store is None:
+            index = build_index(self.index_config, len(vectors[0]))
+            print(f"🧭 Index type: {self.index_config.describe()}")
+            self.vector_store = FAISS(self.embeddings, index, DiskDocstore(), {})
+        add_start = time.time()
+        if make_writable(self.vector_store.index):
+            print("🧭 Copied memory-mapped index lists into memory to add resumes")
+        self.vector_store.add_embeddings(text_embeddings, metadatas=metadatas)
+        self.metadata_index.append(metadatas)
+        if chunk_vectors is not None:
+            self.chunk_store.append(chunk_vectors)
+        metrics.observe("index.add", time.time() - add_start, resumes=len(text_embeddings))
+    
+    def finalize_index(self):
+        """Train the index on vectors held back for training and add them."""
+        if not self._untrained:
+            return
+        with self._lock.write():
+            self._train_pending()
+    
+    def _train_pending(self):
+        train_start = time.time()
+        pending, self._untrained = self._untrained, []
+        vectors = np.array([vector for (_, vector), _ in pending], dtype=np.float32)
+        sample = vectors
+        if len(vectors) > self.index_config.train_size:
+            rng = np.random.default_rng(0)
+            sample = vectors[rng.choice(len(vectors), self.index_config.train_size, replace=False)]
+        
+        index = build_index(self.index_config, vectors.shape[1], sample)
+        self.vector_store = FAISS(self.embeddings, index, DiskDocstore(), {})
+        self.vector_store.add_embeddings([pair for pair, _ in pending],
+                                         metadatas=[metadata for _, metadata in pending])
+        self.metadata_index.append([metadata for _, metadata in pending])
+        if self._untrained_chunks:
+            self.chunk_store.append(self._untrained_chunks)
+            self._untrained_chunks = []
+        ivf = faiss.try_extract_index_ivf(index)
+        layout = f"{type(index).__name__}, nlist={ivf.nlist}" if ivf is not None else type(index).__name__
+        train_time = time.time() - train_start
+        metrics.observe("index.train", train_time, vectors=len(sample))
+        print(f"🧭 Trained {self.index_config.describe()} as {layout} on {len(sample):,} vectors "
+              f"in {train_time:.2f}s")
+    
+    def set_search_params(self, nprobe: Optional[int] = None, ef_search: Optional[int] = None):
+        """Tune the recall/latency trade-off of IVF (nprobe) or HNSW (ef_search) indexes."""
+        if nprobe is not None:
+            self.index_config.nprobe = nprobe
+        if ef_search is not None:
+            self.index_config.ef_search = ef_search
+        if self.vector_store is not None:
+            apply_search_params(self.vector_store.index, self.index_config)
+    
+    def _embed_chunks(self, langchain_docs: List[Document], texts: dict):
+        """Embed every resume section; the resume vector is the normalized mean of its sections.
+
+        Section vectors are reused across runs through the embedding cache.
+        """
+        chunk_lists = [split_into_chunks(texts[doc.metadata["source"]], self.chunking.chunk_chars,
+                                         self.chunking.overlap, self.chunking.max_chunks)
+                       for doc in langchain_docs]
+        flat = np.array(self.embeddings.embed_documents([chunk for chunks in chunk_lists for chunk in chunks]),
+                        dtype=np.float32)
+        vectors, chunk_vectors = [], []
+        offset = 0
+        for chunks in chunk_lists:
+            matrix = flat[offset:offset + len(chunks)]
+            offset += len(chunks)
+            mean = matrix.mean(axis=0)
+            vectors.append((mean / (np.linalg.norm(mean) or 1.0)).tolist())
+            chunk_vectors.append(matrix)
+        print(f"🧩 Embedded {len(flat)} sections for {len(langchain_docs)} resumes")
+        return vectors, chunk_vectors
+    
+    def _chunk_rerank(self, query_vectors: np.ndarray, distances: np.ndarray, indices: np.ndarray, k: int):
+        """Re-rank candidate resumes by their aggregated section scores.
+
+        Returns (distances, ids) like a FAISS search, with squared L2 derived from the aggregated
+        cosine so callers convert back the same way.
+        """
+        rerank_start = time.time()
+        out_distances = np.full((len(query_vectors), k), np.inf, dtype=np.float32)
+        out_ids = np.full((len(query_vectors), k), -1, dtype=np.int64)
+        for row, (query_vector, ids) in enumerate(zip(query_vectors, indices)):
+            ids = ids[ids != -1]
+            if not len(ids):
+                continue
+            scores = self.chunk_store.scores(query_vector, ids, self.chunking.aggregate, self.chunking.top_n)
+            order = np.argsort(-scores, kind="stable")[:k]
+            out_distances[row, :len(order)] = 2.0 - 2.0 * scores[order]
+            out_ids[row, :len(order)] = ids[order]
+        metrics.observe("search.chunk_rerank", time.time() - rerank_start)
+        return out_distances, out_ids
+    
+    def _embed_with_manifest(self, langchain_docs: List[Document], manifest: IngestManifest):
+        """Return one vector per document, embedding only those missing from the cache.
+
+        Cached vectors are keyed by embedding_key, so switching backend or sequence length
+        never mixes vectors from two embedding spaces in one index.
+        """
+        vectors = [None] * len(langchain_docs)
+        missing = []
+        
+        for i, doc in enumerate(langchain_docs):
+            content_hash = manifest.hash_for(doc.metadata["source"])
+            cached = manifest.get_vector(content_hash, self.embedding_key) if content_hash else None
+            if cached is not None:
+                vectors[i] = cached.tolist()
+            else:
+                missing.append(i)
+        
+        if missing:
+            embedded = self.embeddings.embed_documents([langchain_docs[i].page_content for i in missing])
+            for i, vector in zip(missing, embedded):
+                vectors[i] = vector
+                content_hash = manifest.hash_for(langchain_docs[i].metadata["source"])
+                if content_hash:
+                    manifest.put_vector(content_hash, vector, self.embedding_key)
+        
+        print(f"♻️  Reused {len(langchain_docs) - len(missing)} cached vectors, embedded {len(missing)} new")
+        return vectors
+    
+    def search(self, query: str, k: int = 5, filter: Optional[str] = None):
+        """Search method with timing; each result's metadata carries its cosine similarity as "score".
+
+        filter is a metadata expression such as "years >= 5 and degree >= master"; it is
+        evaluated inside the FAISS search, so the top-k is exact among matching resumes.
+        """
+        if not self.vector_store:
+            raise ValueError("Vector store not initialized")
+        
+        search_start = time.time()
+        if filter or self.chunking is not None or self._deleted:
+            query_vector = np.array([self.embeddings.embed_query(query)], dtype=np.float32)
+            results = scored_documents(self.search_vectors(query_vector, k, filter)[0])
+        else:
+            with self._lock.read():
+                hits = self.vector_store.similarity_search_with_score(query, k=k)
+            # Squared L2 between unit vectors -> cosine similarity
+            results = scored_documents([(doc, float(1.0 - distance / 2.0)) for doc, distance in hits])
+        search_time = time.time() - search_start
+        metrics.observe("search.vector", search_time, k=k, filtered=bool(filter))
+        
+        if metrics.verbose:
+            print(f"⏱️  Vector search: {search_time*1000:.1f}ms for {len(results)} results")
+        return results
+    
+    def search_batch(self, queries: List[str], k: int = 5, batch_size: int = 64,
+                     filter: Optional[str] = None) -> List[List[Tuple[Document, float]]]:
+        """Embed many queries in batches and run one multi-query FAISS search per batch.
+
+        Returns, per query, (Document, cosine similarity) pairs best first.
+        """
         if not self.vector_store:
             raise ValueError("Vector store not initialized")
         
         search_start = time.time()
-        results = self.vector_store.similarity_search(query, k=k)
+        k = min(k, self.document_count)
+        results = []
+        
+        for start in range(0, len(queries), batch_size):
+            batch = queries[start:start + batch_size]
+            vectors = np.array(self.embeddings.embed_documents(batch), dtype=np.float32)
+            results.extend(self.search_vectors(vectors, k, filter))
+        
         search_time = time.time() - search_start
+        metrics.observe("search.batch", search_time, queries=len(queries))
+        metrics.inc("search.batch_queries", len(queries))
+        if metrics.verbose:
+            print(f"⏱️  Batch vector search: {len(queries)} queries in {search_time:.2f}s "
+                  f"({len(queries)/search_time if search_time > 0 else 0:.1f} queries/second)")
+        return results
+    
+    def hybrid_search(self, query: str, k: int = 5, candidates: int = 100,
+                      prefilter: bool = False, rrf_k: int = 60, filter: Optional[str] = None) -> List[Document]:
+        """Fuse BM25 and vector rankings with reciprocal rank fusion.
+
+        With prefilter=True only resumes that match a query term lexically are scored by the
+        vector stage, which then ranks all of them exactly. A metadata filter restricts both
+        rankings to matching resumes.
+        """
+        if not self.vector_store:
+            raise ValueError("Vector store not initialized")
+        
+        search_start = time.time()
+        query_vector = np.array([self.embeddings.embed_query(query)], dtype=np.float32)
+        vector_hits, lexical_hits = self.hybrid_candidates(query, query_vector, candidates, prefilter, filter)
+        results = fuse_rankings(vector_hits, lexical_hits, k, rrf_k, prefilter, self.document_for_source)
         
-        print(f"⏱️  Vector search: {search_time*1000:.1f}ms for {len(results)} results")
+        search_time = time.time() - search_start
+        mode = "prefiltered hybrid" if prefilter else "hybrid"
+        metrics.observe("search.hybrid", search_time, prefilter=prefilter, filtered=bool(filter))
+        if metrics.verbose:
+            print(f"⏱️  {mode.capitalize()} search: {search_time*1000:.1f}ms for {len(results)} results "
+                  f"({len(lexical_hits)} lexical candidates)")
         return results
     
-    def as_retriever(self, **kwargs):
+    def hybrid_candidates(self, query: str, query_vector: np.ndarray, candidates: int = 100,
+                          prefilter: bool = False, filter: Optional[str] = None):
+        """The two rankings hybrid search fuses: [(Document, cosine)] and [(source, bm25)], best first."""
+        with self._lock.read():
+            return self._hybrid_candidates(query, query_vector, candidates, prefilter, filter)
+    
+    def _hybrid_candidates(self, query: str, query_vector: np.ndarray, candidates: int,
+                           prefilter: bool, filter: Optional[str]):
+        allowed = self.metadata_index.mask(filter) if filter else None
+        live = self._live_rows()
+        if allowed is not None and live is not None:
+            allowed &= live
+        lexical_hits = self.lexical_index.search(query, candidates if allowed is None else self.lexical_index.doc_count)
+        if allowed is not None:
+            source_ids = self._faiss_ids_by_source()
+            lexical_hits = [(source, score) for source, score in lexical_hits
+                            if source in source_ids and allowed[source_ids[source]]][:candidates]
+        
+        if prefilter and lexical_hits:
+            source_ids = self._faiss_ids_by_source()
+            ids = np.array([source_ids[source] for source, _ in lexical_hits if source in source_ids],
+                           dtype=np.int64)
+            distances, indices = self._search_subset(query_vector, ids, len(ids))
+        elif allowed is not None:
+            distances, indices = self._search_subset(query_vector, np.flatnonzero(allowed), candidates, mask=allowed)
+        else:
+            distances, indices = self._search_live(query_vector, candidates)
+        if self.chunking is not None and len(self.chunk_store) == self.vector_store.index.ntotal:
+            distances, indices = self._chunk_rerank(query_vector, distances, indices, indices.shape[1])
+        return self._documents_for(distances[0], indices[0]), lexical_hits
+    
+    def search_vectors(self, query_vectors: np.ndarray, k: int, filter: Optional[str] = None) -> List[List[Tuple[Document, float]]]:
+        """Top-k (Document, cosine similarity) per query vector, honoring filter and chunk re-ranking."""
+        with self._lock.read():
+            distances, ids = self._vector_search(query_vectors, k, filter)
+            return [self._documents_for(row_distances, row_ids) for row_distances, row_ids in zip(distances, ids)]
+    
+    def _faiss_ids_by_source(self) -> dict:
+        """Map resume source -> live FAISS row id, rebuilt whenever rows are added or deleted."""
+        ntotal = self.vector_store.index.ntotal
+        if self._source_ids is None or self._source_ids[0] != (ntotal, len(self._deleted)):
+            mapping = {}
+            docstore = self.vector_store.docstore
+            # The SQLite docstore lists sources without reading any resume text
+            sources = docstore.sources() if isinstance(docstore, DiskDocstore) else None
+            for idx, doc_id in self.vector_store.index_to_docstore_id.items():
+                if idx in self._deleted:
+                    continue
+                if sources is not None:
+                    if doc_id in sources:
+                        mapping[sources[doc_id]] = idx
+                    continue
+                doc = docstore.search(doc_id)
+                if isinstance(doc, Document):
+                    mapping[doc.metadata["source"]] = idx
+            self._source_ids = ((ntotal, len(self._deleted)), mapping)
+        return self._source_ids[1]
+    
+    def iter_documents(self):
+        """Yield every live Document in FAISS row order."""
+        with self._lock.read():
+            docs = [self.vector_store.docstore.search(self.vector_store.index_to_docstore_id[idx])
+                    for idx in range(self.vector_store.index.ntotal) if idx not in self._deleted]
+        yield from (doc for doc in docs if isinstance(doc, Document))
+    
+    def document_for_source(self, source: str) -> Optional[Document]:
+        with self._lock.read():
+            idx = self._faiss_ids_by_source().get(source)
+            if idx is None:
+                return None
+            return self.vector_store.docstore.search(self.vector_store.index_to_docstore_id[idx])
+    
+    def _vector_search(self, query_vectors: np.ndarray, k: int, filter: Optional[str] = None):
+        """Top-k FAISS rows per query, honoring a metadata filter and chunk re-ranking."""
+        index = self.vector_store.index
+        fetch = max(k, self.chunking.candidates) if self.chunking is not None else k
+        if filter:
+            distances, indices = self._search_filtered(query_vectors, fetch, filter)
+        else:
+            distances, indices = self._search_live(query_vectors, fetch)
+        if self.chunking is not None and len(self.chunk_store) == index.ntotal:
+            distances, indices = self._chunk_rerank(query_vectors, distances, indices, min(k, indices.shape[1]))
+        return distances, indices
+    
+    def _live_rows(self) -> Optional[np.ndarray]:
+        """Boolean mask of rows not deleted, or None when nothing has been deleted."""
+        if not self._deleted:
+            return None
+        ntotal = self.vector_store.index.ntotal
+        if self._live_mask is None or len(self._live_mask) != ntotal:
+            mask = np.ones(ntotal, dtype=bool)
+            mask[np.fromiter(self._deleted, dtype=np.int64, count=len(self._deleted))] = False
+            self._live_mask = mask
+        return self._live_mask
+    
+    def _search_live(self, query_vectors: np.ndarray, k: int):
+        """FAISS top-k over live rows: a few deleted rows are over-fetched and dropped, many are masked out."""
+        index = self.vector_store.index
+        live = self._live_rows()
+        if live is None:
+            return index.search(query_vectors, min(k, index.ntotal))
+        k = max(1, min(k, self.document_count))
+        if len(self._deleted) > _OVERFETCH_DELETED:
+            return self._search_subset(query_vectors, np.flatnonzero(live), k, mask=live)
+        distances, indices = index.search(query_vectors, min(k + len(self._deleted), index.ntotal))
+        out_distances = np.full((len(query_vectors), k), np.inf, dtype=np.float32)
+        out_ids = np.full((len(query_vectors), k), -1, dtype=np.int64)
+        for row in range(len(query_vectors)):
+            keep = indices[row] != -1
+            keep[keep] = live[indices[row][keep]]
+            row_distances, row_ids = distances[row][keep][:k], indices[row][keep][:k]
+            out_distances[row, :len(row_ids)] = row_distances
+            out_ids[row, :len(row_ids)] = row_ids
+        return out_distances, out_ids
+    
+    def _documents_for(self, distances: np.ndarray, ids: np.ndarray) -> List[Tuple[Document, float]]:
+        hits = []
+        for distance, idx in zip(distances, ids):
+            if idx == -1:
+                continue
+            doc = self.vector_store.docstore.search(self.vector_store.index_to_docstore_id[idx])
+            # Squared L2 between unit vectors -> cosine similarity
+            hits.append((doc, float(1.0 - distance / 2.0)))
+        return hits
+    
+    def _search_filtered(self, query_vectors: np.ndarray, k: int, filter: str):
+        """Top-k among rows whose metadata matches the filter expression."""
+        mask = self.metadata_index.mask(filter)
+        if self._deleted:
+            mask &= self._live_rows()
+        ids = np.flatnonzero(mask)
+        if metrics.verbose:
+            print(f"🔎 Filter '{filter}' matches {len(ids)} of {len(mask)} resumes")
+        return self._search_subset(query_vectors, ids, k, mask=mask)
+    
+    def _search_subset(self, query_vectors: np.ndarray, ids: np.ndarray, k: int,
+                       mask: Optional[np.ndarray] = None):
+        """Exact top-k restricted to the given FAISS ids.
+
+        Small candidate sets are scored directly from reconstructed vectors; otherwise (or when
+        the index cannot reconstruct, e.g. IVF without a direct map) an IDSelector search is used.
+        A boolean row mask, when given, is passed to FAISS as a bitmap instead of an id batch.
+        """
+        index = self.vector_store.index
+        k = max(1, min(k, len(ids)))
+        if len(ids) == 0:
+            return np.full((len(query_vectors), k), np.inf, dtype=np.float32), np.full((len(query_vectors), k), -1)
+        
+        if len(ids) <= 50_000:
+            try:
+                candidates = index.reconstruct_batch(ids)
+                distances = ((query_vectors ** 2).sum(axis=1)[:, None] + (candidates ** 2).sum(axis=1)[None, :]
+                             - 2.0 * query_vectors @ candidates.T)
+                order = np.argsort(distances, axis=1)[:, :k]
+                return np.take_along_axis(distances, order, axis=1), ids[order]
+            except RuntimeError:
+                pass
+        
+        if mask is not None:
+            # The selector only holds a pointer, so keep the packed bits alive through the search
+            bits = np.packbits(mask, bitorder="little")
+            selector = faiss.IDSelectorBitmap(len(mask), faiss.swig_ptr(bits))
+        else:
+            selector = faiss.IDSelectorBatch(ids)
+        params = selector_params(index, self.index_config, selector, exhaustive=True)
+        return index.search(query_vectors, k, params=params)
+    
+    def as_retriever(self, search_kwargs: Optional[dict] = None, **kwargs):
         """Return retriever for LangChain."""
         if not self.vector_store:
             raise ValueError("Vector store not initialized")
-        return self.vector_store.as_retriever(**kwargs)
+        return StoreRetriever(store=self, k=(search_kwargs or {}).get("k", 4))